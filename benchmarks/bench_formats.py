@@ -0,0 +1,97 @@
+# bench_formats.py
+#
+# JSON ve XML cevap yollarının ayrıştırma + model oluşturma maliyetini karşılaştırır.
+# Kamera gerekmez, cihaz cevapları burada üretilir.
+# Kullanım (repo kökünden): python -m benchmarks.bench_formats
+
+import json
+import timeit
+
+import xmltodict
+
+from hikvision.models.content import SearchResult
+from hikvision.models.io import IOPortStatus
+from hikvision.models.system import DeviceInfo
+from hikvision.utils import parse_json, parse_xml, unwrap_list
+
+NAMESPACE = "http://www.hikvision.com/ver10/XMLSchema"
+
+DEVICE_INFO = {
+    "deviceName": "BENCH",
+    "deviceID": "1",
+    "model": "DS-2CD2020F-I",
+    "serialNumber": "DS-2CD2020F-I20160101CCCH567890123",
+    "macAddress": "c0:56:e3:00:00:01",
+    "firmwareVersion": "V5.4.5",
+}
+
+IO_PORTS = [
+    {"ioPortID": i, "ioPortType": "input" if i % 2 else "output", "ioState": "inactive"}
+    for i in range(1, 33)
+]
+
+MATCHES = [
+    {
+        "sourceID": "{0000-0000}",
+        "trackID": 101,
+        "timeSpan": {"startTime": f"2025-12-04T{h:02d}:00:00Z", "endTime": f"2025-12-04T{h:02d}:59:59Z"},
+        "mediaSegmentDescriptor": {"contentType": "video", "codecType": "H.264-BP"},
+    }
+    for h in range(24)
+] * 2
+
+
+def build_payloads():
+    """Her kaynak için (xml_text, json_text) çifti üretir."""
+    return {
+        "deviceInfo": (
+            xmltodict.unparse({"DeviceInfo": {"@xmlns": NAMESPACE, **DEVICE_INFO}}),
+            json.dumps({"DeviceInfo": DEVICE_INFO}),
+        ),
+        "IO/status (32 port)": (
+            xmltodict.unparse({"IOPortStatusList": {"@xmlns": NAMESPACE, "IOPortStatus": IO_PORTS}}),
+            json.dumps({"IOPortStatusList": [{"IOPortStatus": p} for p in IO_PORTS]}),
+        ),
+        "ContentMgmt/search (48 kayıt)": (
+            xmltodict.unparse({"CMSearchResult": {
+                "@xmlns": NAMESPACE, "responseStatus": "true", "numOfMatches": len(MATCHES),
+                "matchList": {"searchMatchItem": MATCHES},
+            }}),
+            json.dumps({"CMSearchResult": {
+                "responseStatus": True, "numOfMatches": len(MATCHES),
+                "matchList": [{"searchMatchItem": m} for m in MATCHES],
+            }}),
+        ),
+    }
+
+
+def to_models(name, data):
+    """API modüllerindeki ile aynı dönüşüm."""
+    if name == "deviceInfo":
+        return DeviceInfo(**data["DeviceInfo"])
+    if name.startswith("IO"):
+        return [IOPortStatus(**p) for p in unwrap_list(data.get("IOPortStatusList"), "IOPortStatus")]
+    root = data["CMSearchResult"]
+    return SearchResult(
+        responseStatus=str(root["responseStatus"]).lower(),
+        numOfMatches=int(root["numOfMatches"]),
+        matchList=unwrap_list(root.get("matchList"), "searchMatchItem"),
+    )
+
+
+def main(number: int = 2000):
+    print(f"{'Kaynak':<32}{'XML (µs)':>12}{'JSON (µs)':>12}{'Hızlanma':>10}")
+    print("-" * 66)
+    for name, (xml_text, json_text) in build_payloads().items():
+        # İki yolun aynı modeli ürettiğini doğrula
+        assert to_models(name, parse_xml(xml_text)) == to_models(name, parse_json(json_text)), name
+
+        xml_t = timeit.timeit(lambda: to_models(name, parse_xml(xml_text)), number=number)
+        json_t = timeit.timeit(lambda: to_models(name, parse_json(json_text)), number=number)
+        xml_us = xml_t / number * 1e6
+        json_us = json_t / number * 1e6
+        print(f"{name:<32}{xml_us:>12.1f}{json_us:>12.1f}{xml_us / json_us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
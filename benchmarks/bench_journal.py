@@ -0,0 +1,56 @@
+# bench_journal.py
+#
+# EventJournal yazma hızını (olay/sn) ve zaman aralığı tarama süresini ölçer.
+# Hedef: yerel diskte en az 20.000 olay/sn.
+# Kullanım (repo kökünden): python -m benchmarks.bench_journal [olay_sayısı]
+
+import sys
+import tempfile
+import time
+
+from hikvision.models.event import EventAlert
+from hikvision.services.event_journal import EventJournal
+
+DEVICES = [f"192.168.1.{i}" for i in range(1, 51)]
+
+
+def main(count: int = 200000):
+    alerts = [
+        EventAlert(
+            ipAddress=DEVICES[i % len(DEVICES)],
+            channelID=str(i % 4 + 1),
+            dateTime="2025-11-28T15:27:00Z",
+            activePostCount=i % 30 + 1,
+            eventType="VMD",
+            eventState="active",
+            eventDescription="Motion alarm",
+        )
+        for i in range(1000)
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        journal = EventJournal(directory, segment_slots=65536)
+        base = 1_700_000_000.0
+
+        t0 = time.perf_counter()
+        for i in range(count):
+            journal.append(alerts[i % len(alerts)], ts=base + i * 0.001)
+        journal.flush()
+        write_s = time.perf_counter() - t0
+        print(f"Yazma:  {count} olay, {write_s:.2f} sn -> {count / write_s:,.0f} olay/sn "
+              f"({journal.segment_count()} segment)")
+
+        # Ortadaki 10 saniyelik pencere, tek cihaz
+        start = base + count * 0.001 / 2
+        t0 = time.perf_counter()
+        found = sum(1 for _ in journal.scan(start, start + 10, device=DEVICES[0]))
+        print(f"Tarama: 10 sn / tek cihaz -> {found} kayıt, {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+        t0 = time.perf_counter()
+        found = sum(1 for _ in journal.scan(start, start + 10))
+        print(f"Tarama: 10 sn / tüm cihazlar -> {found} kayıt, {(time.perf_counter() - t0) * 1000:.1f} ms")
+        journal.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
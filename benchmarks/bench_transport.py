@@ -0,0 +1,89 @@
+# bench_transport.py
+#
+# Transport backend'lerinin (requests, urllib3, async) istek başına CPU maliyetini ölçer.
+# Kamera gerekmez: ayrı süreçte Digest challenge'ı veren keep-alive bir sahte ISAPI sunucusu çalışır,
+# böylece ölçülen CPU sadece istemci tarafıdır (process_time, arka plan loop thread'i dahil).
+# Kullanım (repo kökünden): python -m benchmarks.bench_transport [istek_sayısı]
+
+import asyncio
+import multiprocessing
+import sys
+import time
+
+from hikvision.core import HikvisionSession, SimpleConfig
+from hikvision.models.system import DeviceInfo
+from hikvision.utils import parse_xml
+
+BODY = (b'<?xml version="1.0" encoding="UTF-8"?>\n'
+        b'<DeviceInfo version="2.0" xmlns="http://www.hikvision.com/ver20/XMLSchema">'
+        b"<deviceName>BENCH</deviceName><deviceID>1</deviceID><model>DS-2CD2020F-I</model>"
+        b"<serialNumber>DS-2CD2020F-I20160101CCCH567890123</serialNumber>"
+        b"<macAddress>c0:56:e3:00:00:01</macAddress><firmwareVersion>V5.4.5</firmwareVersion></DeviceInfo>")
+
+OK = b"HTTP/1.1 200 OK\r\nContent-Type: application/xml\r\nContent-Length: %d\r\n\r\n%s" % (len(BODY), BODY)
+CHALLENGE = (b'HTTP/1.1 401 Unauthorized\r\nWWW-Authenticate: Digest realm="bench", nonce="n0nce", '
+             b'qop="auth", algorithm=MD5\r\nContent-Length: 0\r\n\r\n')
+
+
+def serve(port_queue):
+    """Sahte sunucu (ayrı süreç): Authorization başlığı yoksa 401, varsa sabit DeviceInfo döner."""
+    async def handle(reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line[:15].lower() == b"content-length:":
+                        length = int(line[15:])
+                if length:
+                    await reader.readexactly(length)
+                writer.write(OK if b"\r\nAuthorization: Digest " in head else CHALLENGE)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    async def main():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port_queue.put(server.sockets[0].getsockname()[1])
+        await server.serve_forever()
+
+    asyncio.run(main())
+
+
+def measure(call, number: int):
+    """(istek başına CPU µs, istek başına duvar saati µs)"""
+    call() # Bağlantı + Digest el sıkışması ölçüme girmesin
+    cpu, wall = time.process_time(), time.perf_counter()
+    for _ in range(number):
+        call()
+    return (time.process_time() - cpu) / number * 1e6, (time.perf_counter() - wall) / number * 1e6
+
+
+def main(number: int = 3000):
+    port_queue = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(port_queue,), daemon=True)
+    server.start()
+    port = port_queue.get(timeout=10)
+
+    print(f"{'Backend':<10}{'Yol':<24}{'CPU (µs)':>12}{'Süre (µs)':>12}")
+    print("-" * 58)
+    try:
+        for backend in ("requests", "urllib3", "async"):
+            session = HikvisionSession(SimpleConfig("127.0.0.1", "admin", "bench", port), transport=backend)
+            session.json_supported = False
+            url = f"{session.base_url}/System/deviceInfo"
+
+            paths = {
+                "transport.send": lambda: session.transport.send("GET", url, headers=session.headers, timeout=5).content,
+                "session.request": lambda: session.request("GET", "/System/deviceInfo").content,
+                "request + DeviceInfo": lambda: DeviceInfo(**parse_xml(session.request("GET", "/System/deviceInfo"))["DeviceInfo"]),
+            }
+            for name, call in paths.items():
+                cpu_us, wall_us = measure(call, number)
+                print(f"{backend:<10}{name:<24}{cpu_us:>12.1f}{wall_us:>12.1f}")
+            session.close()
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3000)
@@ -34,6 +34,9 @@ except ImportError:
 # IO Modelleri
 from .models.io import IOPortStatus
 
+# Bağlantı Sağlığı (Devre kesici)
+from .health import CircuitOpenError, DeviceHealth, fleet_health
+
 # 3. Kütüphane Versiyonu
 __version__ = "1.0.0"
 
@@ -51,5 +54,8 @@ __all__ = [
     "SearchResult",
     "SearchMatchItem",
     "TemperatureInfo",
-    "IOPortStatus"
+    "IOPortStatus",
+    "CircuitOpenError",
+    "DeviceHealth",
+    "fleet_health"
 ]
\ No newline at end of file
@@ -0,0 +1,203 @@
+import functools
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Type
+
+import requests
+from pydantic import BaseModel, ValidationError
+
+from ..core import HikvisionSession
+from ..models.streaming import InputProxyChannel, StreamingChannel, VideoInputChannel
+from ..utils import unwrap_list
+
+
+@functools.lru_cache(maxsize=None)
+def _channel_position(function) -> Optional[int]:
+    """'channel' parametresinin konumsal sırası (self hariç). Parametre yoksa None."""
+    parameters = list(inspect.signature(function).parameters.values())[1:]
+    for position, parameter in enumerate(parameters):
+        if parameter.name == "channel":
+            # Sadece isimle verilebiliyorsa konumsal argümanlar onu hiç kapsamaz
+            return position if parameter.kind == parameter.POSITIONAL_OR_KEYWORD else len(parameters)
+    return None
+
+
+class BoundAPI:
+    """
+    API nesnesinin 'channel' parametresi alan metotlarını sabit bir kanala bağlar.
+    Açıkça channel verilirse o kullanılır. overrides: metot adı -> farklı kanal değeri
+    (örn. önizleme alt akıştan açılır).
+    """
+
+    def __init__(self, api, channel: int, overrides: Dict[str, int] = None):
+        self._api = api
+        self._channel = channel
+        self._overrides = overrides or {}
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self._api, name)
+        function = getattr(attribute, "__func__", None)
+        position = _channel_position(function) if function is not None else None
+        if position is None:
+            return attribute
+        channel = self._overrides.get(name, self._channel)
+
+        @functools.wraps(attribute)
+        def bound(*args, **kwargs):
+            # channel konumsal veya isimle açıkça verildiyse dokunulmaz
+            if len(args) <= position and "channel" not in kwargs:
+                kwargs["channel"] = channel
+            return attribute(*args, **kwargs)
+        return bound
+
+    def __repr__(self):
+        return f"<{type(self._api).__name__} channel={self._channel}>"
+
+
+class Channel:
+    """
+    Cihazdaki tek video kanalı (yerel giriş veya NVR'daki IP kamera).
+
+    streams: Akış ID -> StreamingChannel (101 ana, 102 alt ...), liste endpoint'inden okunmuştur.
+    ptz / image / streaming: Kanala bağlı API'ler:
+        channel.ptz.goto_preset(3)
+        channel.image.set_text_overlay("Giriş")
+        channel.streaming.get_snapshot()     # ana akış
+        channel.streaming.open_preview()     # alt akış
+    """
+
+    def __init__(self, id: int, source: str, name: str = None, input: VideoInputChannel = None,
+                 proxy: InputProxyChannel = None, streams: Dict[int, StreamingChannel] = None,
+                 online: bool = None):
+        self.id = id
+        self.source = source # local (yerel giriş) veya proxy (IP kanal)
+        self.name = name
+        self.input = input
+        self.proxy = proxy
+        self.streams = streams or {}
+        self.online = online
+        self.ptz: Optional[BoundAPI] = None
+        self.image: Optional[BoundAPI] = None
+        self.streaming: Optional[BoundAPI] = None
+
+    @property
+    def main_stream_id(self) -> int:
+        return self.id * 100 + 1
+
+    @property
+    def sub_stream_id(self) -> int:
+        return self.id * 100 + 2
+
+    @property
+    def main_stream(self) -> Optional[StreamingChannel]:
+        return self.streams.get(self.main_stream_id)
+
+    @property
+    def sub_stream(self) -> Optional[StreamingChannel]:
+        return self.streams.get(self.sub_stream_id)
+
+    def __repr__(self):
+        return f"<Channel {self.id} {self.source} {self.name!r} streams={sorted(self.streams)}>"
+
+
+class _ProxyStatus(BaseModel):
+    """IP kanal bağlantı durumu (/ContentMgmt/InputProxy/channels/status)."""
+    id: int
+    online: bool = False
+
+
+class ChannelsAPI:
+    """
+    Kanalları tek seferde listeler ve önbellekte tutar.
+    Yerel girişler, IP kanalları (NVR), IP kanal durumları ve tüm akış ayarları liste
+    endpoint'lerinden paralel okunur (kanal sayısından bağımsız en fazla 4 istek).
+    Cihazda olmayan liste (örn. IPC'de InputProxy) boş kabul edilir.
+    """
+
+    def __init__(self, session: HikvisionSession, ptz=None, image=None, streaming=None):
+        self._session = session
+        self._ptz = ptz
+        self._image = image
+        self._streaming = streaming
+        self._channels: Optional[Dict[int, Channel]] = None
+        self._lock = threading.Lock()
+
+    def list(self, refresh: bool = False) -> List[Channel]:
+        with self._lock:
+            if self._channels is None or refresh:
+                self._channels = self._enumerate()
+            return list(self._channels.values())
+
+    def get(self, channel_id: int, refresh: bool = False) -> Channel:
+        channels = {channel.id: channel for channel in self.list(refresh)}
+        if channel_id not in channels:
+            raise KeyError(f"Kanal {channel_id} cihazda yok (mevcut: {sorted(channels)}).")
+        return channels[channel_id]
+
+    def stream(self, stream_id: int) -> Optional[StreamingChannel]:
+        """Önbellekten akış ayarları (StreamingAPI.get_channel_info'nun istek atmayan karşılığı)."""
+        for channel in self.list():
+            if stream_id in channel.streams:
+                return channel.streams[stream_id]
+        return None
+
+    def invalidate(self):
+        with self._lock:
+            self._channels = None
+
+    def _read_list(self, endpoint: str, root: str, item: str, model: Type[BaseModel]) -> List[BaseModel]:
+        try:
+            data = self._session.get_document(endpoint)
+        except (requests.ConnectionError, requests.Timeout):
+            raise # Cihaza ulaşılamıyor: boş liste ile önbelleğe alınmamalı
+        except requests.RequestException:
+            return [] # Endpoint desteklenmiyor
+
+        items = []
+        for raw in unwrap_list(data.get(root), item):
+            try:
+                items.append(model(**raw))
+            except ValidationError as e:
+                print(f"   ⚠️ {item} {raw.get('id')} okunamadı: {e.error_count()} alan hatası")
+        return items
+
+    def _read_online(self) -> Dict[int, bool]:
+        status = self._read_list("/ContentMgmt/InputProxy/channels/status", "InputProxyChannelStatusList",
+                                 "InputProxyChannelStatus", _ProxyStatus)
+        return {s.id: s.online for s in status}
+
+    def _enumerate(self) -> Dict[int, Channel]:
+        with ThreadPoolExecutor(max_workers=4, thread_name_prefix="hik-channels") as executor:
+            inputs = executor.submit(self._read_list, "/System/Video/inputs/channels", "VideoInputChannelList",
+                                     "VideoInputChannel", VideoInputChannel)
+            proxies = executor.submit(self._read_list, "/ContentMgmt/InputProxy/channels", "InputProxyChannelList",
+                                      "InputProxyChannel", InputProxyChannel)
+            online = executor.submit(self._read_online)
+            streams = executor.submit(self._read_list, "/Streaming/channels", "StreamingChannelList",
+                                      "StreamingChannel", StreamingChannel)
+            inputs, proxies, online, streams = inputs.result(), proxies.result(), online.result(), streams.result()
+
+        channels: Dict[int, Channel] = {}
+        for video_input in inputs:
+            channels[video_input.id] = Channel(video_input.id, "local", video_input.name, input=video_input)
+        for proxy in proxies:
+            channel = channels.setdefault(proxy.id, Channel(proxy.id, "proxy"))
+            channel.source, channel.proxy = "proxy", proxy
+            channel.name = proxy.name or channel.name
+            channel.online = online.get(proxy.id)
+        for stream in streams:
+            # Akış ID'si = kanal * 100 + akış no (101, 102, 3301 ...)
+            channel = channels.setdefault(stream.id // 100, Channel(stream.id // 100, "local"))
+            channel.streams[stream.id] = stream
+            if not channel.name and stream.id % 100 == 1:
+                channel.name = stream.name
+
+        for channel in channels.values():
+            channel.ptz = BoundAPI(self._ptz, channel.id) if self._ptz else None
+            channel.image = BoundAPI(self._image, channel.id) if self._image else None
+            if self._streaming:
+                channel.streaming = BoundAPI(self._streaming, channel.main_stream_id,
+                                             overrides={"open_preview": channel.sub_stream_id})
+        return dict(sorted(channels.items()))
+
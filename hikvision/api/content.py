@@ -1,97 +1,295 @@
 from ..core import HikvisionSession
-from ..utils import parse_xml
-from ..models.content import SearchResult
+from ..utils import unwrap_list
+from ..media.rtsp import RTSPClient, format_clock
+from ..models.content import SearchMatchItem, SearchResult
+from ..scheduler import BULK
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Sequence, Union
+from urllib.parse import quote
+import heapq
+import queue
+import threading
+import requests
 import uuid
 import datetime
 
+_DONE = object()
+
+
+def _start_key(item: SearchMatchItem) -> datetime.datetime:
+    """Birleştirme anahtarı. Saat dilimi yoksa UTC kabul edilir (karışık formatlar karşılaştırılabilsin)."""
+    try:
+        moment = datetime.datetime.fromisoformat(item.time_span.start_time.replace("Z", "+00:00"))
+    except ValueError:
+        return datetime.datetime.min.replace(tzinfo=datetime.timezone.utc)
+    return moment if moment.tzinfo else moment.replace(tzinfo=datetime.timezone.utc)
+
+
 class ContentAPI:
     def __init__(self, session: HikvisionSession):
         self._session = session
         self.NAMESPACE = "http://www.hikvision.com/ver10/XMLSchema"
+        # Tek aramada gönderilebilecek iz sayısı cihaza göre değişir, reddedildikçe yarıya iner
+        self.max_search_tracks = 64
+        self._limit_lock = threading.Lock()
 
-    def search_recordings(self, start_time: datetime.datetime, end_time: datetime.datetime, track_id: int = 101, max_results: int = 40) -> SearchResult:
+    def search_recordings(self, start_time: datetime.datetime, end_time: datetime.datetime,
+                          track_id: Union[int, Sequence[int]] = 101, max_results: int = 40,
+                          position: int = 0, search_id: str = None) -> SearchResult:
         """
-        Belirli tarih aralığındaki kayıtları arar.
+        Belirli tarih aralığındaki kayıtları arar (tek sayfa).
+        track_id liste verilirse tüm izler tek istekte aranır (trackList birden çok trackID alır).
+        Sonraki sayfa için aynı search_id ile position += len(match_list) verilir
+        (response_status_strg == "MORE" iken). Çok iz ve tüm sayfalar için: search_tracks
         Ref: ISAPI PDF Section 15.2.40
         """
         endpoint = "/ContentMgmt/search"
         
         start_str = start_time.strftime("%Y-%m-%dT%H:%M:%SZ")
         end_str = end_time.strftime("%Y-%m-%dT%H:%M:%SZ")
-        search_id = str(uuid.uuid4()).upper()
+        search_id = search_id or str(uuid.uuid4()).upper()
+        track_ids = track_id if isinstance(track_id, int) else list(track_id)
 
-        xml_body = f"""<?xml version="1.0" encoding="UTF-8"?>
-        <CMSearchDescription version="1.0" xmlns="{self.NAMESPACE}">
-            <searchID>{search_id}</searchID>
-            <trackList>
-                <trackID>{track_id}</trackID>
-            </trackList>
-            <timeSpanList>
-                <timeSpan>
-                    <startTime>{start_str}</startTime>
-                    <endTime>{end_str}</endTime>
-                </timeSpan>
-            </timeSpanList>
-            <maxResults>{max_results}</maxResults>
-            <searchResultPostion>0</searchResultPostion>
-            <metadataList>
-                <metadataDescriptor>//recordType.meta.std-cgi.com</metadataDescriptor>
-            </metadataList>
-        </CMSearchDescription>"""
-
-        response = self._session.request("POST", endpoint, data=xml_body)
-        
-        # --- HATA DÜZELTMESİ BURADA BAŞLIYOR ---
-        data = parse_xml(response) 
+        # Aynı doküman cihaz destekliyorsa JSON, desteklemiyorsa XML olarak gönderilir
+        search_description = {
+            "CMSearchDescription": {
+                "@version": "1.0",
+                "@xmlns": self.NAMESPACE,
+                "searchID": search_id,
+                "trackList": {"trackID": track_ids},
+                "timeSpanList": {
+                    "timeSpan": {"startTime": start_str, "endTime": end_str}
+                },
+                "maxResults": max_results,
+                "searchResultPostion": position,
+                "metadataList": {"metadataDescriptor": "//recordType.meta.std-cgi.com"},
+            }
+        }
+
+        data = self._session.send_document("POST", endpoint, search_description, priority=BULK, flow="search")
         
         # 1. Root elemanı al, yoksa boş dict ver
         root = data.get("CMSearchResult", {})
         
         # 2. matchList elemanını al. Eğer kayıt yoksa bu None gelebilir.
-        match_list_node = root.get("matchList")
-        
-        matches = []
-        if match_list_node:
-            # matchList varsa içinden searchMatchItem'ı çek
-            # Eğer tek kayıt varsa dict, çok kayıt varsa list gelir.
-            # xmltodict bazen boş tag için None döner, kontrol edelim.
-            items = match_list_node.get("searchMatchItem")
-            
-            if items:
-                if isinstance(items, list):
-                    matches = items
-                else:
-                    matches = [items]
+        # Tek kayıt varsa dict, çok kayıt varsa list gelir (JSON'da sarılı liste); unwrap_list ikisini de çözer.
+        matches = unwrap_list(root.get("matchList"), "searchMatchItem")
         
         # Pydantic modeline uydurmak için manipülasyon
         result_data = {
             "searchID": root.get("searchID", search_id),
-            "responseStatus": root.get("responseStatus", "false"),
+            "responseStatus": str(root.get("responseStatus", "false")).lower(), # JSON'da bool gelir
+            "responseStatusStrg": root.get("responseStatusStrg"),
             "numOfMatches": int(root.get("numOfMatches", 0)),
             "matchList": matches
         }
         
         return SearchResult(**result_data)
-    
-    def get_playback_rtsp_url(self, track_id: int, start_time: str, end_time: str) -> str:
+
+    def search_tracks(self, start_time: datetime.datetime, end_time: datetime.datetime, tracks: Iterable[int],
+                      page_size: int = 40, max_concurrency: int = 2, tracks_per_request: int = None) -> "TrackSearch":
+        """
+        Çok sayıda izi (örn. NVR'daki 32 kanalın 101, 201 ... izleri) birkaç istekte arar.
+        İzler istek başına en fazla tracks_per_request (verilmezse cihaz için öğrenilmiş sınır,
+        bkz. max_search_tracks) olacak şekilde gruplanır, gruplar max_concurrency kadar paralel
+        aranır ve her grubun tüm sayfaları okunur.
+
+        Kullanım:
+            with cam.content.search_tracks(start, end, [101, 201, 301]) as search:
+                for item in search:          # Başlangıç zamanına göre sıralı, geldikçe
+                    ...
+            search.counts                    # {101: 12, 201: 0, 301: 7}
+        """
+        return TrackSearch(self, start_time, end_time, tracks, page_size, max_concurrency,
+                           tracks_per_request or self.max_search_tracks)
+
+    def _reduce_search_tracks(self, rejected: int) -> int:
+        """Cihaz rejected izlik aramayı reddetti: sınırı yarıya indirir, yeni sınırı döner."""
+        with self._limit_lock:
+            self.max_search_tracks = max(1, min(self.max_search_tracks, rejected // 2))
+            return self.max_search_tracks
+
+    def get_playback_rtsp_url(self, track_id: int, start_time: str, end_time: str, rtsp_port: int = 554) -> str:
         """
         Geçmiş kayıtları izlemek için RTSP linki oluşturur.
         Zaman formatı: YYYYMMDDThhmmss (Örn: 20251204T120000)
         Ref: ISAPI PDF Section 15.9.17
         """
-        # Kullanıcı user/pass girmek zorunda kalmasın diye URL'e gömüyoruz
-        # Ancak şifrede özel karakter varsa URL encode yapmak gerekir.
-        # Basitlik için ham halini koyuyoruz.
-        
-        user = self._session.session.auth.username
-        password = self._session.session.auth.password
-        ip = self._session.base_url.split("://")[1].split("/")[0] # IP:Port'u çek
+        # Kullanıcı user/pass girmek zorunda kalmasın diye URL'e gömüyoruz.
+        # Şifrede '@', ':', '/' gibi karakterler URL'i bozmasın diye encode ediliyor.
+        user = quote(self._session.config.username, safe="")
+        password = quote(self._session.config.password, safe="")
+        ip = self._session.config.ip
         
         # RTSP URL Formatı:
         # rtsp://user:pass@IP:554/ISAPI/Streaming/tracks/ID?starttime=...&endtime=...
         
-        # Start/End time formatını düzeltelim (2025-12-04T12:00:00Z -> 20251204T120000)
+        # Start/End time formatını düzeltelim (2025-12-04T12:00:00Z -> 20251204T120000Z)
         # Eğer gelen format zaten düzgünse dokunmayız.
+        start_time, end_time = format_clock(start_time), format_clock(end_time)
         
-        url = f"rtsp://{user}:{password}@{ip.split(':')[0]}:554/ISAPI/Streaming/tracks/{track_id}?starttime={start_time}&endtime={end_time}"
-        return url
\ No newline at end of file
+        url = f"rtsp://{user}:{password}@{ip}:{rtsp_port}/ISAPI/Streaming/tracks/{track_id}?starttime={start_time}&endtime={end_time}"
+        return url
+
+    def open_playback(self, track_id: int, start_time: Union[datetime.datetime, str], end_time: Union[datetime.datetime, str] = None,
+                      rtsp_port: int = 554, **kwargs) -> RTSPClient:
+        """
+        Kaydı RTSP üzerinden oynatmak için (henüz bağlanmamış) RTSPClient döner.
+        Kimlik bilgileri URL'e gömülmez, Digest ile gönderilir.
+
+        Kullanım:
+            async with cam.content.open_playback(101, start, end) as stream:
+                async for frame in stream:
+                    ...
+        """
+        url = f"rtsp://{self._session.config.ip}:{rtsp_port}/ISAPI/Streaming/tracks/{track_id}"
+        return RTSPClient(url, self._session.config.username, self._session.config.password,
+                          start=start_time, end=end_time, **kwargs)
+
+
+class TrackSearch:
+    """
+    Çok izli kayıt araması (ContentAPI.search_tracks döner). Arama oluşturulunca arka planda başlar.
+
+    Iterasyon tüm izlerin sonuçlarını başlangıç zamanına göre birleştirerek akıtır: her izin
+    sonuçları ayrı kuyruğa düşer, heapq.merge bir sonucu ancak diğer tüm izlerde ondan önce
+    gelecek sonuç kalmadığında verir. Tek geçişliktir; gruplu sonuç için by_track kullanılır.
+
+    counts: İz -> bulunan kayıt sayısı (arama sürerken artar)
+    errors: İz -> hata mesajı (o iz için arama yarım kaldıysa)
+    untracked: İze atanamayan sonuçlar (trackID'siz veya istenmeyen iz), birleştirmeye girmez
+    requests: Atılan arama isteği sayısı
+    """
+
+    def __init__(self, api: ContentAPI, start_time: datetime.datetime, end_time: datetime.datetime,
+                 tracks: Iterable[int], page_size: int, max_concurrency: int, tracks_per_request: int):
+        self.tracks: List[int] = list(dict.fromkeys(tracks))
+        self.counts: Dict[int, int] = {track: 0 for track in self.tracks}
+        self.errors: Dict[int, str] = {}
+        self.untracked: List[SearchMatchItem] = []
+        self.requests = 0
+        self._api = api
+        self._start_time, self._end_time = start_time, end_time
+        self._page_size = page_size
+        self._queues = {track: queue.Queue() for track in self.tracks}
+        self._open = len(self.tracks) # Sonucu henüz tamamlanmamış iz sayısı
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._iterated = False
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="hik-search")
+
+        if not self.tracks:
+            self._executor.shutdown(wait=False)
+        for batch in self._split(self.tracks, tracks_per_request):
+            self._executor.submit(self._run, batch)
+
+    @staticmethod
+    def _split(tracks: List[int], size: int) -> List[List[int]]:
+        size = max(1, size)
+        return [tracks[i:i + size] for i in range(0, len(tracks), size)]
+
+    def _run(self, batch: List[int]):
+        search_id = str(uuid.uuid4()).upper()
+        position = 0
+        try:
+            while not self._cancelled.is_set():
+                result = self._api.search_recordings(self._start_time, self._end_time, batch,
+                                                     self._page_size, position, search_id)
+                with self._lock:
+                    self.requests += 1
+                self._deliver(batch, result.match_list)
+                position += len(result.match_list)
+                if str(result.response_status_strg).upper() != "MORE" or not result.match_list:
+                    break
+        except requests.HTTPError as e:
+            rejected = e.response is not None and e.response.status_code == 400
+            if rejected and position == 0 and len(batch) > 1:
+                # Çok fazla trackID: daha küçük gruplarla yeniden dene (sınır cihaz için saklanır)
+                limit = self._api._reduce_search_tracks(len(batch))
+                print(f"   ⚠️ Cihaz {len(batch)} izlik aramayı reddetti, istek başına {limit} iz ile tekrar deneniyor.")
+                try:
+                    for part in self._split(batch, limit):
+                        self._executor.submit(self._run, part)
+                    return
+                except RuntimeError: # Arama kapatıldı
+                    pass
+            self._finish(batch, e)
+            return
+        except Exception as e: # Bağlantı, ayrıştırma (XML/JSON) veya model hatası: izler yarım kalır
+            self._finish(batch, e)
+            return
+        self._finish(batch)
+
+    def _deliver(self, batch: List[int], matches: List[SearchMatchItem]):
+        grouped: Dict[int, List[SearchMatchItem]] = {}
+        for item in matches:
+            if item.track_id is None and len(batch) == 1:
+                item.track_id = batch[0]
+            if item.track_id in batch:
+                grouped.setdefault(item.track_id, []).append(item)
+            else:
+                # Çok izli grupta trackID'siz (veya istenmeyen izden) sonuç hiçbir ize atanamaz
+                with self._lock:
+                    self.untracked.append(item)
+
+        for track, items in grouped.items():
+            # Cihaz sayfa içinde izleri karışık verebilir; iz içindeki sıra zamana göre garanti edilir
+            items.sort(key=_start_key)
+            with self._lock:
+                self.counts[track] += len(items)
+            for item in items:
+                self._queues[track].put(item)
+
+    def _finish(self, batch: List[int], error: Exception = None):
+        if error is not None:
+            print(f"   ❌ Kayıt araması yarım kaldı (izler {batch}): {error}")
+        with self._lock:
+            for track in batch:
+                if error is not None:
+                    self.errors[track] = str(error)
+                self._queues[track].put(_DONE)
+            self._open -= len(batch)
+            finished = self._open == 0
+        if finished:
+            self._executor.shutdown(wait=False)
+
+    def _track_items(self, track: int) -> Iterator[SearchMatchItem]:
+        items = self._queues[track]
+        while True:
+            item = items.get()
+            if item is _DONE:
+                return
+            yield item
+
+    def __iter__(self) -> Iterator[SearchMatchItem]:
+        if self._iterated:
+            raise RuntimeError("TrackSearch tek geçişlidir, sonuçlar zaten okundu.")
+        self._iterated = True
+        return heapq.merge(*(self._track_items(track) for track in self.tracks), key=_start_key)
+
+    def by_track(self) -> Dict[int, List[SearchMatchItem]]:
+        """Kalan tüm sonuçları bekler ve izlere göre (her biri zamana göre sıralı) gruplar."""
+        grouped: Dict[int, List[SearchMatchItem]] = {track: [] for track in self.tracks}
+        for item in self:
+            grouped[item.track_id].append(item)
+        return grouped
+
+    @property
+    def done(self) -> bool:
+        return self._open == 0
+
+    def close(self):
+        """Aramayı durdurur: sıradaki sayfalar ve gruplar istenmez (uçuştaki istek tamamlanır)."""
+        self._cancelled.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for items in self._queues.values():
+            items.put(_DONE)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self):
+        return f"<TrackSearch tracks={len(self.tracks)} found={sum(self.counts.values())} requests={self.requests}>"
@@ -1,10 +1,11 @@
-from typing import Generator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Generator, Iterable, Tuple
 
 import xmltodict
 
 from ..core import HikvisionSession
-from ..models.event import EventAlert
-from ..utils import parse_xml, is_success_response
+from ..models.event import EventAlert, MotionGrid
+from ..utils import parse_xml, parse_json, is_success_response, get_multipart_boundary
 
 
 class EventAPI:
@@ -24,9 +25,12 @@ class EventAPI:
         Canlı olay akışını (Server Push) dinler.
         Sürekli açık kalan bir bağlantıdır.
         Ref: ISAPI PDF Section 8.11.12
+
+        Akış multipart ise (akıllı olaylar) XML'den sonra gelen resim parçası,
+        yield edilmiş olan son bildirimin 'image' alanına sonradan eklenir.
+        Bildirim beklemeden hemen yield edilir, resim birkaç ms sonra gelebilir.
         """
         endpoint = "/Event/notification/alertStream"
-        url = f"{self._session.base_url}{endpoint}"
 
         # Mock modundaysa sonsuz döngüye girmesin, tek bir fake alert versin
         if self._session.mock_mode:
@@ -36,42 +40,122 @@ class EventAPI:
             return
 
         try:
-            # stream=True ile bağlantıyı açıyoruz
-            with self._session.session.get(url, stream=True, timeout=60) as response:
-                response.raise_for_status()
+            # stream=True ile bağlantıyı açıyoruz (hak başlıklar gelince bırakılır)
+            with self._session.request("GET", endpoint, stream=True, timeout=60) as response:
+                chunks = response.iter_content(chunk_size=1024)
 
-                buffer = ""
-                for chunk in response.iter_content(chunk_size=1024):
-                    if not chunk:
-                        continue
+                boundary = get_multipart_boundary(response.headers.get("Content-Type", ""))
+                if boundary:
+                    yield from self._iter_multipart_alerts(chunks, boundary)
+                else:
+                    yield from self._iter_xml_alerts(chunks)
 
-                    buffer += chunk.decode("utf-8", errors="ignore")
+        except Exception as e:
+            print(f"Stream Hatası: {e}")
 
-                    # XML bloğunun sonunu yakala
-                    while "</EventNotificationAlert>" in buffer:
-                        start_tag = "<EventNotificationAlert"
-                        end_tag = "</EventNotificationAlert>"
+    @staticmethod
+    def _iter_multipart(chunks, boundary: bytes) -> Generator[tuple, None, None]:
+        """
+        Multipart akışı (başlıklar, gövde) parçalarına böler.
+        Content-Length varsa onu kullanır, yoksa bir sonraki boundary'yi arar.
+        """
+        delimiter = b"--" + boundary
+        buffer = bytearray()
 
-                        start_idx = buffer.find(start_tag)
-                        end_idx = buffer.find(end_tag)
+        for chunk in chunks:
+            if not chunk:
+                continue
+            buffer += chunk
 
-                        if start_idx != -1 and end_idx != -1:
-                            # XML'i söküp al
-                            xml_str = buffer[start_idx : end_idx + len(end_tag)]
+            while True:
+                start = buffer.find(delimiter)
+                if start == -1:
+                    # Boundary'nin yarısı gelmiş olabilir, kuyruğu sakla
+                    del buffer[:max(0, len(buffer) - len(delimiter))]
+                    break
 
-                            # Geri kalanını buffer'da tut
-                            buffer = buffer[end_idx + len(end_tag) :]
+                header_end = buffer.find(b"\r\n\r\n", start)
+                if header_end == -1:
+                    break
 
-                            # Parse et ve yield ile fırlat
-                            data = parse_xml(xml_str)
-                            payload = data.get("EventNotificationAlert", {})
-                            if payload:
-                                yield EventAlert(**payload)
-                        else:
-                            break
+                headers = {}
+                header_block = buffer[start + len(delimiter):header_end].decode("latin-1")
+                for line in header_block.split("\r\n"):
+                    key, sep, value = line.partition(":")
+                    if sep:
+                        headers[key.strip().lower()] = value.strip()
 
-        except Exception as e:
-            print(f"Stream Hatası: {e}")
+                body_start = header_end + 4
+                length = headers.get("content-length")
+                if length and length.isdigit():
+                    body_end = body_start + int(length)
+                    if len(buffer) < body_end:
+                        break
+                else:
+                    next_start = buffer.find(delimiter, body_start)
+                    if next_start == -1:
+                        break
+                    body_end = next_start
+                    # Boundary'den önceki CRLF gövdeye ait değil
+                    if buffer[body_end - 2:body_end] == b"\r\n":
+                        body_end -= 2
+
+                body = bytes(buffer[body_start:body_end])
+                del buffer[:body_end]
+                yield headers, body
+
+    def _iter_multipart_alerts(self, chunks, boundary: bytes) -> Generator[EventAlert, None, None]:
+        last_alert = None
+        for headers, body in self._iter_multipart(chunks, boundary):
+            content_type = headers.get("content-type", "").lower()
+
+            if content_type.startswith("image/"):
+                # Resim, kendisinden önce gelen bildirime aittir
+                if last_alert is not None and last_alert.image is None:
+                    last_alert.image = body
+                continue
+
+            if "json" in content_type:
+                data = parse_json(body)
+                payload = data.get("EventNotificationAlert", data)
+            else:
+                payload = parse_xml(body).get("EventNotificationAlert", {})
+
+            if payload and "eventType" in payload:
+                last_alert = EventAlert(**payload)
+                yield last_alert
+
+    def _iter_xml_alerts(self, chunks) -> Generator[EventAlert, None, None]:
+        """Multipart olmayan (eski firmware) akışlarda XML bloklarını metinden söker."""
+        buffer = ""
+        for chunk in chunks:
+            if not chunk:
+                continue
+
+            buffer += chunk.decode("utf-8", errors="ignore")
+
+            # XML bloğunun sonunu yakala
+            while "</EventNotificationAlert>" in buffer:
+                start_tag = "<EventNotificationAlert"
+                end_tag = "</EventNotificationAlert>"
+
+                start_idx = buffer.find(start_tag)
+                end_idx = buffer.find(end_tag)
+
+                if start_idx != -1 and end_idx != -1:
+                    # XML'i söküp al
+                    xml_str = buffer[start_idx : end_idx + len(end_tag)]
+
+                    # Geri kalanını buffer'da tut
+                    buffer = buffer[end_idx + len(end_tag) :]
+
+                    # Parse et ve yield ile fırlat
+                    data = parse_xml(xml_str)
+                    payload = data.get("EventNotificationAlert", {})
+                    if payload:
+                        yield EventAlert(**payload)
+                else:
+                    break
 
     def _find_working_endpoint(self, channel: int) -> str:
         """Çalışan endpoint'i bulur ve önbelleğe alır."""
@@ -99,9 +183,7 @@ class EventAPI:
         """
         try:
             endpoint = self._find_working_endpoint(channel)
-            response = self._session.request("GET", endpoint)
-
-            data = parse_xml(response)
+            data = self._session.get_document(endpoint)
 
             # Farklı endpointler farklı Root tag dönebilir
             # Genelde: <MotionDetection><enabled>...</enabled></MotionDetection>
@@ -152,4 +234,101 @@ class EventAPI:
             # Hata detayını görmek için gerekirse:
             # import traceback
             # traceback.print_exc()
-            return False
\ No newline at end of file
+            return False
+
+    # --- HAREKET IZGARASI (gridMap) ---
+
+    def _read_motion_document(self, channel: int) -> Tuple[str, dict]:
+        endpoint = self._find_working_endpoint(channel)
+        response = self._session.request("GET", endpoint)
+        text = response if isinstance(response, str) else response.text
+        return endpoint, xmltodict.parse(text, process_namespaces=False)
+
+    @staticmethod
+    def _motion_grid_from(document: dict, channel: int) -> MotionGrid:
+        root = document[next(iter(document))] or {}
+        grid = root.get("Grid") or {}
+        layout = root.get("MotionDetectionLayout") or {}
+        sensitivity = layout.get("sensitivityLevel")
+        return MotionGrid(
+            channel=channel,
+            enabled=str(root.get("enabled")).lower() == "true",
+            sensitivity=int(sensitivity) if sensitivity is not None else None,
+            rows=int(grid.get("rowGranularity") or 18),
+            columns=int(grid.get("columnGranularity") or 22),
+            grid_map=(layout.get("layout") or {}).get("gridMap") or "",
+        )
+
+    def get_motion_grid(self, channel: int = 1) -> MotionGrid:
+        """
+        Hareket algılama ızgarasını, boyutunu ve hassasiyetini okur.
+        Maske için: grid.mask() -> (rows, columns) NumPy bool dizisi
+        """
+        _, document = self._read_motion_document(channel)
+        return self._motion_grid_from(document, channel)
+
+    def set_motion_grid(self, mask, channel: int = 1, sensitivity: int = None, enabled: bool = True,
+                        scale_mode: str = "any") -> bool:
+        """
+        Izgarayı NumPy bool maskesinden ayarlar (Read-Modify-Write).
+        Maske cihazın ızgara boyutundan farklıysa ölçeklenir (bkz: hikvision.grid.scale_grid).
+        Cihazdaki ayar zaten aynıysa PUT atılmaz.
+        """
+        return self._apply_motion_grid(mask, channel, sensitivity, enabled, scale_mode) != "failed"
+
+    def apply_motion_grid(self, masks, channels: Iterable[int] = None, sensitivity: int = None,
+                          enabled: bool = True, scale_mode: str = "any", max_workers: int = 4) -> Dict[int, str]:
+        """
+        Izgarayı birden çok kanala uygular (NVR). Kanal -> unchanged / updated / failed döner.
+
+        :param masks: Tüm kanallar için tek maske veya {kanal: maske}.
+        :param channels: Tek maske verildiyse uygulanacak kanallar.
+        """
+        if isinstance(masks, dict):
+            targets = dict(masks)
+        else:
+            targets = {channel: masks for channel in (channels or [self._session.config.channel])}
+
+        # Çalışan endpoint ilk kanalda bulunur, diğer kanallar önbellekten kullanır
+        first = next(iter(targets), None)
+        if first is not None:
+            try:
+                self._find_working_endpoint(first)
+            except Exception as e:
+                print(f"   ⚠️ VMD Izgara Hatası: {e}")
+                return {channel: "failed" for channel in targets}
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hik-vmd") as executor:
+            futures = {channel: executor.submit(self._apply_motion_grid, mask, channel, sensitivity, enabled, scale_mode)
+                       for channel, mask in targets.items()}
+            return {channel: future.result() for channel, future in futures.items()}
+
+    def _apply_motion_grid(self, mask, channel: int, sensitivity: int, enabled: bool, scale_mode: str) -> str:
+        from ..grid import grid_diff, pack_grid, scale_grid
+
+        try:
+            endpoint, document = self._read_motion_document(channel)
+            current = self._motion_grid_from(document, channel)
+            root = document[next(iter(document))]
+            layout = root.get("MotionDetectionLayout")
+            if not isinstance(layout, dict) or not isinstance(layout.get("layout"), dict):
+                raise ValueError("Cihaz gridMap tabanlı ızgarayı desteklemiyor.")
+
+            new_mask = scale_grid(mask, current.rows, current.columns, scale_mode)
+            if (not grid_diff(current.mask(), new_mask).any()
+                    and current.enabled == enabled
+                    and (sensitivity is None or current.sensitivity == sensitivity)):
+                return "unchanged"
+
+            root["enabled"] = "true" if enabled else "false"
+            if "regionType" in root:
+                root["regionType"] = "grid"
+            layout["layout"]["gridMap"] = pack_grid(new_mask)
+            if sensitivity is not None:
+                layout["sensitivityLevel"] = str(sensitivity)
+
+            response = self._session.request("PUT", endpoint, data=xmltodict.unparse(document))
+            return "updated" if is_success_response(response) else "failed"
+        except Exception as e:
+            print(f"   ❌ VMD Izgara Hatası (kanal {channel}): {e}")
+            return "failed"
@@ -2,103 +2,152 @@ import xmltodict
 from ..core import HikvisionSession
 from ..models.image import TextOverlay, ColorSetup, DayNightMode
 from ..utils import parse_xml, is_success_response
+from typing import Dict, Optional, Tuple
 
 class ImageAPI:
     def __init__(self, session: HikvisionSession):
         self._session = session
         # Image servisi genelde ver10 kullanır, hata alırsak ver20 deneriz
         self.NAMESPACE = "http://www.hikvision.com/ver10/XMLSchema"
+        # Kanal -> OSD metin dokümanı (her güncellemede tekrar okunmaz)
+        self._overlay_cache: Dict[int, dict] = {}
 
     # --- OSD İŞLEMLERİ (Video Service) ---
     
-    # ---- ----- ----- ----- ------ ------ÇALIŞMIYOR----- ----- ----- ----- ---- ----- ------
+    def _load_text_overlays(self, channel: int, refresh: bool = False) -> dict:
+        """
+        Kanalın OSD metin dokümanını önbellekten (yoksa cihazdan) döner.
+        Önce sadece metin satırlarını içeren /overlays/text denenir; desteklemeyen cihazlarda
+        tüm VideoOverlay dokümanı kullanılır.
+        """
+        if not refresh and channel in self._overlay_cache:
+            return self._overlay_cache[channel]
+
+        base = f"/System/Video/inputs/channels/{channel}/overlays"
+        entry = None
+        for endpoint, root_key in ((f"{base}/text", "TextOverlayList"), (base, "VideoOverlay")):
+            try:
+                response = self._session.request("GET", endpoint)
+            except Exception:
+                continue
+            text = response if isinstance(response, str) else response.text
+            data = xmltodict.parse(text, process_namespaces=False)
+            root = data.get(root_key)
+            if root is None:
+                continue
+            if root_key == "TextOverlayList":
+                container = root
+            else:
+                container = root.get("TextOverlayList")
+                if not isinstance(container, dict):
+                    container = root["TextOverlayList"] = {}
+            entry = {"endpoint": endpoint, "document": data, "container": container}
+            break
+
+        if entry is None:
+            raise ValueError(f"Kanal {channel} için OSD dokümanı okunamadı.")
+
+        # Tek eleman varsa listeye çevir (xmltodict özelliği)
+        items = entry["container"].get("TextOverlay")
+        if isinstance(items, dict):
+            entry["container"]["TextOverlay"] = [items]
+        elif not items:
+            # Liste boşsa 8 slotu da doldur (Browser Mimic)
+            entry["container"]["TextOverlay"] = [
+                {"id": str(i), "enabled": "false", "alignment": "0", "positionX": "0", "positionY": "576", "displayText": ""}
+                for i in range(1, 9)
+            ]
+        self._overlay_cache[channel] = entry
+        return entry
+
+    def get_text_overlays(self, channel: int = 1, refresh: bool = False) -> Dict[int, Optional[str]]:
+        """OSD satırları: ID -> metin (kapalı satırlar None). Önbellekten okunur."""
+        entry = self._load_text_overlays(channel, refresh)
+        return {int(item.get("id", 0)): (item.get("displayText") or "") if str(item.get("enabled")).lower() == "true" else None
+                for item in entry["container"]["TextOverlay"]}
+
+    def set_text_overlays(self, lines: Dict[int, Optional[str]], channel: int = 1,
+                          positions: Dict[int, Tuple[int, int]] = None) -> bool:
+        """
+        Birden çok OSD satırını tek PUT ile günceller.
+        lines: ID -> metin (None ise satır kapatılır). positions: ID -> (x, y), None olan eksen değişmez.
+        Cihaz dokümanı önbellekte tutulur; hiçbir satır değişmediyse istek atılmaz.
+        PUT başarısız olursa (doküman başka yerden değişmiş olabilir) cihazdan tekrar okunup bir kez daha denenir.
+        Cihazda olmayan satır ID'si ValueError fırlatır (tekrar denemek anlamsızdır).
+        """
+        return self.write_text_overlays(lines, channel, positions) is not False
+
+    def write_text_overlays(self, lines: Dict[int, Optional[str]], channel: int = 1,
+                            positions: Dict[int, Tuple[int, int]] = None) -> Optional[bool]:
+        """
+        set_text_overlays ile aynı, sonucu ayırt eder:
+        True: PUT gönderildi, None: değişiklik yok (istek atılmadı), False: başarısız.
+        """
+        for attempt in range(2):
+            try:
+                entry = self._load_text_overlays(channel, refresh=attempt > 0)
+                self._check_text_overlay_ids(entry, set(lines) | set(positions or {}))
+                if not self._apply_text_overlays(entry, lines, positions or {}):
+                    return None
+
+                # Satır sırası ve diğer alanlar korunur; pretty print yok (daha küçük gövde)
+                response = self._session.request("PUT", entry["endpoint"], data=xmltodict.unparse(entry["document"]))
+                if is_success_response(response):
+                    return True
+            except ValueError:
+                raise # Doküman okunamadı veya satır yok: önbellek geçerli, tekrar deneme yok
+            except Exception as e:
+                print(f"OSD İşlem Hatası: {e}")
+            self._overlay_cache.pop(channel, None)
+        return False
+
+    @staticmethod
+    def _check_text_overlay_ids(entry: dict, line_ids):
+        available = {int(item.get("id", 0)) for item in entry["container"]["TextOverlay"]}
+        missing = sorted(int(line_id) for line_id in line_ids if int(line_id) not in available)
+        if missing:
+            raise ValueError(f"OSD satırı {missing} cihazda yok (mevcut: {sorted(available)}).")
+
+    @staticmethod
+    def _apply_text_overlays(entry: dict, lines: Dict[int, Optional[str]], positions: Dict[int, Tuple[int, int]]) -> bool:
+        """Önbellekteki dokümanı günceller. Değişiklik olduysa True."""
+        items = {int(item.get("id", 0)): item for item in entry["container"]["TextOverlay"]}
+        changed = False
+        for line_id in set(lines) | set(positions):
+            item = items[int(line_id)]
+
+            values = {}
+            if line_id in lines:
+                text = lines[line_id]
+                values["enabled"] = "false" if text is None else "true"
+                if text is not None:
+                    values["displayText"] = text
+            if line_id in positions:
+                x, y = positions[line_id]
+                if x is not None:
+                    values["positionX"] = str(x)
+                if y is not None:
+                    values["positionY"] = str(y)
+
+            for key, value in values.items():
+                if (item.get(key) or "") != value:
+                    item[key] = value
+                    changed = True
+            # Hizalama (Alignment) XML'de yoksa varsayılan 0
+            item.setdefault("alignment", "0")
+        return changed
+
     def set_text_overlay(self, message: str, id: int = 1, x: int = None, y: int = None, enabled: bool = True, channel: int = 1) -> bool:
         """
-        OSD Metnini günceller.
-        Liste boşsa 1-8 arası tüm slotları oluşturur (Browser Mimic).
+        Tek OSD satırını günceller. Bkz: set_text_overlays
         """
-        endpoint = f"/System/Video/inputs/channels/{channel}/overlays"
-        
+        positions = {id: (x, y)} if x is not None or y is not None else None
         try:
-            # 1. OKU (READ)
-            response = self._session.request("GET", endpoint)
-            
-            # Namespace'leri korumadan parse et (daha kolay yönetim için)
-            data = xmltodict.parse(response.text, process_namespaces=False)
-            
-            # --- GÜVENLİ VERİ ÇEKME ---
-            video_overlay = data.get('VideoOverlay')
-            if not video_overlay:
-                print("Hata: 'VideoOverlay' bulunamadı.")
-                return False
-            
-            # TextOverlayList'i al veya oluştur
-            text_list_container = video_overlay.get('TextOverlayList')
-            if text_list_container is None:
-                text_list_container = {}
-                video_overlay['TextOverlayList'] = text_list_container
-
-            overlays_list = text_list_container.get('TextOverlay')
-            
-            # --- STRATEJİ: LİSTE BOŞSA 8 SLOTU DA DOLDUR ---
-            if not overlays_list:
-                print(f"ℹ️ Bilgi: OSD listesi boş. Tarayıcı standardına uygun 8 slot oluşturuluyor...")
-                overlays_list = []
-                
-                for i in range(1, 9): # ID 1'den 8'e kadar
-                    # Varsayılan boş kayıt
-                    item = {
-                        'id': str(i),
-                        'enabled': 'false',
-                        'alignment': '0',       # Hizalama (Sıralama önemli)
-                        'positionX': '0',
-                        'positionY': '576',     # Genelde alt köşe
-                        'displayText': ''
-                    }
-                    overlays_list.append(item)
-                
-                # Listeyi ana yapıya bağla
-                text_list_container['TextOverlay'] = overlays_list
-
-            # Tek eleman varsa listeye çevir (xmltodict özelliği)
-            if isinstance(overlays_list, dict):
-                overlays_list = [overlays_list]
-                text_list_container['TextOverlay'] = overlays_list # Referansı güncelle
-
-            # --- HEDEFİ BUL VE GÜNCELLE ---
-            target_overlay = next((item for item in overlays_list if int(item.get('id', 0)) == id), None)
-            
-            if not target_overlay:
-                print(f"Hata: ID {id} oluşturulan listede bile bulunamadı!")
-                return False
-            
-            # Değerleri yaz (Sıralama dict içinde zaten oluştu)
-            target_overlay['displayText'] = message
-            target_overlay['enabled'] = 'true' if enabled else 'false'
-            
-            # Koordinat varsa güncelle
-            if x is not None: target_overlay['positionX'] = str(x)
-            if y is not None: target_overlay['positionY'] = str(y)
-            
-            # Hizalama (Alignment) manuel girilmediyse ve XML'de yoksa varsayılan 0
-            if 'alignment' not in target_overlay:
-                target_overlay['alignment'] = '0'
-
-            # 3. YAZ (WRITE)
-            new_xml = xmltodict.unparse(data, pretty=True)
-            
-            # Debug için gerekirse: 
-            # print(f"GİDEN XML:\n{new_xml}")
-            
-            response_put = self._session.request("PUT", endpoint, data=new_xml)
-            return is_success_response(response_put)
-            
-        except Exception as e:
+            return self.set_text_overlays({id: message if enabled else None}, channel, positions)
+        except ValueError as e:
             print(f"OSD İşlem Hatası: {e}")
-            if 'response_put' in locals():
-                print(f"Detay: {response_put.text}")
             return False
-                
+
     def get_color_settings(self, channel: int = 1) -> ColorSetup:
         """
         Mevcut parlaklık/kontrast değerlerini çeker.
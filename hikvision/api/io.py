@@ -1,7 +1,8 @@
 from typing import List
 from ..core import HikvisionSession
 from ..models.io import IOPortStatus
-from ..utils import parse_xml, is_success_response
+from ..scheduler import INTERACTIVE
+from ..utils import is_success_response, unwrap_list
 
 class IOAPI:
     def __init__(self, session: HikvisionSession):
@@ -41,15 +42,11 @@ class IOAPI:
         base = self._get_base_url()
         endpoint = f"{base}/status"
         
-        response = self._session.request("GET", endpoint)
+        data = self._session.get_document(endpoint)
         
-        data = parse_xml(response)
-        
-        # <IOPortStatusList><IOPortStatus>...</IOPortStatus></IOPortStatusList>
-        ports_data = data.get("IOPortStatusList", {}).get("IOPortStatus", [])
-        
-        if isinstance(ports_data, dict):
-            ports_data = [ports_data]
+        # XML:  <IOPortStatusList><IOPortStatus>...</IOPortStatus></IOPortStatusList>
+        # JSON: {"IOPortStatusList": [{"IOPortStatus": {...}}]}
+        ports_data = unwrap_list(data.get("IOPortStatusList"), "IOPortStatus")
             
         return [IOPortStatus(**p) for p in ports_data]
 
@@ -67,5 +64,5 @@ class IOAPI:
     <outputState>{state}</outputState>
 </IOPortData>"""
         
-        response = self._session.request("PUT", endpoint, data=xml_body)
+        response = self._session.request("PUT", endpoint, data=xml_body, priority=INTERACTIVE)
         return is_success_response(response)
\ No newline at end of file
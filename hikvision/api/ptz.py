@@ -1,7 +1,9 @@
 from ..core import HikvisionSession
-from ..models.ptz import PTZRegion, PresetData, PTZAuxCommand
-from ..utils import is_success_response
-from typing import Union
+from ..models.ptz import PTZRegion, PresetData, PTZAuxCommand, PTZMoveCommand, PTZPosition, PTZStatus, PTZPreset
+from ..scheduler import INTERACTIVE
+from ..utils import is_success_response, unwrap_list
+from typing import Dict, List, Optional, Union
+import time
 
 class PTZAPI:
     def __init__(self, session: HikvisionSession):
@@ -9,11 +11,17 @@ class PTZAPI:
         self.INVERT_Y_AXIS = True
         # PTZ Servisi genelde ver20 (ISAPI) ister
         self.NAMESPACE = "http://www.isapi.org/ver20/XMLSchema"
+        # Kanal -> son okunan konum (get_status her çağrıldığında güncellenir)
+        self.position_cache: Dict[int, PTZStatus] = {}
 
-    def _get_url(self, endpoint_suffix: str) -> str:
-        return f"/PTZCtrl/channels/{self._session.config.channel}/{endpoint_suffix}"
+    def _channel(self, channel: Optional[int]) -> int:
+        return channel if channel is not None else self._session.config.channel
 
-    def zoom_3d(self, start_x: int, start_y: int, end_x: int, end_y: int, width: int = 1920, height: int = 1080, invert_y: bool = True) -> bool:
+    def _get_url(self, endpoint_suffix: str, channel: int = None) -> str:
+        channel = channel if channel is not None else self._session.config.channel
+        return f"/PTZCtrl/channels/{channel}/{endpoint_suffix}"
+
+    def zoom_3d(self, start_x: int, start_y: int, end_x: int, end_y: int, width: int = 1920, height: int = 1080, invert_y: bool = True, channel: int = None) -> bool:
         """
         Pixel koordinatlarını alır, 0-255 formatına çevirir ve 3D Zoom yapar.
         
@@ -35,11 +43,18 @@ class PTZAPI:
             ey_255 = 255 - ey_255
 
         # 3. Değerlerin 0-255 dışına taşmamasını garanti et
-        sx = max(0, min(sx_255, 255))
-        sy = max(0, min(sy_255, 255))
-        ex = max(0, min(ex_255, 255))
-        ey = max(0, min(ey_255, 255))
+        region = PTZRegion(
+            start_x=max(0, min(sx_255, 255)),
+            start_y=max(0, min(sy_255, 255)),
+            end_x=max(0, min(ex_255, 255)),
+            end_y=max(0, min(ey_255, 255)),
+        )
+        return self.zoom_to_region(region, channel=channel)
 
+    def zoom_to_region(self, region: PTZRegion, channel: int = None) -> bool:
+        """
+        0-255 koordinatlarındaki bölgeye 3D Zoom yapar (position3D).
+        """
         # XML Oluşturma
         # Senin kodunda namespace yoktu, burada da sadelik için namespace'siz denenebilir
         # ama ISAPI standardı genelde namespace ister. Şimdilik senin koduna sadık kalarak
@@ -47,16 +62,17 @@ class PTZAPI:
         
         xml_body = f"""<position3D version="2.0" xmlns="{self.NAMESPACE}">
     <StartPoint>
-        <positionX>{sx}</positionX>
-        <positionY>{sy}</positionY>
+        <positionX>{region.start_x}</positionX>
+        <positionY>{region.start_y}</positionY>
     </StartPoint>
     <EndPoint>
-        <positionX>{ex}</positionX>
-        <positionY>{ey}</positionY>
+        <positionX>{region.end_x}</positionX>
+        <positionY>{region.end_y}</positionY>
     </EndPoint>
 </position3D>"""
 
-        endpoint = f"/PTZCtrl/channels/{self._session.config.channel}/position3D"
+        channel = self._channel(channel)
+        endpoint = f"/PTZCtrl/channels/{channel}/position3D"
         
         # Senin kodunda 'X-Requested-With' header'ı vardı. 
         # Bunu session seviyesinde değil, sadece bu istek için ekleyebiliriz.
@@ -66,23 +82,46 @@ class PTZAPI:
         }
 
         try:
-            response = self._session.request("PUT", endpoint, data=xml_body, headers=headers)
+            response = self._session.request("PUT", endpoint, data=xml_body, headers=headers, priority=INTERACTIVE)
+            self.position_cache.pop(channel, None)
             return is_success_response(response)
         except Exception as e:
             print(f"3D Zoom Hatası: {e}")
             return False
 
-    def goto_preset(self, preset_id: int) -> bool:
+    def set_absolute_position(self, position: PTZPosition, channel: int = None) -> bool:
+        """
+        Kamerayı mutlak konuma (derece/zoom) gönderir.
+        Ref: ISAPI PDF Section 8.13.6 (absolute)
+        """
+        channel = self._channel(channel)
+        absolute = position.to_absolute_high()
+        xml_body = f"""<PTZData version="2.0" xmlns="{self.NAMESPACE}">
+    <AbsoluteHigh>
+        <elevation>{absolute["elevation"]}</elevation>
+        <azimuth>{absolute["azimuth"]}</azimuth>
+        <absoluteZoom>{absolute["absoluteZoom"]}</absoluteZoom>
+    </AbsoluteHigh>
+</PTZData>"""
+        response = self._session.request("PUT", self._get_url("absolute", channel), data=xml_body, priority=INTERACTIVE)
+        self.position_cache.pop(channel, None)
+        return is_success_response(response)
+
+    def goto_preset(self, preset_id: int, channel: int = None) -> bool:
         """
         Ön tanımlı noktaya (Preset) gitme.
+        Komut hemen döner, varışı beklemek için wait_until_settled kullanılır.
         """
         validated_data = PresetData(preset_id=preset_id)
-        endpoint = f"/PTZCtrl/channels/{self._session.config.channel}/presets/{validated_data.preset_id}/goto"
+        channel = self._channel(channel)
+        endpoint = f"/PTZCtrl/channels/{channel}/presets/{validated_data.preset_id}/goto"
         
-        response = self._session.request("PUT", endpoint, data=None)
+        response = self._session.request("PUT", endpoint, data=None, priority=INTERACTIVE)
+        # Kamera hareket edecek, eski konum artık geçerli değil
+        self.position_cache.pop(channel, None)
         return is_success_response(response)
     
-    def aux_control(self, command: Union[PTZAuxCommand, str], enable: bool = True) -> bool:
+    def aux_control(self, command: Union[PTZAuxCommand, str], enable: bool = True, channel: int = None) -> bool:
         """
         PTZ Yardımcı donanımlarını kontrol eder.
         
@@ -99,7 +138,7 @@ class PTZAPI:
 
         # Komutun sonuna _PWRON ekle
         cmd_str = f"{cmd_value.upper()}_PWRON"
-        endpoint = f"/PTZCtrl/channels/{self._session.config.channel}/auxcontrol?command={cmd_str}"
+        endpoint = self._get_url(f"auxcontrol?command={cmd_str}", channel)
         
         # AuxStatus genelde ver10 kullanır ama hata verirse ver20 deneriz
         # Şimdilik PTZ genelinde ver20 kabul ettik, deneyelim.
@@ -108,22 +147,140 @@ class PTZAPI:
     <enabled>{str(enable).lower()}</enabled>
 </PTZAuxStatus>"""
         
-        response = self._session.request("PUT", endpoint, data=xml_body)
+        response = self._session.request("PUT", endpoint, data=xml_body, priority=INTERACTIVE)
         return is_success_response(response)
     
-    def one_push_focus(self) -> bool:
+    def one_push_focus(self, channel: int = None) -> bool:
         """
         Tek tuşla otomatik odaklama.
         """
         # Dokümanda onepushfocus yazıyor, hata verirse focus->focus
-        endpoint = f"/PTZCtrl/channels/{self._session.config.channel}/onepushfocus/start"
-        response = self._session.request("PUT", endpoint)
+        endpoint = self._get_url("onepushfocus/start", channel)
+        response = self._session.request("PUT", endpoint, priority=INTERACTIVE)
         return is_success_response(response)
 
-    def reset_lens(self) -> bool:
+    def reset_lens(self, channel: int = None) -> bool:
         """
         Lens motorunu sıfırla.
         """
-        endpoint = f"/PTZCtrl/channels/{self._session.config.channel}/onepushfocus/reset"
-        response = self._session.request("PUT", endpoint)
-        return is_success_response(response)
\ No newline at end of file
+        endpoint = self._get_url("onepushfocus/reset", channel)
+        response = self._session.request("PUT", endpoint, priority=INTERACTIVE)
+        return is_success_response(response)
+
+    # --- SÜREKLİ HAREKET (Joystick) ---
+
+    def continuous_move(self, pan: int = 0, tilt: int = 0, zoom: int = 0, channel: int = None, timeout: float = 10) -> bool:
+        """
+        Kamerayı verilen hızda hareket ettirir, yeni komut (veya stop) gelene kadar devam eder.
+        pan/tilt/zoom: -100..100 arası hız. Hepsi 0 ise hareket durur.
+        Ref: ISAPI PDF Section 8.13.4
+        """
+        command = PTZMoveCommand(pan=pan, tilt=tilt, zoom=zoom)
+        xml_body = f"""<PTZData version="2.0" xmlns="{self.NAMESPACE}">
+    <pan>{command.pan}</pan>
+    <tilt>{command.tilt}</tilt>
+    <zoom>{command.zoom}</zoom>
+</PTZData>"""
+        response = self._session.request("PUT", self._get_url("continuous", channel), data=xml_body, timeout=timeout, priority=INTERACTIVE)
+        return is_success_response(response)
+
+    def momentary_move(self, pan: int = 0, tilt: int = 0, zoom: int = 0, duration_ms: int = 500, channel: int = None, timeout: float = 10) -> bool:
+        """
+        Kamerayı verilen süre (ms) boyunca hareket ettirir, sonra kendisi durur.
+        Ref: ISAPI PDF Section 8.13.5
+        """
+        command = PTZMoveCommand(pan=pan, tilt=tilt, zoom=zoom)
+        xml_body = f"""<PTZData version="2.0" xmlns="{self.NAMESPACE}">
+    <pan>{command.pan}</pan>
+    <tilt>{command.tilt}</tilt>
+    <zoom>{command.zoom}</zoom>
+    <Momentary>
+        <duration>{int(duration_ms)}</duration>
+    </Momentary>
+</PTZData>"""
+        response = self._session.request("PUT", self._get_url("momentary", channel), data=xml_body, timeout=timeout, priority=INTERACTIVE)
+        return is_success_response(response)
+
+    def stop(self, channel: int = None, timeout: float = 10) -> bool:
+        """Sürekli hareketi durdurur."""
+        return self.continuous_move(0, 0, 0, channel=channel, timeout=timeout)
+
+    # --- KONUM VE PRESET BİLGİSİ ---
+
+    def get_status(self, channel: int = None) -> PTZStatus:
+        """
+        Kameranın anlık mutlak konumunu okur ve önbelleğe yazar.
+        Ref: ISAPI PDF Section 8.13.9
+        """
+        channel = self._channel(channel)
+        data = self._session.get_document(self._get_url("status", channel))
+        root = data.get("PTZStatus", {})
+
+        status = PTZStatus(
+            channel=channel,
+            position=PTZPosition.from_absolute_high(root.get("AbsoluteHigh") or {}),
+            read_at=time.monotonic(),
+        )
+        self.position_cache[channel] = status
+        return status
+
+    def get_cached_position(self, channel: int = None, max_age: float = None) -> Optional[PTZPosition]:
+        """
+        Son bilinen konumu istek atmadan döner.
+        max_age verilirse daha eski kayıtlar yok sayılır.
+        """
+        status = self.position_cache.get(self._channel(channel))
+        if status is None:
+            return None
+        if max_age is not None and time.monotonic() - status.read_at > max_age:
+            return None
+        return status.position
+
+    def get_presets(self, channel: int = None) -> List[PTZPreset]:
+        """
+        Kanaldaki presetleri listeler. Firmware destekliyorsa konumları da gelir.
+        Ref: ISAPI PDF Section 8.13.1
+        """
+        data = self._session.get_document(self._get_url("presets", channel))
+        presets = []
+        for item in unwrap_list(data.get("PTZPresetList"), "PTZPreset"):
+            absolute = item.get("AbsoluteHigh")
+            presets.append(PTZPreset(
+                id=int(item.get("id")),
+                name=item.get("presetName"),
+                position=PTZPosition.from_absolute_high(absolute) if absolute else None,
+            ))
+        return presets
+
+    def wait_until_settled(self, target: PTZPosition = None, tolerance: float = 0.5, timeout: float = 15,
+                           poll_interval: float = 0.25, channel: int = None, start: PTZPosition = None,
+                           motion_grace: float = 2.0) -> Optional[PTZStatus]:
+        """
+        Sabit uyku yerine status okuyarak kameranın varışını bekler.
+        - target verildiyse konum tolerans (derece) içine girince döner.
+        - Verilmediyse art arda iki okuma aynı olunca (hareket bitti) döner.
+          start (komuttan önceki konum) verilirse kural ancak konum start'tan ayrıldıktan sonra
+          uygulanır: komuttan hemen sonra motor henüz kalkmamışken eski konum "varış" sayılmaz.
+          motion_grace saniye içinde hareket başlamazsa kamera zaten hedefte kabul edilir.
+        Süre dolarsa None döner.
+        """
+        begin = time.monotonic()
+        deadline = begin + timeout
+        previous = None
+        moved = start is None
+        while True:
+            status = self.get_status(channel)
+            position = status.position
+            if not moved:
+                moved = (position.distance_to(start) > 0.05 or abs(position.zoom - start.zoom) >= 0.05
+                         or time.monotonic() - begin >= motion_grace)
+            if target is not None:
+                if position.distance_to(target) <= tolerance:
+                    return status
+            elif moved and previous is not None and position.distance_to(previous) <= 0.05 and abs(position.zoom - previous.zoom) < 0.05:
+                return status
+            previous = position
+
+            if time.monotonic() + poll_interval > deadline:
+                return None
+            time.sleep(poll_interval)
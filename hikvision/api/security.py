@@ -1,9 +1,11 @@
-from typing import List
+from typing import List, Optional
 from ..core import HikvisionSession
 from ..models.security import User
 from ..utils import parse_xml
 from ..utils import is_success_response
 import xmltodict
+import requests
+import re
 
 class SecurityAPI:
     def __init__(self, session: HikvisionSession):
@@ -72,9 +74,10 @@ class SecurityAPI:
         response = self._session.request("DELETE", endpoint)
         return is_success_response(response)
     
-    def change_password(self, user_id: int, new_password: str) -> bool:
+    def change_password(self, user_id: int, new_password: str, login_password: str = None) -> bool:
         """
         Mevcut kullanıcının şifresini değiştirir.
+        login_password: Yeni firmware'ler admin şifresi değişirken mevcut şifreyi de ister.
         Ref: ISAPI PDF Section 8.8.2 (PUT) [cite: 1312]
         """
         endpoint = f"/Security/users/{user_id}"
@@ -85,9 +88,40 @@ class SecurityAPI:
         
         if "User" in data:
             data["User"]["password"] = new_password
+            if login_password is not None:
+                data["User"]["loginPassword"] = login_password
             
             new_xml = xmltodict.unparse(data, pretty=True)
             put_response = self._session.request("PUT", endpoint, data=new_xml)
             return is_success_response(put_response)
             
-        return False
\ No newline at end of file
+        return False
+
+    def check_credentials(self) -> bool:
+        """
+        Oturumdaki kullanıcı adı/şifrenin geçerliliğini en ucuz yetkili istekle kontrol eder.
+        Şifre yanlışsa False döner; hesap kilitliyse veya başka bir hata varsa istisna fırlatır.
+        Ref: ISAPI PDF Section 8.8.5 (userCheck)
+        """
+        try:
+            # Cevap ResponseStatus değil userCheck bloğudur; 2xx dönmesi yeterli
+            self._session.request("GET", "/Security/userCheck")
+            return True
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 401 and not is_lockout_response(e.response):
+                return False
+            raise
+
+
+def is_lockout_response(response) -> bool:
+    """Cihazın çok sayıda hatalı giriş nedeniyle IP/kullanıcıyı kilitlediğini belirten cevap mı?"""
+    if response is None or response.status_code not in (401, 403):
+        return False
+    text = response.text.lower()
+    return "userlocked" in text or "<lockstatus>lock" in text or "unlocktime" in text
+
+
+def lockout_seconds(response) -> Optional[int]:
+    """Kilitli cevabındaki kalan kilit süresi (sn), yoksa None."""
+    match = re.search(r"<unlockTime>(\d+)</unlockTime>", response.text if response is not None else "")
+    return int(match.group(1)) if match else None
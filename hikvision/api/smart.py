@@ -0,0 +1,218 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import xmltodict
+
+from ..core import HikvisionSession
+from ..models.event import SmartRegion
+from ..models.streaming import StreamingChannel
+from ..utils import is_success_response
+
+_SmartEvent = namedtuple("_SmartEvent", "endpoint root list_tag item_tag coords_list_tag coords_tag min_vertices max_vertices")
+
+# Ref: ISAPI PDF Section 15 (Smart): LineDetection, FieldDetection, regionEntrance, regionExiting
+SMART_EVENTS = {
+    "linedetection": _SmartEvent("/Smart/LineDetection/{channel}", "LineDetection", "LineItemList", "LineItem",
+                                 "CoordinatesList", "Coordinates", 2, 2),
+    "fielddetection": _SmartEvent("/Smart/FieldDetection/{channel}", "FieldDetection", "FieldDetectionRegionList",
+                                  "FieldDetectionRegion", "RegionCoordinatesList", "RegionCoordinates", 3, 10),
+    "regionentrance": _SmartEvent("/Smart/regionEntrance/{channel}", "RegionEntrance", "RegionEntranceRegionList",
+                                  "RegionEntranceRegion", "RegionCoordinatesList", "RegionCoordinates", 3, 10),
+    "regionexiting": _SmartEvent("/Smart/regionExiting/{channel}", "RegionExiting", "RegionExitingRegionList",
+                                 "RegionExitingRegion", "RegionCoordinatesList", "RegionCoordinates", 3, 10),
+}
+
+
+class SmartAPI:
+    """
+    Akıllı olay (VCA) bölgeleri: çizgi geçme, alan ihlali, bölgeye giriş/çıkış.
+
+    Bölgeler piksel koordinatlarında verilir; tüm kanalların tüm çokgenleri tek NumPy dizisinde
+    cihaz koordinatına (0-1000, Y ters) çevrilip doğrulanır. Sadece değişen bölgeler düzenlenir,
+    değişikliği olmayan kanala PUT atılmaz.
+    """
+
+    def __init__(self, session: HikvisionSession):
+        self._session = session
+
+    @staticmethod
+    def _spec(event: str) -> _SmartEvent:
+        spec = SMART_EVENTS.get(event.lower())
+        if spec is None:
+            raise ValueError(f"Desteklenmeyen akıllı olay: {event} (desteklenenler: {', '.join(SMART_EVENTS)})")
+        return spec
+
+    def _read(self, spec: _SmartEvent, channel: int) -> Tuple[str, dict]:
+        endpoint = spec.endpoint.format(channel=channel)
+        response = self._session.request("GET", endpoint)
+        text = response if isinstance(response, str) else response.text
+        document = xmltodict.parse(text, process_namespaces=False)
+        if not isinstance(document.get(spec.root), dict):
+            raise ValueError(f"Kanal {channel} {spec.root} desteklemiyor.")
+        return endpoint, document
+
+    @staticmethod
+    def _items(spec: _SmartEvent, root: dict) -> List[dict]:
+        """Bölge listesini (tek elemanlıysa da) liste olarak döner, dokümanda da liste olarak saklar."""
+        container = root.get(spec.list_tag)
+        if not isinstance(container, dict) or container.get(spec.item_tag) is None:
+            return []
+        items = container[spec.item_tag]
+        if not isinstance(items, list):
+            items = container[spec.item_tag] = [items]
+        return items
+
+    @staticmethod
+    def _screen(root: dict) -> Tuple[int, int]:
+        size = root.get("normalizedScreenSize") or {}
+        return int(size.get("normalizedScreenWidth") or 1000), int(size.get("normalizedScreenHeight") or 1000)
+
+    @staticmethod
+    def _coordinates(spec: _SmartEvent, item: dict) -> List[Tuple[int, int]]:
+        coords = (item.get(spec.coords_list_tag) or {}).get(spec.coords_tag) or []
+        if isinstance(coords, dict):
+            coords = [coords]
+        return [(int(c["positionX"]), int(c["positionY"])) for c in coords]
+
+    def get_resolution(self, channel: int = 1) -> Tuple[int, int]:
+        """Kanalın ana akış çözünürlüğü (piksel koordinatlarının referansı)."""
+        data = self._session.get_document(f"/Streaming/channels/{channel * 100 + 1}")
+        stream = StreamingChannel(**data.get("StreamingChannel", {}))
+        return stream.video.resolution_width, stream.video.resolution_height
+
+    def get_regions(self, event: str, channel: int = 1) -> List[SmartRegion]:
+        """Olayın bölgelerini cihaz koordinatlarıyla okur (piksel için: hikvision.geometry.from_normalized)."""
+        spec = self._spec(event)
+        _, document = self._read(spec, channel)
+        root = document[spec.root]
+        regions = []
+        for item in self._items(spec, root):
+            sensitivity = item.get("sensitivityLevel")
+            threshold = item.get("timeThreshold")
+            regions.append(SmartRegion(
+                event=event.lower(), channel=channel, id=int(item["id"]),
+                enabled=str(item.get("enabled", "true")).lower() == "true",
+                sensitivity=int(sensitivity) if sensitivity is not None else None,
+                points=self._coordinates(spec, item),
+                direction=item.get("directionSensitivity"),
+                time_threshold=int(threshold) if threshold is not None else None,
+            ))
+        return regions
+
+    def set_regions(self, event: str, polygons: Dict[int, list], channel: int = 1, **kwargs) -> Dict[int, str]:
+        """Tek kanalın bölgelerini ayarlar. {bölge ID: [(x, y), ...]} piksel. Bkz: apply_regions"""
+        return self.apply_regions(event, {channel: polygons}, **kwargs).get(channel, {})
+
+    def apply_regions(self, event: str, layout: Dict[int, Dict[int, list]], width: float = None, height: float = None,
+                      invert_y: bool = True, sensitivity: int = None, enabled: bool = True,
+                      max_workers: int = 4) -> Dict[int, Dict[int, str]]:
+        """
+        Birden çok kanalın bölgelerini piksel çokgenlerinden ayarlar.
+        Kanal -> {bölge ID: unchanged / updated / invalid / failed} döner.
+
+        :param layout: {kanal: {bölge ID: [(x, y), ...]}} (çizgi için 2 nokta, alan için 3-10 köşe).
+        :param width/height: Çokgenlerin çizildiği görüntü boyutu. Verilmezse kanalın akış çözünürlüğü okunur.
+        :param invert_y: Cihaz Y ekseni aşağıdan yukarıdır (Hikvision varsayılanı).
+        """
+        import numpy as np
+        from ..geometry import pack_polygons, split_polygons, to_normalized, validate_polygons
+
+        spec = self._spec(event)
+        results: Dict[int, Dict[int, str]] = {channel: {} for channel in layout}
+
+        # 1. Kanal dokümanlarını (ve gerekirse çözünürlükleri) paralel oku
+        def read(channel: int):
+            endpoint, document = self._read(spec, channel)
+            size = (width, height) if width and height else self.get_resolution(channel)
+            return endpoint, document, size
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hik-smart") as executor:
+            futures = {channel: executor.submit(read, channel) for channel in layout}
+            loaded = {}
+            for channel, future in futures.items():
+                try:
+                    loaded[channel] = future.result()
+                except Exception as e:
+                    print(f"   ❌ Akıllı olay okuma hatası (kanal {channel}): {e}")
+                    results[channel] = {region_id: "failed" for region_id in layout[channel]}
+
+        # 2. Tüm çokgenleri tek seferde dönüştür ve doğrula
+        keys, polygons, sizes, screens = [], [], [], []
+        for channel, (_, document, size) in loaded.items():
+            screen = self._screen(document[spec.root])
+            for region_id, polygon in layout[channel].items():
+                keys.append((channel, int(region_id)))
+                polygons.append(polygon)
+                sizes.append(size)
+                screens.append(screen)
+
+        points, offsets = pack_polygons(polygons)
+        counts = np.diff(offsets)
+        per_point = lambda values: np.repeat(np.asarray(values, dtype=float).reshape(-1, 2), counts, axis=0)
+        size_arr, screen_arr = per_point(sizes), per_point(screens)
+        scale = (screen_arr[:, 0], screen_arr[:, 1]) # Kanal başına normalizedScreenSize, köşe başına yayılmış
+        device_points = to_normalized(points, size_arr[:, 0], size_arr[:, 1], scale, invert_y)
+        errors = validate_polygons(device_points, offsets, scale, spec.min_vertices, spec.max_vertices)
+
+        changes: Dict[int, Dict[int, np.ndarray]] = {channel: {} for channel in loaded}
+        for (channel, region_id), coords, error in zip(keys, split_polygons(device_points, offsets), errors):
+            if error:
+                print(f"   ⚠️ Geçersiz bölge (kanal {channel}, bölge {region_id}): {error}")
+                results[channel][region_id] = "invalid"
+            else:
+                changes[channel][region_id] = coords
+
+        # 3. Değişen bölgeleri düzenle, sadece değişen kanallara PUT at
+        def push(channel: int):
+            endpoint, document, _ = loaded[channel]
+            return self._push(spec, endpoint, document, changes[channel], sensitivity, enabled)
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hik-smart") as executor:
+            futures = {channel: executor.submit(push, channel) for channel in loaded if changes[channel]}
+            for channel, future in futures.items():
+                results[channel].update(future.result())
+        return results
+
+    def _push(self, spec: _SmartEvent, endpoint: str, document: dict, regions: Dict[int, list],
+              sensitivity: Optional[int], enabled: bool) -> Dict[int, str]:
+        root = document[spec.root]
+        items = {int(item["id"]): item for item in self._items(spec, root)}
+        statuses: Dict[int, str] = {}
+
+        for region_id, coords in regions.items():
+            item = items.get(region_id)
+            if item is None:
+                print(f"   ⚠️ Cihazda bölge {region_id} yok ({spec.root}).")
+                statuses[region_id] = "failed"
+                continue
+
+            new_points = [(int(x), int(y)) for x, y in coords]
+            same = (self._coordinates(spec, item) == new_points
+                    and str(item.get("enabled", "true")).lower() == str(enabled).lower()
+                    and (sensitivity is None or str(item.get("sensitivityLevel")) == str(sensitivity)))
+            if same:
+                statuses[region_id] = "unchanged"
+                continue
+
+            item["enabled"] = "true" if enabled else "false"
+            if sensitivity is not None:
+                item["sensitivityLevel"] = str(sensitivity)
+            item[spec.coords_list_tag] = {spec.coords_tag: [{"positionX": x, "positionY": y} for x, y in new_points]}
+            statuses[region_id] = "updated"
+
+        updated = [region_id for region_id, status in statuses.items() if status == "updated"]
+        if not updated:
+            return statuses
+
+        if enabled and "enabled" in root:
+            root["enabled"] = "true"
+        try:
+            response = self._session.request("PUT", endpoint, data=xmltodict.unparse(document))
+            ok = is_success_response(response)
+        except Exception as e:
+            print(f"   ❌ Akıllı olay yazma hatası ({endpoint}): {e}")
+            ok = False
+        if not ok:
+            statuses.update({region_id: "failed" for region_id in updated})
+        return statuses
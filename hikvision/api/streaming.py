@@ -1,7 +1,10 @@
+import io
 import xmltodict
 from ..core import HikvisionSession
+from ..media.mjpeg import MJPEGFrameIterator
+from ..media.rtsp import RTSPClient
 from ..models.streaming import StreamingChannel
-from ..utils import parse_xml, is_success_response
+from ..utils import is_success_response, get_multipart_boundary
 
 class StreamingAPI:
     def __init__(self, session: HikvisionSession):
@@ -11,13 +14,56 @@ class StreamingAPI:
     def get_channel_info(self, channel: int = 101) -> StreamingChannel:
         """Kanalın tüm yayın ayarlarını çeker."""
         endpoint = f"/Streaming/channels/{channel}"
-        response = self._session.request("GET", endpoint)
-        data = parse_xml(response)
+        data = self._session.get_document(endpoint)
         return StreamingChannel(**data.get("StreamingChannel", {}))
 
-    def get_snapshot(self, channel: int = 101) -> bytes:
+    def get_snapshot(self, channel: int = 101, timeout: float = 10) -> bytes:
         endpoint = f"/Streaming/channels/{channel}/picture"
-        return self._session.request_binary("GET", endpoint)
+        return self._session.request_binary("GET", endpoint, timeout=timeout)
+
+    def open_preview(self, channel: int = 102, max_fps: float = None, drop_stale: bool = True,
+                     timeout: float = 30, **kwargs) -> MJPEGFrameIterator:
+        """
+        Kanalın multipart HTTP önizleme (MJPEG) akışını açar, kare iteratörü döner.
+        Tek bağlantı ve tek kimlik doğrulama ile sürekli kare alınır (get_snapshot'ın aksine).
+        Akış alt akışta (102) MJPEG kodlaması açık olmalıdır.
+
+        :param max_fps: Tüketiciye verilecek en yüksek kare hızı.
+        :param drop_stale: Tüketici yavaşsa buffer'daki eski kareleri atla.
+        :param timeout: Kareler arası en uzun bekleme (sn).
+        """
+        endpoint = f"/Streaming/channels/{channel}/httpPreview"
+
+        if self._session.mock_mode:
+            self._session.logger.warning(f"[MOCK STREAM] GET {endpoint}")
+            frame = self._session.request_binary("GET", f"/Streaming/channels/{channel}/picture")
+            body = b"--boundary\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n%s\r\n" % (len(frame), frame)
+            return MJPEGFrameIterator(io.BytesIO(body), b"boundary", max_fps=max_fps, drop_stale=drop_stale, **kwargs)
+
+        response = self._session.request("GET", endpoint, stream=True, timeout=(10, timeout))
+        try:
+            boundary = get_multipart_boundary(response.headers.get("Content-Type", ""))
+            if boundary is None:
+                raise ValueError(f"Önizleme akışı multipart değil: {response.headers.get('Content-Type')}")
+        except Exception:
+            response.close()
+            raise
+
+        return MJPEGFrameIterator(response.raw, boundary, max_fps=max_fps, drop_stale=drop_stale,
+                                  on_close=response.close, **kwargs)
+
+    def open_rtsp(self, channel: int = 101, rtsp_port: int = 554, **kwargs) -> RTSPClient:
+        """
+        Kanalın canlı RTSP akışı için (henüz bağlanmamış) RTSPClient döner.
+        ffmpeg süreci yerine aynı event loop içinde çok sayıda akış okunabilir.
+
+        Kullanım:
+            async with cam.streaming.open_rtsp(101) as stream:
+                async for frame in stream.access_units():
+                    ...
+        """
+        url = f"rtsp://{self._session.config.ip}:{rtsp_port}/Streaming/Channels/{channel}"
+        return RTSPClient(url, self._session.config.username, self._session.config.password, **kwargs)
 
     def set_video_config(self, channel: int = 101, fps: int = None, bitrate: int = None, width: int = None, height: int = None) -> bool:
         """
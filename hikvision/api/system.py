@@ -1,10 +1,15 @@
 from ..core import HikvisionSession
-from ..utils import parse_xml
+from ..utils import unwrap_list, FileStreamBody
 from ..models.system import DeviceInfo, DeviceStatus
 from ..utils import is_success_response
-from ..models.system import TimeConfig
+from ..models.system import TimeConfig, UpgradeStatus, FirmwareUpgradeResult, ClockSample
+from ..scheduler import BULK, INTERACTIVE
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Generator, Optional, Tuple
+import math
+import re
 import xmltodict
-
+import time
 
 class SystemAPI:
     def __init__(self, session: HikvisionSession):
@@ -15,14 +20,11 @@ class SystemAPI:
         Cihaz bilgilerini çeker (Model, Seri No vb.)
         Ref: ISAPI PDF Section 8.1.1
         """
-        # 1. İsteği at (Core halleder)
-        xml_response = self._session.request("GET", "/System/deviceInfo")
-        
-        # 2. XML'i Dict'e çevir
-        data_dict = parse_xml(xml_response)
+        # 1. İsteği at ve Dict'e çevir (Core JSON/XML seçimini halleder)
+        data_dict = self._session.get_document("/System/deviceInfo")
         
-        # 3. Pydantic modeline dök (Validation)
-        # XML genelde root tag içinde gelir: {'DeviceInfo': {...}}
+        # 2. Pydantic modeline dök (Validation)
+        # Veri genelde root tag içinde gelir: {'DeviceInfo': {...}}
         payload = data_dict.get("DeviceInfo", data_dict)
         
         return DeviceInfo(**payload)
@@ -52,29 +54,22 @@ class SystemAPI:
         Ref: ISAPI PDF Section 8.1.6 
         """
         endpoint = "/System/status"
-        response = self._session.request("GET", endpoint)
-        
-        data = parse_xml(response)
+        data = self._session.get_document(endpoint)
         root = data.get("DeviceStatus", {})
         
         # CPU ve Memory listeleri için basit veri düzenleme
-        # xmltodict tek elemanlı listeleri dict yapar, bunu listeye çevirelim
-        if root.get("CPUList") and isinstance(root["CPUList"].get("CPU"), dict):
-            root["CPUList"] = [root["CPUList"]["CPU"]]
-        elif root.get("CPUList"):
-             root["CPUList"] = root["CPUList"]["CPU"] # Zaten listeyse
+        # xmltodict tek elemanlı listeleri dict yapar, JSON ise listeyi sarar; ikisini de düz listeye çevirelim
+        if root.get("CPUList"):
+            root["CPUList"] = unwrap_list(root["CPUList"], "CPU")
 
-        if root.get("MemoryList") and isinstance(root["MemoryList"].get("Memory"), dict):
-            root["MemoryList"] = [root["MemoryList"]["Memory"]]
-        elif root.get("MemoryList"):
-            root["MemoryList"] = root["MemoryList"]["Memory"]
+        if root.get("MemoryList"):
+            root["MemoryList"] = unwrap_list(root["MemoryList"], "Memory")
 
         return DeviceStatus(**root)
     
     def get_time_settings(self) -> TimeConfig:
         """Kamera saat ayarlarını çeker."""
-        response = self._session.request("GET", "/System/time")
-        data = parse_xml(response)
+        data = self._session.get_document("/System/time")
         return TimeConfig(**data.get("Time", {}))
 
     def set_time_manual(self, datetime_str: str) -> bool:
@@ -111,4 +106,238 @@ class SystemAPI:
             new_xml = xmltodict.unparse(data, pretty=True)
             put_response = self._session.request("PUT", endpoint, data=new_xml)
             return is_success_response(put_response)
-        return False
\ No newline at end of file
+        return False
+
+    def sample_clock(self) -> ClockSample:
+        """
+        Cihaz saatini, isteğin gönderildiği ve cevabın geldiği yerel zamanlarla birlikte okur
+        (NTP tarzı ofset hesabı için). Bkz: hikvision.services.clock_audit
+        """
+        sent = time.time()
+        response = self._session.request("GET", "/System/time", priority=INTERACTIVE)
+        received = time.time()
+        text = response if isinstance(response, str) else response.text
+        root = xmltodict.parse(text, process_namespaces=False).get("Time") or {}
+        device_time, utc_offset = _device_epoch(root.get("localTime"), root.get("timeZone"))
+        return ClockSample(sent=sent, received=received, device_time=device_time,
+                           time_mode=root.get("timeMode"), utc_offset=utc_offset)
+
+    def sync_clock(self, one_way_delay: float = None) -> bool:
+        """
+        Cihaz saatini bu bilgisayarın saatine eşitler (manuel moda alır).
+        Cihaz saati saniye çözünürlüğünde aldığından istek, bir sonraki tam saniyede cihaza
+        ulaşacak şekilde tek yön gecikme kadar erken gönderilir.
+
+        :param one_way_delay: Tahmini tek yön gecikme (sn). Verilmezse okuma isteğinin RTT/2'si.
+        """
+        endpoint = "/System/time"
+        sent = time.time()
+        response = self._session.request("GET", endpoint, priority=INTERACTIVE)
+        rtt = time.time() - sent
+        text = response if isinstance(response, str) else response.text
+        data = xmltodict.parse(text, process_namespaces=False)
+        if "Time" not in data:
+            return False
+
+        _, utc_offset = _device_epoch(data["Time"].get("localTime"), data["Time"].get("timeZone"))
+        delay = rtt / 2 if one_way_delay is None else one_way_delay
+        # Hazırlık için 50 ms pay bırakıp yetişilebilecek ilk tam saniye
+        target = math.ceil(time.time() + delay + 0.05)
+        local = datetime.fromtimestamp(target, timezone(timedelta(seconds=utc_offset)))
+        data["Time"]["timeMode"] = "manual"
+        data["Time"]["localTime"] = local.strftime("%Y-%m-%dT%H:%M:%S")
+        body = xmltodict.unparse(data)
+
+        time.sleep(max(0.0, target - delay - time.time()))
+        put_response = self._session.request("PUT", endpoint, data=body, priority=INTERACTIVE)
+        return is_success_response(put_response)
+
+    # --- KONFİGÜRASYON YEDEĞİ ---
+
+    def iter_configuration(self, chunk_size: int = 64 * 1024, timeout: float = 120) -> Generator[bytes, None, None]:
+        """
+        Cihazın şifreli konfigürasyon dosyasını parça parça indirir (belleğe tamamı alınmaz).
+        Ref: ISAPI PDF Section 8.1.4 (configurationData)
+        """
+        response = self._session.request("GET", "/System/configurationData", stream=True, timeout=timeout,
+                                         priority=BULK, flow="configuration")
+        if isinstance(response, str): # Mock
+            yield response.encode()
+            return
+        with response:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    yield chunk
+
+    def restore_configuration(self, path: str, progress: Callable[[int, int], None] = None, timeout: float = 300) -> bool:
+        """
+        Konfigürasyon dosyasını diskten akıtarak cihaza geri yükler.
+        Cihaz yükleme sonrası kendini yeniden başlatır.
+        """
+        # Digest nonce'u önceden alınır (bkz. upload_firmware)
+        self.get_device_info()
+        stream = FileStreamBody(path, progress=progress)
+        try:
+            response = self._session.request(
+                "PUT", "/System/configurationData", data=stream,
+                headers={"Content-Type": "application/octet-stream"},
+                timeout=(10, timeout),
+                priority=BULK, flow="configuration",
+            )
+            return is_success_response(response)
+        finally:
+            stream.close()
+
+    # --- FIRMWARE ---
+
+    def get_upgrade_status(self) -> UpgradeStatus:
+        """
+        Firmware yükseltme ilerlemesini okur.
+        Ref: ISAPI PDF Section 8.1.10
+        """
+        data = self._session.get_document("/System/upgradeStatus")
+        return UpgradeStatus(**(data.get("upgradeStatus") or data.get("UpgradeStatus") or {}))
+
+    def upload_firmware(self, path: str, throttle: Callable[[int], None] = None,
+                        progress: Callable[[int, int], None] = None, timeout: float = 900) -> bool:
+        """
+        Firmware dosyasını diskten akıtarak yükler (dosya belleğe alınmaz).
+        Ref: ISAPI PDF Section 8.1.9
+
+        :param throttle: Her okunan parça boyutu (byte) ile çağrılır, bant genişliği sınırı için bloklayabilir.
+        :param progress: (gönderilen, toplam) byte ile çağrılır.
+        :param timeout: Cihaz yazma işlemini bitirip cevap verene kadar beklenecek süre (sn).
+        """
+        # Digest nonce'unu aynı thread'de küçük bir istekle alıyoruz; yoksa 60 MB'lık
+        # gövde önce yetkisiz gönderilir, 401 gelince baştan tekrar gönderilir.
+        self.get_upgrade_status()
+
+        stream = FileStreamBody(path, throttle=throttle, progress=progress)
+        try:
+            response = self._session.request(
+                "PUT", "/System/updateFirmware", data=stream,
+                headers={"Content-Type": "application/octet-stream"},
+                timeout=(10, timeout),
+                priority=BULK, flow="firmware",
+            )
+            return is_success_response(response)
+        finally:
+            stream.close()
+
+    def wait_for_upgrade(self, timeout: float = 900, poll_interval: float = 2.0,
+                         progress: Callable[[int], None] = None) -> Optional[UpgradeStatus]:
+        """
+        Cihaz firmware'i yazmayı bitirene kadar upgradeStatus'u okur.
+        Süre dolarsa None döner. Ara okuma hataları (cihaz meşgul) yok sayılır.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                status = self.get_upgrade_status()
+                if progress:
+                    progress(status.percent)
+                if not status.upgrading:
+                    return status
+            except Exception:
+                pass
+            time.sleep(poll_interval)
+        return None
+
+    def wait_until_online(self, timeout: float = 600, poll_interval: float = 5.0, grace: float = 30.0):
+        """
+        Yeniden başlatma sonrası cihaz tekrar cevap verene kadar bekler.
+        grace: Cihazın kapanmaya başlaması için ilk bekleme (eski oturuma cevap vermesin diye).
+        Cihaz bilgisini (DeviceInfo) veya süre dolarsa None döner.
+        """
+        deadline = time.monotonic() + timeout
+        time.sleep(min(grace, timeout))
+        while time.monotonic() < deadline:
+            # Planlı kesinti: devre kesici açılıp yoklamayı geciktirmesin
+            self._session.health.reset()
+            try:
+                return self.get_device_info()
+            except Exception:
+                time.sleep(poll_interval)
+        return None
+
+    def upgrade_firmware(self, path: str, expected_version: str = None, reboot: bool = True,
+                         throttle: Callable[[int], None] = None, progress: Callable[[int, int], None] = None,
+                         upgrade_timeout: float = 900, boot_timeout: float = 600, boot_grace: float = 30.0) -> FirmwareUpgradeResult:
+        """
+        Yükle -> yazma ilerlemesini bekle -> yeniden başlat -> yeni sürümü doğrula.
+
+        :param expected_version: Verilirse cihaz zaten bu sürümdeyse yükleme yapılmaz ("current"),
+                                 sonda da bu sürüm doğrulanır. Verilmezse sürümün değişmesi yeterlidir.
+        """
+        started = time.monotonic()
+        result = FirmwareUpgradeResult(name=str(self._session.config.ip))
+
+        def finish(state: str, error: str = None) -> FirmwareUpgradeResult:
+            result.state = state
+            result.error = error
+            result.duration = time.monotonic() - started
+            return result
+
+        def counted(sent: int, total: int):
+            result.bytes_sent = sent
+            if progress:
+                progress(sent, total)
+
+        try:
+            result.from_version = self.get_device_info().firmware_version
+            if expected_version and _same_version(result.from_version, expected_version):
+                result.to_version = result.from_version
+                return finish("current")
+
+            upload_started = time.monotonic()
+            uploaded = self.upload_firmware(path, throttle=throttle, progress=counted, timeout=upgrade_timeout)
+            result.upload_seconds = time.monotonic() - upload_started
+            if not uploaded:
+                return finish("failed", "Cihaz firmware dosyasını reddetti.")
+
+            status = self.wait_for_upgrade(timeout=upgrade_timeout)
+            if status is None:
+                return finish("failed", "Yükseltme ilerlemesi zaman aşımına uğradı.")
+
+            if reboot and not self.reboot_device():
+                return finish("failed", "Yeniden başlatma komutu reddedildi.")
+
+            info = self.wait_until_online(timeout=boot_timeout, grace=boot_grace if reboot else 0)
+            if info is None:
+                return finish("failed", "Cihaz yeniden başlatma sonrası cevap vermedi.")
+            result.to_version = info.firmware_version
+
+            if expected_version and not _same_version(info.firmware_version, expected_version):
+                return finish("failed", f"Beklenen sürüm {expected_version}, cihazda {info.firmware_version}.")
+            if not expected_version and info.firmware_version == result.from_version:
+                return finish("failed", "Firmware sürümü değişmedi.")
+            return finish("upgraded")
+
+        except Exception as e:
+            return finish("failed", str(e))
+
+
+def _device_epoch(local_time: Optional[str], time_zone: Optional[str]) -> Tuple[float, int]:
+    """
+    Cihazın localTime değerini (UTC epoch, saat dilimi farkı sn) olarak çözer.
+    localTime'da fark yoksa (2025-12-04T15:30:00) timeZone kullanılır: POSIX biçiminde
+    işaret terstir, CST-3:00:00 -> UTC+3. DST kısmı dikkate alınmaz.
+    """
+    if not local_time:
+        raise ValueError("Cihaz localTime döndürmedi.")
+    moment = datetime.fromisoformat(local_time.strip().replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        utc_offset = 0
+        match = re.search(r"([+-]?)(\d{1,2}):(\d{2})(?::(\d{2}))?", time_zone or "")
+        if match:
+            sign, hours, minutes, seconds = match.groups()
+            utc_offset = (int(hours) * 3600 + int(minutes) * 60 + int(seconds or 0)) * (1 if sign == "-" else -1)
+        moment = moment.replace(tzinfo=timezone(timedelta(seconds=utc_offset)))
+    return moment.timestamp(), int(moment.utcoffset().total_seconds())
+
+
+def _same_version(actual: str, expected: str) -> bool:
+    """'V5.7.3 build 220112' ile 'v5.7.3' aynı kabul edilir."""
+    normalize = lambda v: v.strip().lower().lstrip("v")
+    actual, expected = normalize(actual or ""), normalize(expected)
+    return actual == expected or actual.startswith(expected + " ")
@@ -0,0 +1,82 @@
+import base64
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+
+_AUTH_PARAM = re.compile(r'(\w+)=(?:"([^"]*)"|([^,\s]*))')
+
+_ALGORITHMS = {"md5": hashlib.md5, "sha-256": hashlib.sha256}
+
+
+class DigestAuth:
+    """
+    HTTP/RTSP için Digest (tercih edilir) ve Basic kimlik doğrulama.
+    İlk 401'den sonra sonraki isteklere başlık önceden eklenir (her istek için ikinci tur yok).
+    Thread-safe: aynı nonce ile eşzamanlı isteklerde nc sayacı kilitle artırılır.
+    """
+
+    def __init__(self, username: str, password: str):
+        self.username = username or ""
+        self.password = password or ""
+        self._scheme: Optional[str] = None
+        self._params: Dict[str, str] = {}
+        self._ha1 = ""
+        self._nc = 0
+        self._lock = threading.Lock()
+
+    def challenge(self, challenges: List[str]) -> bool:
+        """401 cevabındaki WWW-Authenticate başlıklarını işler. Kullanılabilir yöntem yoksa False."""
+        chosen = next((c for c in challenges if c.lower().startswith("digest")), None)
+        chosen = chosen or next((c for c in challenges if c.lower().startswith("basic")), None)
+        if chosen is None:
+            return False
+        scheme, _, rest = chosen.partition(" ")
+        params = {m.group(1).lower(): m.group(2) if m.group(2) is not None else m.group(3)
+                  for m in _AUTH_PARAM.finditer(rest)}
+        hash_function = _ALGORITHMS.get(params.get("algorithm", "MD5").lower())
+        if scheme.lower() == "digest" and hash_function is None:
+            return False
+        with self._lock:
+            self._scheme = scheme.lower()
+            self._params = params
+            self._nc = 0
+            if self._scheme == "digest":
+                # HA1 nonce'tan bağımsızdır, her istekte tekrar hesaplanmaz
+                self._ha1 = hash_function(f"{self.username}:{params.get('realm', '')}:{self.password}".encode()).hexdigest()
+        return True
+
+    def header(self, method: str, uri: str) -> Optional[str]:
+        if self._scheme == "basic":
+            token = base64.b64encode(f"{self.username}:{self.password}".encode()).decode()
+            return f"Basic {token}"
+        if self._scheme != "digest":
+            return None
+
+        with self._lock:
+            params, ha1 = self._params, self._ha1
+            self._nc += 1
+            nc = f"{self._nc:08x}"
+
+        realm = params.get("realm", "")
+        nonce = params.get("nonce", "")
+        algorithm = params.get("algorithm", "MD5")
+        hash_function = _ALGORITHMS[algorithm.lower()]
+        digest = lambda s: hash_function(s.encode()).hexdigest()
+
+        ha2 = digest(f"{method}:{uri}")
+        fields = [f'username="{self.username}"', f'realm="{realm}"', f'nonce="{nonce}"', f'uri="{uri}"']
+
+        qop = params.get("qop")
+        if qop and "auth" in [q.strip() for q in qop.split(",")]:
+            cnonce = os.urandom(8).hex()
+            response = digest(f"{ha1}:{nonce}:{nc}:{cnonce}:auth:{ha2}")
+            fields += [f'response="{response}"', "qop=auth", f"nc={nc}", f'cnonce="{cnonce}"']
+        else:
+            fields.append(f'response="{digest(f"{ha1}:{nonce}:{ha2}")}"')
+
+        if "opaque" in params:
+            fields.append(f'opaque="{params["opaque"]}"')
+        fields.append(f"algorithm={algorithm}")
+        return "Digest " + ", ".join(fields)
@@ -0,0 +1,393 @@
+"""
+ISAPI trafiği için kayıt (record) ve tekrar oynatma (replay) kaseti.
+
+Gerçek cihazla yapılan istek/cevaplar (multipart alarm akışları ve binary snapshot'lar dahil)
+transport katmanında dosyaya yazılır; ReplayTransport ile HikvisionSession üzerinden kamera
+olmadan, deterministik olarak tekrar oynatılır.
+
+Kayıt:
+    client = HikvisionClient(ip, user, password, transport="urllib3")
+    recorder = record(client.session, "ds2cd2043_v5.7.cassette", meta={"model": "DS-2CD2043G2"})
+    ...                         # normal kullanım
+    recorder.stop()
+
+Oynatma:
+    client = HikvisionClient(ip, user, password, transport=ReplayTransport("ds2cd2043_v5.7.cassette", pacing="max"))
+
+Gizlilik: istek başlıkları (Authorization) ve istek gövdeleri yazılmaz, gövdenin sadece özeti
+saklanır (record_request_bodies=True ile gövde de yazılır). Cevaplardaki Set-Cookie atılır.
+
+# --- DOSYA FORMATI ---
+# "HKCASS1\\n" + çerçeveler: [tip(1) | değişim no(4) | kayıt başından sn(8) | uzunluk(4)] + payload
+#   H: Kaset bilgisi (JSON)         Q: İstek (JSON: method, path, body_hash, body?)
+#   R: Cevap başlığı (JSON)         B: Gövde parçası (ham byte)
+#   E: Değişim bitti                X: Hata (JSON: type, message)
+# Eşzamanlı değişimler (örn. açık alarm akışı sürerken yapılan istekler) iç içe yazılabilir.
+# Yarım yazılmış son çerçeve (çökme) okurken yok sayılır.
+"""
+import hashlib
+import json
+import struct
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+from .transport import Transport, _build_response
+
+MAGIC = b"HKCASS1\n"
+FRAME_HEADER = struct.Struct("<cIdI")
+
+PACING_MODES = ("realtime", "accelerated", "max")
+
+_DROPPED_RESPONSE_HEADERS = {"set-cookie"}
+
+
+class CassetteMiss(requests.RequestException):
+    """Kasette isteğe karşılık gelen (kalan) kayıt yok."""
+
+
+def _path(url: str) -> str:
+    """Cihazdan bağımsız anahtar: http://ip:port/ISAPI/x?y -> /ISAPI/x?y"""
+    split = urlsplit(url)
+    return f"{split.path}?{split.query}" if split.query else split.path
+
+
+def _body_bytes(data) -> Optional[bytes]:
+    """Özeti alınabilecek gövde (dosya benzeri gövdeler okunmaz)."""
+    if isinstance(data, str):
+        return data.encode("utf-8")
+    if isinstance(data, (bytes, bytearray)):
+        return bytes(data)
+    return None
+
+
+def _body_hash(data) -> Optional[str]:
+    body = _body_bytes(data)
+    return hashlib.sha1(body).hexdigest() if body is not None else None
+
+
+# --- KAYIT ---
+
+class _CassetteWriter:
+    def __init__(self, path: str, meta: dict):
+        self._file = open(path, "wb")
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._next_id = 0
+        self._file.write(MAGIC)
+        self.write(b"H", 0, json.dumps({"created": time.time(), **meta}).encode(), flush=True)
+
+    def new_id(self) -> int:
+        with self._lock:
+            self._next_id += 1
+            return self._next_id
+
+    def write(self, kind: bytes, exchange: int, payload: bytes = b"", flush: bool = False):
+        with self._lock:
+            if self._file.closed:
+                return # Kayıt kapatıldıktan sonra biten akışlar
+            self._file.write(FRAME_HEADER.pack(kind, exchange, time.monotonic() - self._started, len(payload)))
+            self._file.write(payload)
+            if flush:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class _RecordingBody:
+    """Akış gövdesini okundukça kasete yazan sarmalayıcı (iter_content ve MJPEG okuyucu için)."""
+
+    def __init__(self, raw, writer: _CassetteWriter, exchange: int):
+        self._raw = raw
+        self._writer = writer
+        self._exchange = exchange
+        self._ended = False
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._raw.read(size)
+        if data:
+            self._writer.write(b"B", self._exchange, data)
+        elif size != 0:
+            self._end()
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def _end(self):
+        if not self._ended:
+            self._ended = True
+            self._writer.write(b"E", self._exchange, flush=True)
+
+    def close(self):
+        self._end()
+        self._raw.close()
+
+    def release_conn(self):
+        # Not: stream() tanımlanmaz, yoksa requests iter_content alttaki gövdeyi doğrudan okur
+        release = getattr(self._raw, "release_conn", None)
+        if release:
+            release()
+
+
+class RecordingTransport(Transport):
+    """Başka bir transport'un trafiğini kasete yazar; davranışını değiştirmez."""
+
+    name = "recording"
+
+    def __init__(self, inner: Transport, path: str, meta: dict = None, record_request_bodies: bool = False):
+        """
+        :param meta: Kaset bilgisi (model, firmware ailesi ...). ReplayTransport.meta ile okunur.
+        :param record_request_bodies: True ise istek gövdeleri de yazılır (şifre içerebilir).
+        """
+        self.inner = inner
+        self.record_request_bodies = record_request_bodies
+        self._writer = _CassetteWriter(path, meta or {})
+
+    def send(self, method: str, url: str, data=None, headers: Dict[str, str] = None,
+             timeout=None, stream: bool = False) -> requests.Response:
+        exchange = self._writer.new_id()
+        request = {"method": method.upper(), "path": _path(url), "body_hash": _body_hash(data)}
+        if self.record_request_bodies and _body_bytes(data) is not None:
+            request["body"] = _body_bytes(data).decode("utf-8", errors="replace")
+        self._writer.write(b"Q", exchange, json.dumps(request).encode())
+
+        try:
+            response = self.inner.send(method, url, data=data, headers=headers, timeout=timeout, stream=stream)
+        except requests.RequestException as e:
+            self._writer.write(b"X", exchange, json.dumps({"type": type(e).__name__, "message": str(e)}).encode(), flush=True)
+            raise
+
+        head = {
+            "status": response.status_code, "reason": response.reason,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_RESPONSE_HEADERS},
+        }
+        self._writer.write(b"R", exchange, json.dumps(head).encode())
+        if stream:
+            response.raw = _RecordingBody(response.raw, self._writer, exchange)
+        else:
+            if response.content:
+                self._writer.write(b"B", exchange, response.content)
+            self._writer.write(b"E", exchange, flush=True)
+        return response
+
+    def stop(self):
+        """Kaydı bitirir; istekler alttaki transport'a aynen gitmeye devam eder."""
+        self._writer.close()
+
+    def close(self):
+        self.stop()
+        self.inner.close()
+
+
+def record(session, path: str, **options) -> RecordingTransport:
+    """Oturumun mevcut transport'unu kayıt sarmalayıcısıyla değiştirir. stop() ile kayıt biter."""
+    recorder = RecordingTransport(session.transport, path, **options)
+    session.transport = recorder
+    return recorder
+
+
+# --- OKUMA ---
+
+class Exchange:
+    """Kasetteki tek istek/cevap. Zamanlar isteğin gönderildiği ana göredir (sn)."""
+    __slots__ = ("method", "path", "body_hash", "body", "status", "reason", "headers",
+                 "head_delay", "chunks", "error", "complete")
+
+    def __init__(self, request: dict):
+        self.method = request["method"]
+        self.path = request["path"]
+        self.body_hash = request.get("body_hash")
+        self.body = request.get("body")
+        self.status: Optional[int] = None
+        self.reason = ""
+        self.headers: Dict[str, str] = {}
+        self.head_delay = 0.0
+        self.chunks: List[Tuple[float, bytes]] = [] # (isteğe göre sn, veri)
+        self.error: Optional[dict] = None
+        self.complete = False
+
+    @property
+    def content(self) -> bytes:
+        return b"".join(data for _, data in self.chunks)
+
+
+def read_cassette(path: str) -> Tuple[dict, List[Exchange]]:
+    """Kaseti (bilgi, istek sırasına göre değişimler) olarak okur."""
+    with open(path, "rb") as f:
+        blob = f.read()
+    if not blob.startswith(MAGIC):
+        raise ValueError(f"Kaset dosyası değil: {path}")
+
+    meta: dict = {}
+    exchanges: Dict[int, Exchange] = {}
+    started: Dict[int, float] = {}
+    position = len(MAGIC)
+    while position + FRAME_HEADER.size <= len(blob):
+        kind, number, offset, length = FRAME_HEADER.unpack_from(blob, position)
+        position += FRAME_HEADER.size
+        if position + length > len(blob):
+            break # Yarım çerçeve
+        payload = blob[position:position + length]
+        position += length
+
+        if kind == b"H":
+            meta = json.loads(payload)
+            continue
+        if kind == b"Q":
+            exchanges[number] = Exchange(json.loads(payload))
+            started[number] = offset
+            continue
+        exchange = exchanges.get(number)
+        if exchange is None:
+            continue
+        elapsed = offset - started[number]
+        if kind == b"R":
+            head = json.loads(payload)
+            exchange.status, exchange.reason, exchange.headers = head["status"], head["reason"], head["headers"]
+            exchange.head_delay = elapsed
+        elif kind == b"B":
+            exchange.chunks.append((elapsed, payload))
+        elif kind == b"E":
+            exchange.complete = True
+        elif kind == b"X":
+            exchange.error = json.loads(payload)
+            exchange.head_delay = elapsed
+    return meta, list(exchanges.values())
+
+
+# --- OYNATMA ---
+
+class _ReplayBody:
+    """Kayıtlı gövde parçalarını kayıttaki aralıklarla (ölçeklenmiş) veren okuyucu."""
+
+    def __init__(self, chunks: List[Tuple[float, bytes]], start: float, scale: float,
+                 sleep: Callable[[float], None]):
+        self._chunks = deque(chunks)
+        self._previous = start
+        self._scale = scale
+        self._sleep = sleep
+        self._buffer = memoryview(b"")
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            parts = [bytes(self._buffer)]
+            self._buffer = memoryview(b"")
+            while self._chunks:
+                parts.append(self._next())
+            return b"".join(parts)
+        if not self._buffer:
+            if not self._chunks:
+                return b""
+            self._buffer = memoryview(self._next())
+        data, self._buffer = bytes(self._buffer[:size]), self._buffer[size:]
+        return data
+
+    def _next(self) -> bytes:
+        at, data = self._chunks.popleft()
+        if self._scale:
+            self._sleep(max(0.0, at - self._previous) * self._scale)
+        self._previous = at
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        self._chunks.clear()
+        self._buffer = memoryview(b"")
+
+
+class ReplayTransport(Transport):
+    """
+    Kaseti transport olarak oynatır (ağ yok).
+
+    - İstekler (method, path) anahtarıyla eşleşir; aynı anahtarın kayıtları kayıt sırasıyla verilir.
+      match_body=True ise gövde özeti de eşleşmelidir. Kayıt bitince loop=True ise başa dönülür,
+      değilse CassetteMiss yükselir.
+    - pacing: 'realtime' kayıttaki cevap gecikmeleri ve akış parça aralıkları aynen,
+      'accelerated' speed kat hızlı, 'max' hiç beklemeden (ayrıştırıcı/pipeline benchmark'ı için).
+    - Kayıttaki bağlantı hataları ve zaman aşımları aynı requests istisnası olarak tekrar üretilir.
+    """
+
+    name = "replay"
+
+    def __init__(self, path: str, pacing: str = "realtime", speed: float = 10.0, loop: bool = False,
+                 match_body: bool = False, sleep: Callable[[float], None] = time.sleep):
+        if pacing not in PACING_MODES:
+            raise ValueError(f"Geçersiz pacing: {pacing} (desteklenenler: {', '.join(PACING_MODES)})")
+        self.pacing = pacing
+        self.speed = speed
+        self.loop = loop
+        self.match_body = match_body
+        self._sleep = sleep
+        self.meta, self.exchanges = read_cassette(path)
+
+        self._lock = threading.Lock()
+        self._queues: Dict[tuple, Deque[Exchange]] = defaultdict(deque)
+        self.rewind()
+        self.stats = {"served": 0, "missed": 0}
+
+    def _key(self, method: str, path: str, body_hash: Optional[str]) -> tuple:
+        return (method.upper(), path, body_hash) if self.match_body else (method.upper(), path)
+
+    def rewind(self):
+        """Oynatmayı kasetin başına alır (örn. benchmark turları arasında)."""
+        with self._lock:
+            self._queues.clear()
+            for exchange in self.exchanges:
+                # Cevabı/hatası yazılmamış değişimler (kayıt ortasında kesilmiş) oynatılmaz
+                if exchange.status is not None or exchange.error is not None:
+                    self._queues[self._key(exchange.method, exchange.path, exchange.body_hash)].append(exchange)
+
+    @property
+    def scale(self) -> float:
+        """Kayıttaki sürelerin çarpanı."""
+        return {"realtime": 1.0, "accelerated": 1.0 / self.speed, "max": 0.0}[self.pacing]
+
+    def remaining(self) -> int:
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def send(self, method: str, url: str, data=None, headers: Dict[str, str] = None,
+             timeout=None, stream: bool = False) -> requests.Response:
+        path = _path(url)
+        key = self._key(method, path, _body_hash(data))
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue and self.loop:
+                # Sadece bu anahtarın kayıtlarını başa sar
+                queue = self._queues[key] = deque(e for e in self.exchanges
+                                                  if self._key(e.method, e.path, e.body_hash) == key
+                                                  and (e.status is not None or e.error is not None))
+            if not queue:
+                self.stats["missed"] += 1
+                raise CassetteMiss(f"Kasette kayıt yok: {method.upper()} {path}")
+            exchange = queue.popleft()
+            self.stats["served"] += 1
+
+        scale = self.scale
+        if scale:
+            self._sleep(exchange.head_delay * scale)
+        if exchange.error is not None:
+            error_type = getattr(requests, exchange.error.get("type", ""), None)
+            if not (isinstance(error_type, type) and issubclass(error_type, requests.RequestException)):
+                error_type = requests.ConnectionError
+            raise error_type(exchange.error.get("message", "Kayıtlı hata"))
+
+        body = _ReplayBody(exchange.chunks, exchange.head_delay, scale, self._sleep)
+        response = _build_response(exchange.status, exchange.reason, exchange.headers, url, raw=body)
+        if not stream:
+            response._content = body.read()
+        return response
@@ -11,15 +11,18 @@ from .api.io import IOAPI
 from .api.thermal import ThermalAPI
 from .api.content import ContentAPI 
 from .api.audio import AudioAPI
+from .api.smart import SmartAPI
+from .api.channels import ChannelsAPI
 
 class HikvisionClient:
-    def __init__(self, ip, username, password, port=80, channel=1, mock_mode=False):
+    def __init__(self, ip, username, password, port=80, channel=1, mock_mode=False, transport=None):
         
         # Pydantic Config yerine şimdilik SimpleConfig kullanıyoruz
         config = SimpleConfig(ip, username, password, port, channel)
         
         # 1. Oturumu başlat
-        self.session = HikvisionSession(config, mock_mode)
+        # transport: 'requests' (varsayılan), 'urllib3' veya 'async' (bkz. hikvision.transport)
+        self.session = HikvisionSession(config, mock_mode, transport=transport)
         
         # 2. Alt modülleri yükle
         self.system = SystemAPI(self.session)
@@ -33,4 +36,12 @@ class HikvisionClient:
         self.io = IOAPI(self.session)
         self.thermal = ThermalAPI(self.session)
         self.content = ContentAPI(self.session)
-        self.audio = AudioAPI(self.session)
\ No newline at end of file
+        self.audio = AudioAPI(self.session)
+        self.smart = SmartAPI(self.session)
+        # Kanal listesi (önbellekli) ve kanala bağlı ptz/image/streaming nesneleri
+        self.channels = ChannelsAPI(self.session, self.ptz, self.image, self.streaming)
+
+    @property
+    def health(self):
+        """Cihazın bağlantı sağlığı (devre kesici durumu, uyarlanabilir zaman aşımı)."""
+        return self.session.health
\ No newline at end of file
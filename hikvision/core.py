@@ -1,8 +1,14 @@
 import requests
-from requests.auth import HTTPDigestAuth
 import logging
-from hikvision.utils import parse_response_status, is_success_response
+from hikvision.utils import parse_response_status, is_success_response, parse_xml, parse_json, strip_xml_attributes
+import xmltodict
 import json
+import re
+import time
+from typing import Union
+from hikvision.health import DeviceHealth, device_health
+from hikvision.scheduler import RequestScheduler, NORMAL, BULK
+from hikvision.transport import Transport, create_transport
 
 # --- MOCK DATA (Kamera yokken dönecek sahte cevaplar) ---
 MOCK_DATA = {
@@ -118,30 +124,57 @@ class HikvisionSession:
     Mocking (Taklit) işlemini yöneten çekirdek sınıf.
     """
     
-    def __init__(self, config, mock_mode=False):
+    def __init__(self, config, mock_mode=False, health: DeviceHealth = None, scheduler: RequestScheduler = None,
+                 transport: Union[str, Transport] = None):
         """
         :param config: SimpleConfig veya Pydantic config objesi.
         :param mock_mode: True ise kamera olmadan çalışır.
+        :param health: Bağlantı sağlığı takibi. Verilmezse aynı ip:port için paylaşılan kayıt kullanılır.
+        :param scheduler: Öncelikli istek zamanlayıcısı (varsayılan: 4 bağlantı, 1'i interactive'e ayrılmış).
+        :param transport: HTTP backend'i: 'requests' (varsayılan), 'urllib3', 'async' veya Transport nesnesi.
         """
         self.config = config
         self.mock_mode = mock_mode
+        # Uyarlanabilir zaman aşımı + devre kesici (ölü cihaz işçileri 10 sn bekletmesin)
+        self.health = health or device_health(f"{config.ip}:{config.port}")
         protocol = "http" 
         self.base_url = f"{protocol}://{config.ip}:{config.port}/ISAPI"        
         # Loglama ayarı
         self.logger = logging.getLogger("HikvisionCore")
         
-        # Session başlat (TCP Keep-Alive sağlar, her istekte tekrar bağlanmaz)
-        self.session = requests.Session()
-        self.session.auth = HTTPDigestAuth(config.username, config.password)
-        self.session.headers.update({
+        # Her isteğe eklenen başlıklar (istek başına kopyalanmaz, değiştirilmemeli)
+        self.headers = {
             "Content-Type": "application/xml",
             "X-Requested-With": "XMLHttpRequest"
-        })
+        }
+
+        # Cihaza giden eşzamanlı istekler öncelik sınıflarına göre sıralanır (PTZ stop snapshot arkasında beklemez).
+        # Bağlantı havuzu (TCP Keep-Alive) zamanlayıcının limitine eşitlenir.
+        self.scheduler = scheduler or RequestScheduler()
+        self.transport = create_transport(transport, config.username, config.password,
+                                          pool_maxsize=self.scheduler.max_connections)
+
+        # Format müzakeresi: None = henüz tespit edilmedi, True/False = cihaz JSON destekliyor mu
+        self.json_supported = None
+        # JSON denenip başarısız olan endpoint aileleri (örn: /Streaming/channels/*)
+        self._xml_only_endpoints = set()
+
+    @property
+    def session(self) -> requests.Session:
+        """Geriye uyumluluk: requests backend'inin Session nesnesi (diğer backend'lerde yoktur)."""
+        session = getattr(self.transport, "session", None)
+        if session is None:
+            raise AttributeError(f"'{self.transport.name}' transport'unda requests.Session yok.")
+        return session
+
+    def close(self):
+        self.transport.close()
 
     def request(self, method: str, endpoint: str, data: str = None, json_data: dict = None, stream: bool = False, **kwargs) -> requests.Response:
         """
         Merkezi istek metodu.
         **kwargs: headers, timeout gibi ekstra parametreleri yakalar.
+        priority: 'interactive', 'normal' (varsayılan) veya 'bulk'. flow: bulk işler için akış adı.
         """
         # --- MOCK MODE ---
         if self.mock_mode:
@@ -153,36 +186,42 @@ class HikvisionSession:
         # --- GERÇEK MODE ---
         url = f"{self.base_url}{endpoint}"
         
-        # 1. Session'daki mevcut headerları kopyala
-        headers = self.session.headers.copy()
+        # 1. Varsayılan başlıklar; sadece değişiklik gerekiyorsa kopyalanır
+        headers = self.headers
         
         # 2. Dışarıdan (örn: ptz.py'den) özel header geldiyse onları ekle
         # kwargs içinden 'headers'ı alıp siliyoruz ki aşağıda çakışmasın
-        if 'headers' in kwargs:
-            custom_headers = kwargs.pop('headers')
-            headers.update(custom_headers)
+        custom_headers = kwargs.pop('headers', None)
+        if custom_headers:
+            headers = {**headers, **custom_headers}
         
         # 3. JSON veya XML durumuna göre Content-Type ayarla
         if json_data or "format=json" in endpoint:
-            headers["Content-Type"] = "application/json"
-            headers["Accept"] = "application/json"
+            headers = {**headers, "Content-Type": "application/json", "Accept": "application/json"}
             body = json.dumps(json_data) if json_data else None
         else:
             # Varsayılan XML
             body = data
 
+        # Zaman aşımı çağıran tarafından verilebilir (örn: PTZ joystick, firmware yükleme),
+        # verilmezse bağlantı süresi cihazın ölçülen cevap süresine göre uyarlanır (okuma sabit kalır)
+        timeout = kwargs.pop('timeout', None) or self.health.request_timeout()
+        priority = kwargs.pop('priority', NORMAL)
+        flow = kwargs.pop('flow', None)
+
         try:
             # print(f"--- [REQ] {method} {url} ---") # İstersen açabilirsin
-            
-            resp = self.session.request(
-                method, 
-                url, 
-                data=body, 
-                headers=headers, # Hem session hem de dışarıdan gelen headerlar birleşti
-                timeout=10, 
-                stream=stream,
-                **kwargs # Geriye kalan diğer parametreler (varsa) buraya
-            )
+            # stream=True isteklerde hak başlıklar gelince bırakılır (uzun akışlar bağlantı bütçesini tutmaz)
+            with self.scheduler.slot(priority, flow):
+                resp = self._send(
+                    method, 
+                    url, 
+                    data=body, 
+                    headers=headers, # Hem session hem de dışarıdan gelen headerlar birleşti
+                    timeout=timeout, 
+                    stream=stream,
+                    **kwargs # Geriye kalan diğer parametreler (varsa) buraya
+                )
             
             # print(f"--- [RES] {resp.status_code} ---")
             resp.raise_for_status()
@@ -193,9 +232,30 @@ class HikvisionSession:
             print(f"Hata: {e}")
             raise
 
-    def request_binary(self, method: str, endpoint: str, data: str = None) -> bytes:
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        İsteği devre kesici üzerinden gönderir ve cevap süresini ölçer.
+        HTTP cevabı (4xx/5xx dahil) cihazın ayakta olduğunu gösterir; sadece bağlantı hatası
+        ve zaman aşımı başarısız sayılır.
+        """
+        self.health.check()
+        started = time.monotonic()
+        try:
+            resp = self.transport.send(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            self.health.record_failure()
+            raise
+        except requests.RequestException:
+            self.health.reset_probe()
+            raise
+        self.health.record_success(time.monotonic() - started)
+        return resp
+
+    def request_binary(self, method: str, endpoint: str, data: str = None, timeout: float = None,
+                       priority: str = BULK, flow: str = None) -> bytes:
         """
         Resim, dosya gibi binary verileri çekmek için kullanılır.
+        Varsayılan olarak bulk sınıfında kuyruğa girer; hak gövde tamamen okunana kadar tutulur.
         """
         # --- MOCK MODE ---
         if self.mock_mode:
@@ -207,9 +267,77 @@ class HikvisionSession:
         url = f"{self.base_url}{endpoint}"
         try:
             # stream=True ile büyük dosyaları da destekleriz
-            resp = self.session.request(method, url, data=data, timeout=10, stream=True)
-            resp.raise_for_status()
-            return resp.content
+            with self.scheduler.slot(priority, flow or endpoint.split("?")[0]):
+                resp = self._send(method, url, data=data, headers=self.headers, timeout=timeout or self.health.request_timeout(),
+                                  stream=True)
+                resp.raise_for_status()
+                return resp.content
         except requests.RequestException as e:
             self.logger.error(f"Binary İstek Hatası ({method} {url}): {e}")
-            raise
\ No newline at end of file
+            raise
+
+    # --- FORMAT (JSON / XML) MÜZAKERESİ ---
+
+    def supports_json(self) -> bool:
+        """
+        Cihazın '?format=json' desteğini bir kez tespit eder ve saklar.
+        Mock modunda veriler XML olduğu için her zaman False döner.
+        """
+        if self.json_supported is None:
+            if self.mock_mode:
+                self.json_supported = False
+            else:
+                try:
+                    response = self.request("GET", "/System/deviceInfo?format=json")
+                    self.json_supported = "DeviceInfo" in parse_json(response)
+                except (requests.ConnectionError, requests.Timeout):
+                    raise # Cihaza ulaşılamadı: sonuç bilinmiyor, saklanmaz
+                except requests.RequestException:
+                    self.json_supported = False
+                self.logger.info(f"JSON desteği ({self.config.ip}): {self.json_supported}")
+        return self.json_supported
+
+    @staticmethod
+    def _endpoint_family(endpoint: str) -> str:
+        """/Streaming/channels/101?x=1 -> /Streaming/channels/* (ID'ler tek aileye düşer)"""
+        path = endpoint.split("?")[0]
+        return re.sub(r"/\d+(?=/|$)", "/*", path)
+
+    @staticmethod
+    def _json_endpoint(endpoint: str) -> str:
+        separator = "&" if "?" in endpoint else "?"
+        return f"{endpoint}{separator}format=json"
+
+    def _use_json(self, endpoint: str) -> bool:
+        return self._endpoint_family(endpoint) not in self._xml_only_endpoints and self.supports_json()
+
+    def send_document(self, method: str, endpoint: str, document: dict = None, **kwargs) -> dict:
+        """
+        İsteği cihazın desteklediği formatta (JSON öncelikli) atar ve cevabı dict döner.
+        Her iki yol da aynı kök anahtarlı sözlüğü üretir, modeller değişmeden kullanılır:
+            {'DeviceInfo': {'deviceName': ..., ...}}
+        JSON başarısız olursa endpoint ailesi XML'e sabitlenir ve bir daha JSON denenmez.
+
+        :param document: Gönderilecek gövde (xmltodict formatında, '@xmlns' vb. olabilir).
+        :param kwargs: request'e aktarılır (timeout, priority, flow ...).
+        """
+        if self._use_json(endpoint):
+            try:
+                json_body = strip_xml_attributes(document) if document else None
+                response = self.request(method, self._json_endpoint(endpoint), json_data=json_body, **kwargs)
+                data = parse_json(response)
+                # JSON hata cevabı kök içermez: {"statusCode": 4, "subStatusCode": "notSupport"}
+                if data and "statusCode" not in data:
+                    return data
+            except (requests.ConnectionError, requests.Timeout):
+                raise # Erişim sorunu format desteği hakkında bilgi vermez
+            except requests.RequestException:
+                pass
+            self._xml_only_endpoints.add(self._endpoint_family(endpoint))
+
+        xml_body = xmltodict.unparse(document) if document else None
+        return parse_xml(self.request(method, endpoint, data=xml_body, **kwargs))
+
+    def get_document(self, endpoint: str, **kwargs) -> dict:
+        """GET kısayolu. Bkz: send_document"""
+        return self.send_document("GET", endpoint, **kwargs)
@@ -0,0 +1,118 @@
+"""
+Akıllı olay bölgeleri (çizgi, alan) için toplu koordinat dönüşümü.
+
+Cihaz koordinatları çözünürlükten bağımsızdır: 0-1000 arası (normalizedScreenSize), Y ekseni
+aşağıdan yukarıdır. Piksel koordinatları (sol üst köşe başlangıç) çok sayıda çokgen için tek
+diziye birleştirilip tek seferde dönüştürülür ve doğrulanır:
+    points (N, 2), offsets (K + 1,) -> çokgen k = points[offsets[k]:offsets[k + 1]]
+"""
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Polygon = Sequence[Tuple[float, float]]
+
+
+def pack_polygons(polygons: Sequence[Polygon]) -> Tuple[np.ndarray, np.ndarray]:
+    """Farklı uzunluktaki çokgenleri tek (N, 2) dizi + başlangıç indeksleri olarak birleştirir."""
+    counts = np.fromiter((len(p) for p in polygons), dtype=np.intp, count=len(polygons))
+    offsets = np.zeros(len(polygons) + 1, dtype=np.intp)
+    np.cumsum(counts, out=offsets[1:])
+    points = np.zeros((offsets[-1], 2), dtype=float)
+    for polygon, start in zip(polygons, offsets[:-1]):
+        if len(polygon):
+            points[start:start + len(polygon)] = polygon
+    return points, offsets
+
+
+def split_polygons(points: np.ndarray, offsets: np.ndarray) -> List[np.ndarray]:
+    return np.split(points, offsets[1:-1])
+
+
+def to_normalized(points: np.ndarray, width: float, height: float, scale: Tuple[int, int] = (1000, 1000),
+                  invert_y: bool = True) -> np.ndarray:
+    """Piksel -> cihaz koordinatı (tamsayı). Çerçeve dışı değerler kırpılmaz, doğrulamada yakalanır."""
+    points = np.asarray(points, dtype=float)
+    result = np.empty(points.shape, dtype=np.int64)
+    result[:, 0] = np.rint(points[:, 0] / width * scale[0])
+    y = np.rint(points[:, 1] / height * scale[1])
+    result[:, 1] = scale[1] - y if invert_y else y
+    return result
+
+
+def from_normalized(points: np.ndarray, width: float, height: float, scale: Tuple[int, int] = (1000, 1000),
+                    invert_y: bool = True) -> np.ndarray:
+    """Cihaz koordinatı -> piksel."""
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    result = np.empty(points.shape, dtype=float)
+    result[:, 0] = points[:, 0] / scale[0] * width
+    y = scale[1] - points[:, 1] if invert_y else points[:, 1]
+    result[:, 1] = y / scale[1] * height
+    return result
+
+
+def validate_polygons(points: np.ndarray, offsets: np.ndarray, scale: Tuple[int, int] = (1000, 1000),
+                      min_vertices: int = 3, max_vertices: int = 10) -> List[Optional[str]]:
+    """
+    Cihaz koordinatlarındaki çokgenleri doğrular. Her çokgen için hata metni veya None döner.
+    Kontroller: köşe sayısı, çerçeve sınırı, tekrar eden ardışık köşe, sıfır alan/uzunluk,
+    kendisiyle kesişen kenarlar (sadece alan çokgenleri).
+    """
+    points = np.asarray(points, dtype=float)
+    counts = np.diff(offsets)
+    errors: List[Optional[str]] = [None] * len(counts)
+
+    def flag(mask: np.ndarray, message: str):
+        for k in np.flatnonzero(mask):
+            if errors[k] is None:
+                errors[k] = message
+
+    flag((counts < min_vertices) | (counts > max_vertices), f"Köşe sayısı {min_vertices}-{max_vertices} arası olmalı.")
+    if not len(points):
+        return errors
+
+    # Çokgen başına toplamalar: boş çokgenler reduceat'e verilmez
+    nonempty = counts > 0
+    starts = offsets[:-1][nonempty]
+    owner = np.repeat(np.arange(len(counts)), counts) # Her köşenin ait olduğu çokgen
+
+    outside = (points[:, 0] < 0) | (points[:, 0] > scale[0]) | (points[:, 1] < 0) | (points[:, 1] > scale[1])
+    flag(np.bincount(owner, weights=outside, minlength=len(counts)) > 0, "Koordinat çerçeve dışında.")
+
+    # Sonraki köşe (her çokgenin son köşesi ilk köşesine bağlanır)
+    following = np.arange(len(points)) + 1
+    following[offsets[1:][nonempty] - 1] = starts
+    nxt = points[following]
+
+    repeated = np.all(points == nxt, axis=1) & (np.repeat(counts, counts) > 1)
+    flag(np.bincount(owner, weights=repeated, minlength=len(counts)) > 0, "Ardışık köşeler aynı.")
+
+    cross = points[:, 0] * nxt[:, 1] - nxt[:, 0] * points[:, 1]
+    area = np.zeros(len(counts))
+    area[nonempty] = np.abs(np.add.reduceat(cross, starts)) / 2
+    flag((counts >= 3) & (area == 0), "Çokgen alanı sıfır.")
+
+    # Kenar kesişimi: aynı köşe sayılı çokgenler (m, n, 2) dizisinde birlikte kontrol edilir
+    candidates = (counts >= 4) & np.array([e is None for e in errors], dtype=bool)
+    for n in np.unique(counts[candidates]):
+        group = np.flatnonzero(candidates & (counts == n))
+        index = offsets[group][:, None] + np.arange(n)[None, :]
+        for k in group[_self_intersects(points[index])]:
+            errors[k] = "Çokgen kenarları kesişiyor."
+    return errors
+
+
+def _self_intersects(polygons: np.ndarray) -> np.ndarray:
+    """(m, n, 2) çokgenlerden komşu olmayan kenar çiftlerinden biri kesişenler (m,) bool."""
+    n = polygons.shape[1]
+    a, b = polygons, np.roll(polygons, -1, axis=1)
+    i, j = np.triu_indices(n, k=2)
+    keep = ~((i == 0) & (j == n - 1)) # İlk ve son kenar komşudur
+    i, j = i[keep], j[keep]
+
+    def orient(p, q, r):
+        return np.sign((q[..., 0] - p[..., 0]) * (r[..., 1] - p[..., 1]) - (q[..., 1] - p[..., 1]) * (r[..., 0] - p[..., 0]))
+
+    d1, d2 = orient(a[:, i], b[:, i], a[:, j]), orient(a[:, i], b[:, i], b[:, j])
+    d3, d4 = orient(a[:, j], b[:, j], a[:, i]), orient(a[:, j], b[:, j], b[:, i])
+    return np.any((d1 * d2 < 0) & (d3 * d4 < 0), axis=1)
@@ -0,0 +1,84 @@
+"""
+Hareket algılama ızgarası (gridMap) için NumPy yardımcıları.
+
+Cihaz ızgarayı satır satır, her satır bayt sınırına tamamlanmış bit dizisi olarak saklar
+(MSB ilk sütun). 22 sütunlu ızgarada her satır 3 bayttır, 18 satır -> 108 hex karakter:
+    <MotionDetectionLayout><layout><gridMap>fffffc...</gridMap></layout></MotionDetectionLayout>
+
+Tüm dönüşümler döngüsüz (vektörel) yapılır: np.packbits / np.unpackbits.
+"""
+from typing import Iterable, Tuple
+
+import numpy as np
+
+Rect = Tuple[float, float, float, float] # (x1, y1, x2, y2), 0-1 arası oran
+
+
+def pack_grid(mask: np.ndarray) -> str:
+    """(satır, sütun) bool maskesini cihazın gridMap hex metnine çevirir."""
+    mask = np.asarray(mask, dtype=bool)
+    if mask.ndim != 2:
+        raise ValueError(f"Izgara maskesi 2 boyutlu olmalı, {mask.shape} verildi.")
+    return np.packbits(mask, axis=1).tobytes().hex()
+
+
+def unpack_grid(grid_map: str, rows: int, columns: int) -> np.ndarray:
+    """gridMap hex metnini (satır, sütun) bool maskesine çevirir. Eksik baytlar 0 kabul edilir."""
+    row_bytes = (columns + 7) // 8
+    raw = np.frombuffer(bytes.fromhex((grid_map or "").strip()), dtype=np.uint8)
+    data = np.zeros(rows * row_bytes, dtype=np.uint8)
+    data[:min(raw.size, data.size)] = raw[:data.size]
+    return np.unpackbits(data.reshape(rows, row_bytes), axis=1)[:, :columns].astype(bool)
+
+
+def scale_grid(mask: np.ndarray, rows: int, columns: int, mode: str = "any") -> np.ndarray:
+    """
+    Maskeyi başka bir ızgara boyutuna ölçekler (örn. 18x22 -> 15x22 veya kameralar arası şablon).
+
+    :param mode: 'any' küçültmede hedef hücrenin kapsadığı kaynak hücrelerden biri bile seçiliyse
+                 hücreyi seçer (algılama alanı kaybolmaz); 'nearest' hücre merkezine en yakın kaynağı alır.
+                 Büyütmede iki mod aynıdır.
+    """
+    mask = np.asarray(mask, dtype=bool)
+    if mask.shape == (rows, columns):
+        return mask.copy()
+    if mode not in ("any", "nearest"):
+        raise ValueError(f"Geçersiz ölçekleme modu: {mode}")
+    return _scale_axis(_scale_axis(mask, rows, 0, mode), columns, 1, mode)
+
+
+def _scale_axis(mask: np.ndarray, size: int, axis: int, mode: str) -> np.ndarray:
+    source = mask.shape[axis]
+    if source == size:
+        return mask
+    if mode == "any" and size < source:
+        starts = np.floor(np.arange(size) * source / size).astype(np.intp)
+        return np.logical_or.reduceat(mask, starts, axis=axis)
+    centers = np.floor((np.arange(size) + 0.5) * source / size).astype(np.intp)
+    return np.take(mask, np.minimum(centers, source - 1), axis=axis)
+
+
+def mask_from_rects(rows: int, columns: int, rects: Iterable[Rect]) -> np.ndarray:
+    """
+    Oransal dikdörtgenlerden (0-1, sol üst köşe başlangıç) maske üretir.
+    Dikdörtgenin değdiği her hücre seçilir.
+    """
+    rects = np.asarray(list(rects), dtype=float).reshape(-1, 4)
+    if not rects.size:
+        return np.zeros((rows, columns), dtype=bool)
+    x1, x2 = np.minimum(rects[:, 0], rects[:, 2]), np.maximum(rects[:, 0], rects[:, 2])
+    y1, y2 = np.minimum(rects[:, 1], rects[:, 3]), np.maximum(rects[:, 1], rects[:, 3])
+
+    # Hücre sınırları: hücre [i/n, (i+1)/n) aralığı dikdörtgenle kesişiyorsa seçilir
+    col_lo, col_hi = np.arange(columns) / columns, (np.arange(columns) + 1) / columns
+    row_lo, row_hi = np.arange(rows) / rows, (np.arange(rows) + 1) / rows
+    in_cols = (col_hi[None, :] > x1[:, None]) & (col_lo[None, :] < x2[:, None]) # (rect, sütun)
+    in_rows = (row_hi[None, :] > y1[:, None]) & (row_lo[None, :] < y2[:, None]) # (rect, satır)
+    return np.any(in_rows[:, :, None] & in_cols[:, None, :], axis=0)
+
+
+def grid_diff(old: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """İki maske arasında değişen hücreler (bool maske). Boyutlar farklıysa eski maske ölçeklenir."""
+    new = np.asarray(new, dtype=bool)
+    old = scale_grid(old, *new.shape)
+    return old != new
@@ -0,0 +1,195 @@
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """
+    Cihaz devre kesici tarafından erişilemez işaretlendi, istek hiç gönderilmedi.
+    requests.ConnectionError'dan türediği için mevcut hata yakalama blokları aynen çalışır.
+    """
+
+    def __init__(self, device: str, retry_in: float):
+        super().__init__(f"{device} erişilemez (devre açık), {retry_in:.1f} sn sonra tekrar denenecek.")
+        self.device = device
+        self.retry_in = retry_in
+
+
+class DeviceHealth:
+    """
+    Tek cihazın bağlantı sağlığı: uyarlanabilir zaman aşımı ve devre kesici.
+
+    Bağlantı zaman aşımı (TCP RTO mantığı): srtt + k * rttvar, [min_timeout, max_timeout] aralığında.
+    srtt ve rttvar istek sürelerinin EWMA'sıdır; hızlı cihaza kısa, yavaşa uzun süre tanınır.
+
+    Devre kesici:
+    - closed: Normal. Art arda failure_threshold bağlantı hatası/zaman aşımında open olur.
+    - open: İstekler ağa çıkmadan CircuitOpenError ile reddedilir (hızlı hata).
+    - half_open: open_duration dolunca tek bir deneme isteğine izin verilir.
+      Başarılıysa closed, değilse süre ikiye katlanarak (max_open_duration'a kadar) tekrar open.
+
+    HTTP cevabı dönen her istek (401/404/500 dahil) cihazın ayakta olduğunu gösterir, hata sayılmaz.
+    """
+
+    def __init__(self, name: str = "", alpha: float = 0.125, beta: float = 0.25, k: float = 4.0,
+                 min_timeout: float = 2.0, max_timeout: float = 10.0, failure_threshold: int = 3,
+                 open_duration: float = 15.0, max_open_duration: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.alpha = alpha
+        self.beta = beta
+        self.k = k
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.failure_threshold = failure_threshold
+        self.open_duration = open_duration
+        self.max_open_duration = max_open_duration
+        self._clock = clock
+
+        self.srtt: Optional[float] = None
+        self.rttvar: Optional[float] = None
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.stats = {"requests": 0, "successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+        self._current_open_duration = open_duration
+        self._retry_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    # --- ZAMAN AŞIMI ---
+
+    def timeout(self) -> float:
+        """Bir sonraki istek için önerilen zaman aşımı (sn)."""
+        if self.srtt is None:
+            return self.max_timeout # Henüz ölçüm yok
+        return min(self.max_timeout, max(self.min_timeout, self.srtt + self.k * self.rttvar))
+
+    def request_timeout(self) -> Tuple[float, float]:
+        """
+        (bağlantı, okuma) zaman aşımı. Uyarlanabilir değer sadece bağlantıya uygulanır:
+        doğası gereği yavaş cevaplar (kayıt arama, yedek, preset listesi) hızlı cihazda da
+        kısa zaman aşımına düşüp devre kesiciyi açmasın diye okuma max_timeout kalır.
+        """
+        return self.timeout(), self.max_timeout
+
+    # --- DEVRE KESİCİ ---
+
+    def allow(self) -> bool:
+        """İstek gönderilebilir mi? half_open'da sadece tek deneme isteğine izin verir."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self._clock() >= self._retry_at:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.stats["rejected"] += 1
+            return False
+
+    def check(self):
+        """allow() False ise CircuitOpenError fırlatır."""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_in)
+
+    def record_success(self, rtt: float):
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["successes"] += 1
+            if self.srtt is None:
+                self.srtt, self.rttvar = rtt, rtt / 2
+            else:
+                self.rttvar = (1 - self.beta) * self.rttvar + self.beta * abs(self.srtt - rtt)
+                self.srtt = (1 - self.alpha) * self.srtt + self.alpha * rtt
+            self.consecutive_failures = 0
+            if self.state != CLOSED:
+                self.state = CLOSED
+                self._current_open_duration = self.open_duration
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """Bağlantı hatası veya zaman aşımı (cevap alınamadı)."""
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["failures"] += 1
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN:
+                # Deneme başarısız: daha uzun süre kapalı kal
+                self._current_open_duration = min(self.max_open_duration, self._current_open_duration * 2)
+                self._open()
+            elif self.state == CLOSED and self.consecutive_failures >= self.failure_threshold:
+                self._open()
+            self._probe_in_flight = False
+
+    def reset_probe(self):
+        """Sonucu sağlık hakkında bilgi vermeyen istek (örn. geçersiz URL): deneme hakkını geri verir."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def reset(self):
+        with self._lock:
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self._current_open_duration = self.open_duration
+            self._probe_in_flight = False
+
+    def _open(self):
+        self.state = OPEN
+        self._retry_at = self._clock() + self._current_open_duration
+        self.stats["opened"] += 1
+
+    # --- DURUM ---
+
+    @property
+    def available(self) -> bool:
+        """Filo zamanlayıcıları için: cihaza şu an istek gönderilebilir mi (deneme hakkı dahil)?"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            return self._clock() >= self._retry_at
+        return not self._probe_in_flight
+
+    @property
+    def retry_in(self) -> float:
+        return max(0.0, self._retry_at - self._clock()) if self.state == OPEN else 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "device": self.name,
+            "state": self.state,
+            "available": self.available,
+            "srtt_ms": round(self.srtt * 1000, 1) if self.srtt is not None else None,
+            "timeout": round(self.timeout(), 2),
+            "consecutive_failures": self.consecutive_failures,
+            "retry_in": round(self.retry_in, 1),
+            **self.stats,
+        }
+
+
+# Aynı cihaza açılan tüm oturumlar (örn. farklı kullanıcılarla) tek sağlık kaydını paylaşır
+_registry: Dict[str, DeviceHealth] = {}
+_registry_lock = threading.Lock()
+
+
+def device_health(key: str, **options) -> DeviceHealth:
+    """'ip:port' için paylaşılan DeviceHealth (ilk çağrıdaki ayarlarla oluşturulur)."""
+    with _registry_lock:
+        health = _registry.get(key)
+        if health is None:
+            health = _registry[key] = DeviceHealth(name=key, **options)
+        return health
+
+
+def fleet_health() -> Dict[str, dict]:
+    """Bilinen tüm cihazların sağlık durumu."""
+    with _registry_lock:
+        items = list(_registry.items())
+    return {key: health.snapshot() for key, health in items}
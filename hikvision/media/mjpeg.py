@@ -0,0 +1,168 @@
+import time
+from typing import Callable, Generator, Optional, Tuple
+
+
+class MJPEGFrameIterator:
+    """
+    Cihazın multipart HTTP önizleme akışından (MJPEG) JPEG kareleri okur.
+
+    - Veri tek bir yeniden kullanılan buffer'a readinto ile okunur, her kare bu buffer'ın
+      memoryview dilimi olarak döner (kare başına kopya yok).
+      DİKKAT: Dönen memoryview sadece bir sonraki kareye kadar geçerlidir.
+      Saklamak gerekiyorsa bytes(frame) ile kopyalanmalı.
+    - drop_stale: Tüketici geride kaldıysa (buffer'da daha yeni tam kare varsa) eski kare atlanır.
+    - max_fps: Tüketiciye bu hızdan fazla kare verilmez, aradaki kareler atlanır.
+    - stats / fps / input_fps ile elde edilen hız ve düşen kareler raporlanır.
+
+    Kullanım:
+        with cam.streaming.open_preview(channel=102, max_fps=5) as frames:
+            for frame in frames:
+                analyze(frame)           # memoryview
+            print(frames.fps, frames.stats["dropped"])
+    """
+
+    def __init__(self, reader, boundary: bytes, buffer_size: int = 1024 * 1024, read_size: int = 64 * 1024,
+                 max_buffer_size: int = 32 * 1024 * 1024, max_fps: float = None, drop_stale: bool = True,
+                 on_close: Callable[[], None] = None, clock: Callable[[], float] = time.monotonic):
+        """
+        :param reader: readinto(memoryview) -> int destekleyen akış (örn. response.raw).
+        :param boundary: Multipart boundary (başındaki '--' olmadan).
+        :param max_buffer_size: Tek kare bu boyutu aşarsa akış bozuk kabul edilir.
+        """
+        self._reader = reader
+        self._delimiter = b"--" + boundary
+        self._buffer_size = buffer_size
+        self._read_size = read_size
+        self._max_buffer_size = max_buffer_size
+        self.max_fps = max_fps
+        self.drop_stale = drop_stale
+        self._on_close = on_close
+        self._clock = clock
+        self._closed = False
+
+        self.stats = {"received": 0, "yielded": 0, "dropped": 0, "bytes": 0}
+        self._started_at: Optional[float] = None
+        self._last_yield_at: Optional[float] = None
+
+    # --- GENEL API ---
+
+    def __iter__(self) -> Generator[memoryview, None, None]:
+        return self._frames()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            if self._on_close:
+                self._on_close()
+
+    @property
+    def fps(self) -> float:
+        """Tüketiciye verilen kare hızı."""
+        return self._rate(self.stats["yielded"])
+
+    @property
+    def input_fps(self) -> float:
+        """Cihazdan gelen kare hızı."""
+        return self._rate(self.stats["received"])
+
+    # --- İÇ METOTLAR ---
+
+    def _rate(self, count: int) -> float:
+        if self._started_at is None:
+            return 0.0
+        elapsed = self._clock() - self._started_at
+        return count / elapsed if elapsed > 0 else 0.0
+
+    def _frames(self) -> Generator[memoryview, None, None]:
+        buf = bytearray(self._buffer_size)
+        view = memoryview(buf)
+        start = 0 # Henüz işlenmemiş verinin başı
+        end = 0   # Buffer'daki verinin sonu
+        lookahead = None
+        self._started_at = self._clock()
+
+        try:
+            while not self._closed:
+                location = lookahead or self._find_frame(buf, start, end)
+                lookahead = None
+
+                if location is None:
+                    # Daha fazla veri lazım: işlenmiş kısmı at, gerekirse buffer'ı büyüt
+                    if start:
+                        remaining = end - start
+                        buf[0:remaining] = buf[start:end] # Sadece yarım kalan kuyruk kopyalanır
+                        start, end = 0, remaining
+                    if end == len(buf):
+                        if len(buf) * 2 > self._max_buffer_size:
+                            raise ValueError("MJPEG karesi buffer sınırını aştı (boundary bulunamadı).")
+                        grown = bytearray(len(buf) * 2)
+                        grown[:end] = buf[:end]
+                        buf, view = grown, memoryview(grown)
+
+                    read = self._reader.readinto(view[end:min(len(buf), end + self._read_size)])
+                    if not read:
+                        return # Akış bitti
+                    end += read
+                    continue
+
+                body_start, body_end = location
+                start = body_end
+                self.stats["received"] += 1
+                self.stats["bytes"] += body_end - body_start
+
+                # Kare atlama politikaları
+                if self.drop_stale:
+                    lookahead = self._find_frame(buf, start, end)
+                    if lookahead is not None:
+                        self.stats["dropped"] += 1
+                        continue
+
+                now = self._clock()
+                if self.max_fps and self._last_yield_at is not None and now - self._last_yield_at < 1.0 / self.max_fps:
+                    self.stats["dropped"] += 1
+                    continue
+
+                self._last_yield_at = now
+                self.stats["yielded"] += 1
+                yield view[body_start:body_end]
+        finally:
+            self.close()
+
+    def _find_frame(self, buf: bytearray, start: int, end: int) -> Optional[Tuple[int, int]]:
+        """[start, end) aralığında tam bir parça varsa (gövde başı, gövde sonu) döner."""
+        delimiter = buf.find(self._delimiter, start, end)
+        if delimiter == -1:
+            return None
+        header_end = buf.find(b"\r\n\r\n", delimiter, end)
+        if header_end == -1:
+            return None
+
+        body_start = header_end + 4
+        length = None
+        # Başlıklar kısa, sadece Content-Length için decode ediliyor
+        for line in bytes(buf[delimiter + len(self._delimiter):header_end]).split(b"\r\n"):
+            key, sep, value = line.partition(b":")
+            if sep and key.strip().lower() == b"content-length" and value.strip().isdigit():
+                length = int(value.strip())
+                break
+
+        if length is not None:
+            body_end = body_start + length
+            if body_end > end:
+                return None
+            return body_start, body_end
+
+        # Content-Length yoksa bir sonraki boundary'ye kadar
+        next_delimiter = buf.find(self._delimiter, body_start, end)
+        if next_delimiter == -1:
+            return None
+        body_end = next_delimiter
+        if buf[body_end - 2:body_end] == b"\r\n":
+            body_end -= 2
+        return body_start, body_end
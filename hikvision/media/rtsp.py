@@ -0,0 +1,617 @@
+import asyncio
+import base64
+import datetime
+import re
+import struct
+import time
+from collections import deque
+from typing import AsyncGenerator, Dict, List, Optional, Union
+from urllib.parse import unquote, urlsplit, urlunsplit
+
+from ..auth import DigestAuth
+
+START_CODE = b"\x00\x00\x00\x01"
+
+_RTP_HEADER = struct.Struct("!BBHII")
+
+
+class RTSPError(Exception):
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        self.status = status
+
+
+# --- RTP ---
+
+class RTPPacket:
+    """Tek RTP paketi. payload, alınan buffer'ın memoryview dilimidir (kopya yok)."""
+    __slots__ = ("channel", "marker", "payload_type", "sequence", "timestamp", "ssrc", "payload")
+
+    @classmethod
+    def parse(cls, channel: int, data: bytes) -> "RTPPacket":
+        if len(data) < 12 or data[0] >> 6 != 2:
+            raise RTSPError("Geçersiz RTP paketi.")
+        first, second, sequence, timestamp, ssrc = _RTP_HEADER.unpack_from(data)
+
+        offset = 12 + (first & 0x0F) * 4     # CSRC listesi
+        if first & 0x10:                     # Header extension
+            offset += 4 + int.from_bytes(data[offset + 2:offset + 4], "big") * 4
+        end = len(data)
+        if first & 0x20:                     # Padding
+            end -= data[-1]
+
+        packet = cls()
+        packet.channel = channel
+        packet.marker = bool(second & 0x80)
+        packet.payload_type = second & 0x7F
+        packet.sequence = sequence
+        packet.timestamp = timestamp
+        packet.ssrc = ssrc
+        packet.payload = memoryview(data)[offset:max(offset, end)]
+        return packet
+
+
+class NALUnit:
+    """Başlığı dahil, start code'suz tek NAL birimi."""
+    __slots__ = ("data", "type", "timestamp")
+
+    def __init__(self, data: Union[memoryview, bytes], nal_type: int, timestamp: Optional[int]):
+        self.data = data
+        self.type = nal_type
+        self.timestamp = timestamp
+
+    def __repr__(self):
+        return f"NALUnit(type={self.type}, size={len(self.data)})"
+
+
+class AccessUnit:
+    """Aynı RTP zaman damgasına sahip NAL birimleri (bir video karesi)."""
+    __slots__ = ("timestamp", "pts", "nal_units", "keyframe")
+
+    def __init__(self, timestamp: int, pts: float, nal_units: List[NALUnit], keyframe: bool):
+        self.timestamp = timestamp
+        self.pts = pts # Akış başından itibaren saniye
+        self.nal_units = nal_units
+        self.keyframe = keyframe
+
+    def annexb(self) -> bytes:
+        """Decoder/dosya için start code'lu tek buffer (burada kopyalanır)."""
+        return b"".join(part for nal in self.nal_units for part in (START_CODE, nal.data))
+
+    def __repr__(self):
+        return f"AccessUnit(pts={self.pts:.3f}, nals={len(self.nal_units)}, keyframe={self.keyframe})"
+
+
+class _Depacketizer:
+    """
+    RTP payload'larından NAL birimlerini çıkarır (RFC 6184 / RFC 7798 ortak mantığı).
+    Tekli ve birleşik paketlerdeki NAL'lar payload'ın memoryview dilimidir;
+    sadece parçalı (FU) NAL'lar bir kez birleştirilir.
+    """
+    codec = ""
+    header_size = 1
+    aggregation_type = -1
+    fragment_type = -1
+    keyframe_types = frozenset()
+    parameter_types = frozenset()
+
+    def __init__(self):
+        self._fragment: Optional[bytearray] = None
+        self._expected_sequence: Optional[int] = None
+        self.stats = {"packets": 0, "lost": 0, "dropped_fragments": 0}
+
+    @staticmethod
+    def nal_type(nal) -> int:
+        raise NotImplementedError
+
+    def _is_single(self, nal_type: int) -> bool:
+        raise NotImplementedError
+
+    def _fragment_header(self, payload: memoryview) -> bytes:
+        raise NotImplementedError
+
+    def push(self, packet: RTPPacket) -> List[memoryview]:
+        self.stats["packets"] += 1
+        if self._expected_sequence is not None and packet.sequence != self._expected_sequence:
+            self.stats["lost"] += (packet.sequence - self._expected_sequence) & 0xFFFF
+            if self._fragment is not None:
+                # Ortası kayıp NAL'ı decoder'a vermek yerine atıyoruz
+                self._fragment = None
+                self.stats["dropped_fragments"] += 1
+        self._expected_sequence = (packet.sequence + 1) & 0xFFFF
+
+        payload = packet.payload
+        if len(payload) <= self.header_size:
+            return []
+        nal_type = self.nal_type(payload)
+
+        if self._is_single(nal_type):
+            return [payload]
+
+        if nal_type == self.aggregation_type:
+            # [boyut(2 byte) | NAL] tekrarları
+            nals = []
+            offset = self.header_size
+            while offset + 2 <= len(payload):
+                size = (payload[offset] << 8) | payload[offset + 1]
+                offset += 2
+                if size == 0 or offset + size > len(payload):
+                    break
+                nals.append(payload[offset:offset + size])
+                offset += size
+            return nals
+
+        if nal_type == self.fragment_type:
+            fu = payload[self.header_size]
+            data = payload[self.header_size + 1:]
+            if fu & 0x80: # Başlangıç
+                if self._fragment is not None:
+                    self.stats["dropped_fragments"] += 1
+                self._fragment = bytearray(self._fragment_header(payload))
+                self._fragment += data
+            elif self._fragment is None:
+                return [] # Başı kaybolmuş parça
+            else:
+                self._fragment += data
+
+            if fu & 0x40: # Bitiş
+                nal = memoryview(self._fragment)
+                self._fragment = None
+                return [nal]
+        return []
+
+
+class H264Depacketizer(_Depacketizer):
+    codec = "H264"
+    header_size = 1
+    aggregation_type = 24 # STAP-A
+    fragment_type = 28    # FU-A
+    keyframe_types = frozenset({5})
+    parameter_types = frozenset({7, 8})
+
+    @staticmethod
+    def nal_type(nal) -> int:
+        return nal[0] & 0x1F
+
+    def _is_single(self, nal_type: int) -> bool:
+        return 1 <= nal_type <= 23
+
+    def _fragment_header(self, payload: memoryview) -> bytes:
+        return bytes(((payload[0] & 0xE0) | (payload[1] & 0x1F),))
+
+
+class H265Depacketizer(_Depacketizer):
+    codec = "H265"
+    header_size = 2
+    aggregation_type = 48 # AP
+    fragment_type = 49    # FU
+    keyframe_types = frozenset(range(16, 22)) # BLA/IDR/CRA
+    parameter_types = frozenset({32, 33, 34}) # VPS/SPS/PPS
+
+    @staticmethod
+    def nal_type(nal) -> int:
+        return (nal[0] >> 1) & 0x3F
+
+    def _is_single(self, nal_type: int) -> bool:
+        return nal_type < 48
+
+    def _fragment_header(self, payload: memoryview) -> bytes:
+        return bytes(((payload[0] & 0x81) | ((payload[2] & 0x3F) << 1), payload[1]))
+
+
+DEPACKETIZERS = {"H264": H264Depacketizer, "H265": H265Depacketizer, "HEVC": H265Depacketizer}
+
+
+# --- SDP ---
+
+def parse_sdp(text: str) -> List[dict]:
+    """SDP'deki medya bölümlerini (m=) sözlük listesi olarak döner."""
+    media = []
+    current = None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("m="):
+            parts = line[2:].split()
+            current = {
+                "media": parts[0],
+                "payload_type": int(parts[3]) if len(parts) > 3 and parts[3].isdigit() else None,
+                "codec": None, "clock_rate": 90000, "control": None, "fmtp": {},
+            }
+            media.append(current)
+        elif current is None:
+            continue
+        elif line.startswith("a=rtpmap:"):
+            _, _, encoding = line[9:].partition(" ")
+            parts = encoding.split("/")
+            current["codec"] = parts[0].upper()
+            if len(parts) > 1 and parts[1].isdigit():
+                current["clock_rate"] = int(parts[1])
+        elif line.startswith("a=control:"):
+            current["control"] = line[10:]
+        elif line.startswith("a=fmtp:"):
+            _, _, params = line[7:].partition(" ")
+            for param in params.split(";"):
+                key, _, value = param.strip().partition("=")
+                if key:
+                    current["fmtp"][key.lower()] = value
+    return media
+
+
+def sdp_parameter_sets(track: dict) -> List[bytes]:
+    """SDP fmtp içindeki SPS/PPS (H.265 için VPS/SPS/PPS) parametre setleri."""
+    fmtp = track.get("fmtp", {})
+    if track.get("codec") == "H264":
+        encoded = fmtp.get("sprop-parameter-sets", "").split(",")
+    else:
+        encoded = [fmtp.get(key, "") for key in ("sprop-vps", "sprop-sps", "sprop-pps")]
+
+    sets = []
+    for item in encoded:
+        item = item.strip()
+        if item:
+            try:
+                sets.append(base64.b64decode(item + "=" * (-len(item) % 4)))
+            except ValueError:
+                pass
+    return sets
+
+
+def format_clock(value: Union[datetime.datetime, str]) -> str:
+    """datetime -> 20251204T120000Z (ISAPI playback / RTSP clock formatı)."""
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(datetime.timezone.utc)
+        return value.strftime("%Y%m%dT%H%M%SZ")
+    return value.replace("-", "").replace(":", "")
+
+
+# --- RTSP ---
+
+class _RTSPResponse:
+    __slots__ = ("status", "reason", "headers", "challenges", "body")
+
+    def __init__(self, status: int, reason: str, headers: Dict[str, str], challenges: List[str], body: bytes):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.challenges = challenges
+        self.body = body
+
+
+class _TimedStreamProtocol(asyncio.StreamReaderProtocol):
+    """Canlılık tüketicinin okuma hızından bağımsız ölçülsün diye soket okumalarını zaman damgalar."""
+
+    def __init__(self, reader: asyncio.StreamReader, client: "RTSPClient"):
+        super().__init__(reader)
+        self._client = client
+
+    def data_received(self, data: bytes):
+        self._client._last_data_at = time.monotonic()
+        super().data_received(data)
+
+
+class RTSPClient:
+    """
+    asyncio tabanlı, harici bağımlılığı olmayan RTSP/RTP alıcısı.
+
+    - Digest/Basic kimlik doğrulama, RTP-over-TCP (interleaved) taşıma.
+    - H.264 ve H.265 depaketleme; NAL birimleri veya access unit (kare) olarak okunur.
+    - start/end verilirse playback (ISAPI starttime/endtime + RTSP Range: clock=...).
+    - Thread kullanmaz; tek event loop içinde binlerce akış açılabilir.
+      Zaman aşımı paket başına değil, keepalive görevindeki watchdog ile kontrol edilir.
+
+    Kullanım:
+        async with RTSPClient("rtsp://192.168.1.64:554/Streaming/Channels/101", "admin", "pass") as stream:
+            async for frame in stream.access_units():
+                decoder.feed(frame.annexb())
+    """
+
+    def __init__(self, url: str, username: str = None, password: str = None, timeout: float = 10.0,
+                 start: Union[datetime.datetime, str] = None, end: Union[datetime.datetime, str] = None,
+                 user_agent: str = "hikvision-python", max_early_packets: int = 256):
+        """
+        :param url: rtsp://host[:port]/yol. URL'deki kullanıcı bilgisi (varsa) ayrıştırılıp çıkarılır.
+        :param timeout: Bağlantı, cevap ve veri gelmeme zaman aşımı (sn).
+        :param start/end: Playback aralığı (datetime veya 20251204T120000Z).
+        """
+        parts = urlsplit(url)
+        if parts.scheme.lower() != "rtsp":
+            raise ValueError(f"RTSP URL bekleniyordu: {url}")
+        self.host = parts.hostname
+        self.port = parts.port or 554
+        username = username if username is not None else unquote(parts.username or "")
+        password = password if password is not None else unquote(parts.password or "")
+
+        query = parts.query
+        if start is not None:
+            playback = f"starttime={format_clock(start)}" + (f"&endtime={format_clock(end)}" if end is not None else "")
+            query = f"{query}&{playback}" if query else playback
+        netloc = f"{self.host}:{self.port}" if ":" not in self.host else f"[{self.host}]:{self.port}"
+        self.url = urlunsplit(("rtsp", netloc, parts.path or "/", query, ""))
+
+        self.timeout = timeout
+        self.start = start
+        self.end = end
+        self.user_agent = user_agent
+
+        self.codec: Optional[str] = None
+        self.clock_rate = 90000
+        self.parameter_sets: List[bytes] = []
+        self.stats = {"packets": 0, "bytes": 0, "lost": 0, "access_units": 0}
+
+        self._auth = DigestAuth(username, password)
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._cseq = 0
+        self._session_id: Optional[str] = None
+        self._session_timeout = 60
+        self._rtp_channel = 0
+        self._depacketizer: Optional[_Depacketizer] = None
+        self._early = deque(maxlen=max_early_packets) # PLAY cevabından önce gelen (kanal, çerçeve) çiftleri
+        self._keepalive_task: Optional[asyncio.Task] = None
+        self._last_data_at = 0.0
+        self._first_timestamp: Optional[int] = None
+        self._last_timestamp = 0
+        self._elapsed_ticks = 0
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def __aiter__(self):
+        return self.access_units()
+
+    # --- OTURUM ---
+
+    async def connect(self):
+        """OPTIONS -> DESCRIBE -> SETUP -> PLAY"""
+        self._reader, self._writer = await asyncio.wait_for(self._open_connection(), self.timeout)
+        try:
+            await self._request("OPTIONS", self.url)
+            described = await self._request("DESCRIBE", self.url, {"Accept": "application/sdp"})
+
+            base = described.headers.get("content-base") or described.headers.get("content-location") or self.url
+            track = next((m for m in parse_sdp(described.body.decode("utf-8", "replace"))
+                          if m["media"] == "video" and m["codec"] in DEPACKETIZERS), None)
+            if track is None:
+                raise RTSPError("SDP içinde desteklenen (H.264/H.265) video bulunamadı.")
+            self.codec = "H265" if track["codec"] == "HEVC" else track["codec"]
+            self.clock_rate = track["clock_rate"]
+            self.parameter_sets = sdp_parameter_sets(track)
+            self._depacketizer = DEPACKETIZERS[track["codec"]]()
+
+            setup = await self._request("SETUP", self._control_url(base, track["control"]),
+                                        {"Transport": "RTP/AVP/TCP;unicast;interleaved=0-1"})
+            session = setup.headers.get("session")
+            if not session:
+                raise RTSPError("SETUP cevabında Session yok.")
+            self._session_id, _, params = session.partition(";")
+            match = re.search(r"timeout=(\d+)", params)
+            if match:
+                self._session_timeout = int(match.group(1))
+            match = re.search(r"interleaved=(\d+)", setup.headers.get("transport", ""))
+            if match:
+                self._rtp_channel = int(match.group(1))
+
+            if self.start is not None:
+                play_range = f"clock={format_clock(self.start)}-" + (format_clock(self.end) if self.end is not None else "")
+            else:
+                play_range = "npt=0.000-"
+            await self._request("PLAY", self.url, {"Range": play_range})
+        except BaseException:
+            self._writer.close()
+            raise
+
+        self._last_data_at = time.monotonic()
+        self._keepalive_task = asyncio.ensure_future(self._keepalive())
+
+    async def close(self):
+        """TEARDOWN gönderir (cevap beklenmez) ve bağlantıyı kapatır."""
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
+        if self._writer is None:
+            return
+        try:
+            if self._session_id and not self._writer.is_closing():
+                self._send("TEARDOWN", self.url)
+                await asyncio.wait_for(self._writer.drain(), 1.0)
+        except (ConnectionError, asyncio.TimeoutError):
+            pass
+        finally:
+            self._writer.close()
+            self._writer = None
+
+    # --- VERİ ---
+
+    async def packets(self) -> AsyncGenerator[RTPPacket, None]:
+        """Video kanalındaki RTP paketleri. RTCP ve araya giren RTSP cevapları atlanır."""
+        while self._reader is not None:
+            if self._early:
+                channel, message = self._early.popleft()
+            else:
+                try:
+                    channel, message = await self._read_message()
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return # Akış bitti (playback sonu veya bağlantı koptu)
+            if channel != self._rtp_channel:
+                continue
+            self.stats["packets"] += 1
+            self.stats["bytes"] += len(message)
+            try:
+                yield RTPPacket.parse(channel, message)
+            except RTSPError:
+                continue
+
+    async def nal_units(self) -> AsyncGenerator[NALUnit, None]:
+        """Depaketlenmiş NAL birimleri. İlk olarak SDP'deki parametre setleri verilir."""
+        depacketizer = self._depacketizer
+        for data in self.parameter_sets:
+            yield NALUnit(data, depacketizer.nal_type(data), None)
+        async for packet in self.packets():
+            for nal in depacketizer.push(packet):
+                yield NALUnit(nal, depacketizer.nal_type(nal), packet.timestamp)
+            self.stats["lost"] = depacketizer.stats["lost"]
+
+    async def access_units(self, wait_keyframe: bool = True) -> AsyncGenerator[AccessUnit, None]:
+        """
+        NAL birimlerini karelere gruplar (marker biti veya zaman damgası değişimi ile).
+        wait_keyframe: İlk anahtar kareye kadar gelenleri atla (decoder bunlarla başlayamaz).
+        SDP'deki parametre setleri ilk anahtar karenin başına eklenir.
+        """
+        depacketizer = self._depacketizer
+        pending_parameters = [NALUnit(data, depacketizer.nal_type(data), None) for data in self.parameter_sets]
+        current: List[NALUnit] = []
+        current_timestamp = None
+        started = not wait_keyframe
+
+        def build(nals: List[NALUnit], timestamp: int) -> Optional[AccessUnit]:
+            nonlocal started, pending_parameters
+            types = {nal.type for nal in nals}
+            keyframe = bool(types & depacketizer.keyframe_types)
+            if not keyframe and not started:
+                return None
+            started = True
+            if keyframe and pending_parameters:
+                if not types & depacketizer.parameter_types:
+                    nals = pending_parameters + nals
+                pending_parameters = []
+            self.stats["access_units"] += 1
+            return AccessUnit(timestamp, self._pts(timestamp), nals, keyframe)
+
+        async for packet in self.packets():
+            if current and packet.timestamp != current_timestamp:
+                # Marker biti kaybolmuş, zaman damgası değişti
+                unit = build(current, current_timestamp)
+                current = []
+                if unit is not None:
+                    yield unit
+
+            current_timestamp = packet.timestamp
+            for nal in depacketizer.push(packet):
+                current.append(NALUnit(nal, depacketizer.nal_type(nal), packet.timestamp))
+            self.stats["lost"] = depacketizer.stats["lost"]
+
+            if packet.marker and current:
+                unit = build(current, current_timestamp)
+                current = []
+                if unit is not None:
+                    yield unit
+
+    # --- İÇ METOTLAR ---
+
+    async def _open_connection(self):
+        """asyncio.open_connection ile aynı, ek olarak soketten veri geldikçe _last_data_at güncellenir."""
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=2 ** 16, loop=loop)
+        protocol = _TimedStreamProtocol(reader, self)
+        transport, _ = await loop.create_connection(lambda: protocol, self.host, self.port)
+        return reader, asyncio.StreamWriter(transport, protocol, reader, loop)
+
+    def _pts(self, timestamp: int) -> float:
+        """32 bit RTP zaman damgasını taşmaya dayanıklı şekilde saniyeye çevirir."""
+        if self._first_timestamp is None:
+            self._first_timestamp = self._last_timestamp = timestamp
+        delta = (timestamp - self._last_timestamp) & 0xFFFFFFFF
+        if delta >= 0x80000000:
+            delta -= 0x100000000 # Geriye doğru (B-frame vb.)
+        self._elapsed_ticks += delta
+        self._last_timestamp = timestamp
+        return self._elapsed_ticks / self.clock_rate
+
+    @staticmethod
+    def _control_url(base: str, control: Optional[str]) -> str:
+        if not control or control == "*":
+            return base
+        if control.lower().startswith("rtsp://"):
+            return control
+        # Content-Base yoksa base sorgu içerebilir (playback: ?starttime=...): control yola eklenir
+        parts = urlsplit(base)
+        return urlunsplit(parts._replace(path=parts.path.rstrip("/") + "/" + control))
+
+    def _send(self, method: str, url: str, headers: Dict[str, str] = None):
+        self._cseq += 1
+        lines = [f"{method} {url} RTSP/1.0", f"CSeq: {self._cseq}", f"User-Agent: {self.user_agent}"]
+        authorization = self._auth.header(method, url)
+        if authorization:
+            lines.append(f"Authorization: {authorization}")
+        if self._session_id:
+            lines.append(f"Session: {self._session_id}")
+        lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+        self._writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+        return self._cseq
+
+    async def _request(self, method: str, url: str, headers: Dict[str, str] = None) -> _RTSPResponse:
+        for attempt in range(3):
+            cseq = self._send(method, url, headers)
+            await self._writer.drain()
+            response = await asyncio.wait_for(self._read_response(cseq), self.timeout)
+
+            if response.status == 401 and attempt < 2:
+                stale = any("stale=true" in c.lower() for c in response.challenges)
+                if self._auth.challenge(response.challenges) and (attempt == 0 or stale):
+                    continue
+            if response.status != 200:
+                raise RTSPError(f"RTSP {method} başarısız: {response.status} {response.reason}", response.status)
+            return response
+        raise RTSPError(f"RTSP {method} kimlik doğrulama başarısız.", 401)
+
+    async def _read_response(self, cseq: int) -> _RTSPResponse:
+        while True:
+            channel, message = await self._read_message()
+            if channel is not None:
+                self._early.append((channel, message)) # PLAY cevabından önce gelen RTP/RTCP
+                continue
+            if message.headers.get("cseq", str(cseq)) == str(cseq):
+                return message
+
+    async def _read_message(self):
+        """(kanal, RTP/RTCP verisi) veya (None, RTSP cevabı) döner."""
+        first = await self._reader.readexactly(1)
+        if first == b"$":
+            header = await self._reader.readexactly(3)
+            return header[0], await self._reader.readexactly((header[1] << 8) | header[2])
+
+        head = (first + await self._reader.readuntil(b"\r\n\r\n")).decode("utf-8", "replace")
+        lines = head.split("\r\n")
+        status, reason = 0, ""
+        parts = lines[0].split(" ", 2)
+        if parts[0].startswith("RTSP/") and len(parts) > 1 and parts[1].isdigit():
+            status, reason = int(parts[1]), parts[2] if len(parts) > 2 else ""
+
+        headers, challenges = {}, []
+        for line in lines[1:]:
+            key, sep, value = line.partition(":")
+            if not sep:
+                continue
+            key, value = key.strip().lower(), value.strip()
+            if key == "www-authenticate":
+                challenges.append(value)
+            headers[key] = value
+
+        length = int(headers.get("content-length", "0") or 0)
+        body = await self._reader.readexactly(length) if length else b""
+        return None, _RTSPResponse(status, reason, headers, challenges, body)
+
+    async def _keepalive(self):
+        """Oturumu canlı tutar, veri gelmiyorsa bağlantıyı kapatır (okuyan taraf sonlanır)."""
+        interval = max(1.0, min(self._session_timeout / 2, self.timeout))
+        next_keepalive = time.monotonic() + self._session_timeout / 2
+        try:
+            while self._writer is not None and not self._writer.is_closing():
+                await asyncio.sleep(interval)
+                now = time.monotonic()
+                # Okuma duraklatıldıysa (tampon dolu) yavaş olan tüketicidir, kamera değil
+                reading = self._writer.transport.is_reading()
+                if reading and now - self._last_data_at > self.timeout:
+                    self._writer.close()
+                    return
+                if now >= next_keepalive:
+                    # Cevap veri döngüsünde okunup atlanır
+                    self._send("GET_PARAMETER", self.url)
+                    next_keepalive = now + self._session_timeout / 2
+        except (asyncio.CancelledError, ConnectionError):
+            pass
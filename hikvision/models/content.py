@@ -20,6 +20,8 @@ class SearchResult(BaseModel):
     """Arama sonucunda dönen ana yapı"""
     search_id: Optional[str] = Field(default=None, alias="searchID")
     response_status: str = Field(alias="responseStatus") 
+    # OK: arama bitti, MORE: searchResultPostion ilerletilerek devam edilir, NO MATCHES: sonuç yok
+    response_status_strg: Optional[str] = Field(default=None, alias="responseStatusStrg")
     num_of_matches: int = Field(alias="numOfMatches")
     match_list: List[SearchMatchItem] = Field(default=[], alias="matchList")
 
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field, AliasChoices
-from typing import Optional
+from pydantic import BaseModel, Field, AliasChoices, ConfigDict
+from typing import Optional, Any, List, Tuple
 from datetime import datetime
 
 class EventAlert(BaseModel):
@@ -7,6 +7,9 @@ class EventAlert(BaseModel):
     Canlı alarm akışından gelen tekil olay bildirimi.
     Ref: ISAPI PDF Section 8.11.12 EventNotificationAlert XML Block
     """
+    # Journal/replay için model_dump() çıktısı tekrar yüklenebilsin
+    model_config = ConfigDict(populate_by_name=True)
+
     ip_address: Optional[str] = Field(default=None, validation_alias="ipAddress")
     port_no: Optional[int] = Field(default=None, validation_alias="portNo")
     channel_id: Optional[str] = Field(default="1", validation_alias="channelID")
@@ -21,6 +24,53 @@ class EventAlert(BaseModel):
     
     description: Optional[str] = Field(default="", validation_alias="eventDescription")
 
+    mac_address: Optional[str] = Field(default=None, validation_alias="macAddress")
+
+    # IO alarmlarında tetiklenen giriş portu (eski firmware: dynInputIOPortID)
+    io_port_id: Optional[str] = Field(default=None, validation_alias=AliasChoices("inputIOPortID", "dynInputIOPortID"))
+
+    # Multipart akışta XML'den sonra gelen resim parçası (varsa). Journal'a yazılmaz.
+    image: Optional[bytes] = Field(default=None, exclude=True, repr=False)
+
+    # Akıllı olaylarda (linedetection, fielddetection) bölge bilgisi iç içe gelir:
+    # <DetectionRegionList><DetectionRegionEntry><regionID>1</regionID>...
+    detection_regions: Optional[Any] = Field(default=None, validation_alias="DetectionRegionList")
+
+    @property
+    def region_id(self) -> Optional[str]:
+        """Olayın ilk bölge ID'si (bölgesiz olaylarda None)"""
+        regions = self.detection_regions
+        if not isinstance(regions, dict):
+            return None
+        entry = regions.get("DetectionRegionEntry")
+        if isinstance(entry, list):
+            entry = entry[0] if entry else None
+        if isinstance(entry, dict) and entry.get("regionID") is not None:
+            return str(entry.get("regionID"))
+        return None
+
+class EventTransition(BaseModel):
+    """
+    Durum makinesinin ürettiği geçiş (olayın başlaması veya bitmesi).
+    Tekrarlanan 'active' bildirimleri tek bir olayda birleştirilir.
+    """
+    kind: str # start, end
+    device: Optional[str] = None
+    channel_id: Optional[str] = None
+    event_type: str
+    region_id: Optional[str] = None
+
+    started_at: datetime
+    ended_at: Optional[datetime] = None
+    duration: Optional[float] = Field(default=None, description="Saniye cinsinden süre (sadece end)")
+    repeat_count: int = Field(default=1, description="Birleştirilen bildirim sayısı")
+    reason: Optional[str] = None # inactive, timeout, evicted (sadece end)
+    alert: Optional[EventAlert] = Field(default=None, description="Son alınan ham bildirim")
+
+    @property
+    def key(self) -> Tuple[Optional[str], Optional[str], str, Optional[str]]:
+        return (self.device, self.channel_id, self.event_type, self.region_id)
+
 class VMDConfig(BaseModel):
     """
     Hareket Algılama Ayarları
@@ -29,4 +79,35 @@ class VMDConfig(BaseModel):
     enabled: bool = Field(..., alias="enabled")
     # Hassasiyet genelde XML içinde iç içe liste halindedir,
     # basitleştirmek için sadece ana açma/kapama ve grid kontrolü yapacağız.
-    # Ancak modern kameralarda sensitivityLevel direkt de gelebilir.
\ No newline at end of file
+    # Ancak modern kameralarda sensitivityLevel direkt de gelebilir.
+
+class MotionGrid(BaseModel):
+    """
+    Hareket algılama ızgarası ve hassasiyeti.
+    grid_map: Cihazın hex bit haritası (satır başına bayta tamamlanmış bitler). Bkz: hikvision.grid
+    """
+    channel: int
+    enabled: bool
+    sensitivity: Optional[int] = None # 0-100
+    rows: int = 18
+    columns: int = 22
+    grid_map: str = ""
+
+    def mask(self):
+        """Izgarayı (rows, columns) NumPy bool maskesi olarak döner."""
+        from ..grid import unpack_grid
+        return unpack_grid(self.grid_map, self.rows, self.columns)
+
+class SmartRegion(BaseModel):
+    """
+    Akıllı olay bölgesi (çizgi geçme, alan ihlali, bölgeye giriş/çıkış).
+    points: Cihaz koordinatları (varsayılan 0-1000, Y aşağıdan yukarı). Bkz: hikvision.geometry
+    """
+    event: str
+    channel: int
+    id: int
+    enabled: bool = True
+    sensitivity: Optional[int] = None
+    points: List[Tuple[int, int]] = Field(default_factory=list)
+    direction: Optional[str] = None    # Sadece çizgi: any, left-right, right-left
+    time_threshold: Optional[int] = None # Sadece alan ihlali (sn)
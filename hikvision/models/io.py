@@ -1,8 +1,21 @@
 from pydantic import BaseModel, Field
+from typing import Optional
 
 # Ref: ISAPI PDF Section 8.3.1 IOPortStatus XML Block [cite: 943]
 
 class IOPortStatus(BaseModel):
     port_id: int = Field(..., validation_alias="ioPortID")
     port_type: str = Field(..., validation_alias="ioPortType") # input, output
-    state: str = Field(..., validation_alias="ioState") # active, inactive
\ No newline at end of file
+    state: str = Field(..., validation_alias="ioState") # active, inactive
+
+class IOPortChange(BaseModel):
+    """
+    IO durum aynasının abonelere bildirdiği değişiklik.
+    source: bootstrap, event (alarm akışı), reconcile (periyodik düzeltme), command (trigger_output)
+    """
+    port_id: int
+    port_type: str
+    old_state: Optional[str] = None # İlk yüklemede None
+    new_state: str
+    source: str
+    at: float # time.time()
@@ -11,4 +11,29 @@ class NetworkInterface(BaseModel):
     subnet_mask: str = Field(..., alias="subnetMask")
     gateway: Optional[str] = Field(default=None) # XML'de iç içe olduğu için alias'ı manuel eşleyeceğiz
     mac_address: Optional[str] = Field(default=None, alias="PhysicalAddress")
-    dhcp: bool = False
\ No newline at end of file
+    dhcp: bool = False
+
+class DiscoveredDevice(BaseModel):
+    """
+    Ağda bulunan cihaz (SADP cevabı veya ISAPI taraması).
+    source: sadp, probe ya da ikisi birden (sadp+probe)
+    """
+    ip: str
+    http_port: int = 80
+    mac: Optional[str] = None
+    serial: Optional[str] = None
+    model: Optional[str] = None
+    firmware_version: Optional[str] = None
+    activated: Optional[bool] = None
+    source: str = "probe"
+    realm: Optional[str] = None  # Digest realm (taramada parmak izi olarak kullanılır)
+    server: Optional[str] = None # HTTP Server başlığı
+
+    @property
+    def key(self) -> str:
+        """Tekilleştirme anahtarı: MAC > seri no > IP."""
+        if self.mac:
+            return "mac:" + self.mac.lower().replace("-", ":")
+        if self.serial:
+            return "sn:" + self.serial
+        return f"ip:{self.ip}:{self.http_port}"
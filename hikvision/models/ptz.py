@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 from enum import Enum
+from typing import Optional
 
 class PTZCoordinate(BaseModel):
     """
@@ -24,6 +25,30 @@ class PresetData(BaseModel):
     """
     preset_id: int = Field(..., ge=1, le=255, description="Ön tanımlı nokta ID'si (Genelde 1-255)")
 
+class PTZMoveCommand(BaseModel):
+    """
+    Sürekli (continuous) veya anlık (momentary) hareket vektörü.
+    Ref: ISAPI PDF Section 8.13.4 PTZData XML Block
+    """
+    pan: int = Field(default=0, ge=-100, le=100, description="Negatif: sola, Pozitif: sağa")
+    tilt: int = Field(default=0, ge=-100, le=100, description="Negatif: aşağı, Pozitif: yukarı")
+    zoom: int = Field(default=0, ge=-100, le=100, description="Negatif: uzaklaş, Pozitif: yakınlaş")
+
+    @property
+    def is_stop(self) -> bool:
+        return self.pan == 0 and self.tilt == 0 and self.zoom == 0
+
+class PTZCommandMetric(BaseModel):
+    """Komut pipeline'ının her gönderilen komut için tuttuğu ölçüm (saniye cinsinden)."""
+    kind: str # continuous, momentary, stop
+    command: PTZMoveCommand
+    queue_wait: float = Field(..., description="Kuyruğa girişten gönderime kadar geçen süre")
+    rtt: float = Field(..., description="HTTP isteğinin süresi (son deneme)")
+    total: float = Field(..., description="Kuyruğa girişten onaya kadar geçen süre")
+    attempts: int = 1
+    ok: bool = True
+    error: Optional[str] = None
+
 class PTZAuxCommand(str, Enum):
     """
     PTZ Yardımcı Komutları için Sabitler.
@@ -35,5 +60,69 @@ class PTZAuxCommand(str, Enum):
     HEATER = "HEATER" # Isıtıcı
     # Eğer kamerada başka özellik varsa buraya eklenir
 
-# İleride eklenecek:
-# class PTZStatus(BaseModel): ... # Kameranın anlık Pan/Tilt/Zoom değerleri
\ No newline at end of file
+class PTZPosition(BaseModel):
+    """
+    Mutlak PTZ konumu (derece ve zoom çarpanı).
+    Cihaz değerleri 10 ile çarpılmış gönderir (azimuth=1234 -> 123.4°), from_absolute_high bunu çevirir.
+    Ref: ISAPI PDF Section 8.13.9 PTZStatus / AbsoluteHigh
+    """
+    azimuth: float = Field(..., ge=0, le=360, description="Pan (0-360 derece)")
+    elevation: float = Field(..., ge=-90, le=270, description="Tilt (derece)")
+    zoom: float = Field(default=1.0, description="Zoom çarpanı (1.0 = geniş açı)")
+
+    @classmethod
+    def from_absolute_high(cls, node: dict) -> "PTZPosition":
+        return cls(
+            azimuth=int(node.get("azimuth", 0)) / 10,
+            elevation=int(node.get("elevation", 0)) / 10,
+            zoom=int(node.get("absoluteZoom", 10)) / 10,
+        )
+
+    def to_absolute_high(self) -> dict:
+        return {
+            "elevation": int(round(self.elevation * 10)),
+            "azimuth": int(round(self.azimuth * 10)),
+            "absoluteZoom": int(round(self.zoom * 10)),
+        }
+
+    def distance_to(self, other: "PTZPosition") -> float:
+        """Pan/tilt düzleminde derece cinsinden uzaklık (pan 360'ta sarar)."""
+        pan = abs(self.azimuth - other.azimuth) % 360
+        pan = min(pan, 360 - pan)
+        tilt = abs(self.elevation - other.elevation)
+        return max(pan, tilt)
+
+class PTZStatus(BaseModel):
+    """Kameranın anlık konumu ve okunma zamanı (time.monotonic)."""
+    channel: int
+    position: PTZPosition
+    read_at: float
+
+class PTZPreset(BaseModel):
+    """
+    Preset bilgisi. Konum cihazdan gelmediyse (eski firmware) None olabilir,
+    PresetCatalog.learn ile ziyaret edilip öğrenilir.
+    Ref: ISAPI PDF Section 8.13.2 PTZPreset XML Block
+    """
+    id: int = Field(..., ge=1, le=255)
+    name: Optional[str] = None
+    position: Optional[PTZPosition] = None
+
+class PTZArrival(BaseModel):
+    """
+    Grup hareketinde tek kameranın sonucu. Süreler grup başlangıcından itibaren saniyedir.
+    state: arrived (hedefe vardı), settled (durdu ama hedef bilinmiyor/tolerans dışı),
+           timeout (süre doldu), failed (komut gönderilemedi)
+    """
+    name: str
+    channel: int
+    state: str
+    dispatched_at: Optional[float] = None
+    settled_at: Optional[float] = None
+    polls: int = 0
+    position: Optional[PTZPosition] = None
+    error: Optional[str] = None
+
+    @property
+    def settled(self) -> bool:
+        return self.state in ("arrived", "settled")
@@ -9,4 +9,21 @@ class User(BaseModel):
     user_level: str = Field(..., validation_alias="userLevel") # Administrator, Operator, Viewer
     
     # Şifre sadece gönderirken gereklidir, okurken gelmez (Write-only)
-    password: Optional[str] = None
\ No newline at end of file
+    password: Optional[str] = None
+
+class CredentialRotationRecord(BaseModel):
+    """
+    Tek cihazın şifre değiştirme denetim (audit) kaydı. Şifrelerin kendisi asla yazılmaz.
+    state: rotated, already_rotated, failed, rolled_back, locked, unknown, skipped
+    """
+    device: str
+    username: str
+    user_id: Optional[int] = None
+    state: str = "pending"
+    attempts: int = 0              # Yapılan kimlik doğrulama denemesi (hatalı girişler kilide sayılır)
+    failed_logins: int = 0
+    lockouts: int = 0
+    matched_candidate: Optional[int] = None # Hangi mevcut şifre adayı tuttu (sıra no)
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
@@ -30,4 +30,31 @@ class StreamingChannel(BaseModel):
     
     # XML içinde iç içe (nested) yapılar vardır: <Video>...</Video>
     video: VideoSettings = Field(..., validation_alias="Video")
-    transport: Optional[StreamingTransport] = Field(..., validation_alias="Transport")
\ No newline at end of file
+    transport: Optional[StreamingTransport] = Field(..., validation_alias="Transport")
+
+class VideoInputChannel(BaseModel):
+    """
+    Cihazın yerel video girişi (IPC sensörü, DVR analog girişi).
+    Ref: ISAPI PDF Section 8.6 VideoInputChannel XML Block (/System/Video/inputs/channels)
+    """
+    id: int
+    input_port: Optional[int] = Field(default=None, validation_alias="inputPort")
+    enabled: bool = Field(default=True, validation_alias="videoInputEnabled")
+    name: Optional[str] = Field(default=None, validation_alias="name")
+    video_format: Optional[str] = Field(default=None, validation_alias="videoFormat") # PAL, NTSC
+
+class InputProxySource(BaseModel):
+    """IP kanalının bağlı olduğu kamera (sourceInputPortDescriptor)."""
+    ip_address: Optional[str] = Field(default=None, validation_alias=AliasChoices("ipAddress", "hostName"))
+    port: Optional[int] = Field(default=None, validation_alias="managePortNo")
+    protocol: Optional[str] = Field(default=None, validation_alias="proxyProtocol") # HIKVISION, ONVIF
+    source_channel: Optional[int] = Field(default=None, validation_alias="srcInputPort")
+
+class InputProxyChannel(BaseModel):
+    """
+    NVR'a eklenmiş IP kamera kanalı.
+    Ref: ISAPI PDF Section 15 InputProxyChannel XML Block (/ContentMgmt/InputProxy/channels)
+    """
+    id: int
+    name: Optional[str] = Field(default=None, validation_alias="name")
+    source: Optional[InputProxySource] = Field(default=None, validation_alias="sourceInputPortDescriptor")
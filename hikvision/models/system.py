@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, AliasChoices
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 class DeviceInfo(BaseModel):
     """
@@ -42,4 +42,83 @@ class TimeConfig(BaseModel):
     """
     time_mode: str = Field(..., alias="timeMode") # NTP, manual
     local_time: str = Field(..., alias="localTime") # 2025-12-04T15:30:00
-    time_zone: str = Field(..., alias="timeZone") # CST-8:00:00 (Format karışıktır)
\ No newline at end of file
+    time_zone: str = Field(..., alias="timeZone") # CST-8:00:00 (Format karışıktır)
+
+class ClockSample(BaseModel):
+    """
+    Tek saat okuması. sent/received: isteğin bu bilgisayarda gönderildiği ve cevabın geldiği an,
+    device_time: cihazın bildirdiği saat (UTC epoch, saniye çözünürlüğü).
+    """
+    sent: float
+    received: float
+    device_time: float
+    time_mode: Optional[str] = None
+    utc_offset: int = 0 # Cihaz saat dilimi (sn)
+
+    @property
+    def rtt(self) -> float:
+        return self.received - self.sent
+
+class ClockOffset(BaseModel):
+    """
+    Cihaz saatinin bu bilgisayarın saatine göre farkı (sn). Pozitif: cihaz ileride.
+    state: ok, drift (sınır aşıldı, düzeltilmedi), corrected, failed
+    """
+    name: str
+    offset: float = 0.0
+    uncertainty: float = 0.0 # Ofset ± bu değer aralığında
+    rtt: float = 0.0
+    samples: int = 0
+    time_mode: Optional[str] = None
+    utc_offset: int = 0
+    measured_at: float = 0.0
+    state: str = "pending"
+    corrected_from: Optional[float] = None # Düzeltme öncesi ofset
+    error: Optional[str] = None
+
+class UpgradeStatus(BaseModel):
+    """
+    Firmware yükleme sonrası cihazın yükseltme ilerlemesi.
+    Ref: ISAPI PDF Section 8.1.10 (upgradeStatus)
+    """
+    upgrading: bool = Field(default=False, alias="upgrading")
+    percent: int = Field(default=0, alias="percent", description="0-100")
+
+class FirmwareUpgradeResult(BaseModel):
+    """
+    Tek cihazın firmware yükseltme sonucu.
+    state: upgraded, current (zaten güncel), failed, skipped (rollout durduruldu)
+    """
+    name: str
+    site: Optional[str] = None
+    state: str = "pending"
+    from_version: Optional[str] = None
+    to_version: Optional[str] = None
+    bytes_sent: int = 0
+    upload_seconds: float = 0.0
+    duration: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.state in ("upgraded", "current")
+
+class BackupItem(BaseModel):
+    """Yedekteki tek dosya (içerik, blob deposunda hash ile saklanır)."""
+    endpoint: str
+    hash: str
+    size: int
+    content_type: str = "application/xml"
+
+class BackupManifest(BaseModel):
+    """Bir cihazın belirli bir andaki yedeği: hangi endpoint hangi blob'a karşılık geliyor."""
+    device: str
+    created_at: str # 20251204T020000Z
+    model: Optional[str] = None
+    firmware_version: Optional[str] = None
+    items: Dict[str, BackupItem] = Field(default_factory=dict)
+    errors: Dict[str, str] = Field(default_factory=dict)
+
+    @property
+    def total_size(self) -> int:
+        return sum(item.size for item in self.items.values())
@@ -0,0 +1,158 @@
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+INTERACTIVE = "interactive"
+NORMAL = "normal"
+BULK = "bulk"
+PRIORITIES = (INTERACTIVE, NORMAL, BULK)
+
+
+class _Waiter:
+    __slots__ = ("priority", "flow", "seq", "finish", "enqueued", "granted")
+
+    def __init__(self, priority: str, flow: str, seq: int, finish: float, enqueued: float):
+        self.priority = priority
+        self.flow = flow
+        self.seq = seq
+        self.finish = finish # WFQ sanal bitiş zamanı (sadece bulk)
+        self.enqueued = enqueued
+        self.granted = False
+
+
+class RequestScheduler:
+    """
+    Tek cihaz için öncelikli istek zamanlayıcısı.
+
+    Cihaza aynı anda en fazla max_connections istek gider. Bunların reserved_interactive kadarı
+    sadece interactive (PTZ, IO) istekler içindir; böylece PTZ stop komutu 2 MB'lık bir
+    snapshot'ın arkasında beklemez.
+
+    Sıra: interactive (FIFO) > normal (FIFO) > bulk.
+    Bulk işler arasında ağırlıklı adil kuyruk (WFQ) uygulanır: her akışın (flow, örn. "snapshot",
+    "search") sanal bitiş zamanı cost / weight kadar ilerler, en küçük bitiş zamanlı iş önce çıkar.
+    Böylece yüzlerce snapshot isteyen bir akış tek bir kayıt aramasını aç bırakmaz.
+
+    Kullanım:
+        with scheduler.slot(INTERACTIVE):
+            session.request(...)
+    """
+
+    def __init__(self, max_connections: int = 4, reserved_interactive: int = 1,
+                 weights: Dict[str, float] = None, clock: Callable[[], float] = time.monotonic):
+        """
+        :param weights: Bulk akış ağırlıkları (varsayılan 1.0). Yüksek ağırlık daha büyük pay demektir.
+        """
+        if not 0 <= reserved_interactive < max_connections:
+            raise ValueError("reserved_interactive, max_connections'dan küçük olmalı.")
+        self.max_connections = max_connections
+        self.reserved_interactive = reserved_interactive
+        self.weights = dict(weights or {})
+        self._clock = clock
+
+        self._cond = threading.Condition()
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._in_flight = {p: 0 for p in PRIORITIES}
+        self._virtual_time = 0.0
+        self._flow_finish: Dict[str, float] = {}
+
+        self.stats = {p: {"requests": 0, "queued": 0, "wait_total": 0.0, "wait_max": 0.0} for p in PRIORITIES}
+
+    # --- GENEL API ---
+
+    @contextmanager
+    def slot(self, priority: str = NORMAL, flow: str = None, cost: float = 1.0):
+        """
+        Bağlantı hakkı alınana kadar bekler, blok bitince hakkı bırakır.
+        :param flow: Bulk akış adı (WFQ için). Verilmezse öncelik adı kullanılır.
+        :param cost: İşin göreli maliyeti (örn. beklenen byte / 1 MB).
+        """
+        waiter = self._acquire(priority, flow or priority, cost)
+        try:
+            yield
+        finally:
+            self._release(waiter)
+
+    @property
+    def in_flight(self) -> int:
+        return sum(self._in_flight.values())
+
+    def snapshot(self) -> dict:
+        """Öncelik sınıfı başına kuyruk bekleme metrikleri (sn)."""
+        with self._cond:
+            result = {}
+            for priority, stats in self.stats.items():
+                result[priority] = {
+                    **stats,
+                    "wait_avg": stats["wait_total"] / stats["requests"] if stats["requests"] else 0.0,
+                    "in_flight": self._in_flight[priority],
+                    "waiting": sum(1 for w in self._queue if w.priority == priority),
+                }
+            return result
+
+    # --- İÇ METOTLAR ---
+
+    def _acquire(self, priority: str, flow: str, cost: float) -> _Waiter:
+        if priority not in PRIORITIES:
+            raise ValueError(f"Geçersiz öncelik: {priority} (izin verilenler: {', '.join(PRIORITIES)})")
+
+        with self._cond:
+            finish = 0.0
+            if priority == BULK:
+                start = max(self._virtual_time, self._flow_finish.get(flow, 0.0))
+                finish = start + cost / self.weights.get(flow, 1.0)
+                self._flow_finish[flow] = finish
+
+            waiter = _Waiter(priority, flow, next(self._seq), finish, self._clock())
+            self._queue.append(waiter)
+            self._dispatch()
+            queued = not waiter.granted
+            while not waiter.granted:
+                self._cond.wait()
+
+            waited = self._clock() - waiter.enqueued
+            stats = self.stats[priority]
+            stats["requests"] += 1
+            stats["queued"] += queued
+            stats["wait_total"] += waited
+            stats["wait_max"] = max(stats["wait_max"], waited)
+            return waiter
+
+    def _release(self, waiter: _Waiter):
+        with self._cond:
+            self._in_flight[waiter.priority] -= 1
+            self._dispatch()
+
+    def _dispatch(self):
+        """Boş bağlantı oldukça sıradaki uygun işe hak verir (kilit altında çağrılır)."""
+        granted = False
+        while self._queue and self.in_flight < self.max_connections:
+            waiter = self._next()
+            if waiter is None:
+                break
+            self._queue.remove(waiter)
+            self._in_flight[waiter.priority] += 1
+            if waiter.priority == BULK:
+                self._virtual_time = max(self._virtual_time, waiter.finish)
+            waiter.granted = True
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def _next(self) -> Optional[_Waiter]:
+        interactive = [w for w in self._queue if w.priority == INTERACTIVE]
+        if interactive:
+            return interactive[0]
+
+        shared = self.max_connections - self.reserved_interactive
+        if self._in_flight[NORMAL] + self._in_flight[BULK] >= shared:
+            return None # Kalan bağlantılar interactive için ayrıldı
+
+        normal = [w for w in self._queue if w.priority == NORMAL]
+        if normal:
+            return normal[0]
+        bulk = [w for w in self._queue if w.priority == BULK]
+        return min(bulk, key=lambda w: (w.finish, w.seq)) if bulk else None
@@ -0,0 +1,183 @@
+import math
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from ..client import HikvisionClient
+from ..models.event import EventAlert
+from ..models.system import ClockOffset, ClockSample
+
+
+def offset_bounds(samples: Sequence[ClockSample]) -> Tuple[float, float]:
+    """
+    Örneklerden cihaz saat ofsetinin (cihaz - yerel) alt ve üst sınırı.
+
+    Cihaz okunan anda saniyeyi aşağı yuvarlar: gerçek saati [T, T + 1) aralığındadır ve okuma
+    [sent, received] arasında bir anda yapılmıştır -> ofset (T - received, T + 1 - sent).
+    Tüm örneklerin aralıkları kesiştirilir. Kesişim boşsa (saat ölçüm sırasında adım attı)
+    en düşük RTT'li örneğin aralığı kullanılır.
+    """
+    lo = max(s.device_time - s.received for s in samples)
+    hi = min(s.device_time + 1 - s.sent for s in samples)
+    if lo > hi:
+        best = min(samples, key=lambda s: s.rtt)
+        lo, hi = best.device_time - best.received, best.device_time + 1 - best.sent
+    return lo, hi
+
+
+class ClockAudit:
+    """
+    Filo saat denetimi: her cihazın saat ofsetini NTP tarzı (istek RTT'si ile) ölçer,
+    sınırı aşanları düzeltir ve olay zamanlarını düzeltmek için ofset tablosu tutar.
+
+    - Cihaz saati saniye çözünürlüğündedir. İlk okumadan sonraki istekler, tahmini saniye
+      geçişinin ortasına denk gelecek şekilde zamanlanır; her örnek belirsizliği yarıya indirir
+      (ikili arama). Belirsizlik target_uncertainty'ye inince ya da samples dolunca durulur.
+    - |ofset| > max_offset ise (ve belirsizlik ofsetten küçükse) cihaz saatinden sapmıştır.
+      correct=True ise manuel moddaki cihazlar SystemAPI.sync_clock ile düzeltilip tekrar ölçülür.
+      NTP modundaki cihaz force_manual verilmedikçe manuele alınmaz (NTP sunucusu kontrol edilmeli).
+    - Referans bu bilgisayarın saatidir; bilgisayarın NTP ile senkron olduğu varsayılır.
+
+    Kullanım:
+        audit = ClockAudit(max_offset=1.0)
+        audit.run(cameras)
+        print(audit.summary())
+        alert = audit.normalize_alert(alert)   # date_time düzeltilmiş, UTC
+    """
+
+    def __init__(self, max_offset: float = 2.0, samples: int = 6, target_uncertainty: float = 0.05,
+                 correct: bool = True, force_manual: bool = False, max_workers: int = 32):
+        self.max_offset = max_offset
+        self.samples = samples
+        self.target_uncertainty = target_uncertainty
+        self.correct = correct
+        self.force_manual = force_manual
+        self.max_workers = max_workers
+
+        self.offsets: Dict[str, ClockOffset] = {} # "ip:port" -> son ölçüm
+        self._by_ip: Dict[str, str] = {}          # Alarmlarda sadece IP gelir
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(client: HikvisionClient) -> str:
+        config = client.session.config
+        return f"{config.ip}:{config.port}"
+
+    # --- ÖLÇÜM ---
+
+    def measure(self, client: HikvisionClient, samples: int = None) -> ClockOffset:
+        """Tek cihazın ofsetini ölçer (düzeltme yapmaz)."""
+        key = self._key(client)
+        collected: List[ClockSample] = []
+        lo, hi = -math.inf, math.inf
+        try:
+            for _ in range(samples or self.samples):
+                if collected:
+                    # Cihazda saniyenin değiştiği tahmini yerel an: k - orta. İsteğin ortası oraya denk gelsin.
+                    middle = (lo + hi) / 2
+                    half_rtt = min(s.rtt for s in collected) / 2
+                    k = math.ceil(time.time() + half_rtt + middle)
+                    time.sleep(max(0.0, k - middle - half_rtt - time.time()))
+                collected.append(client.system.sample_clock())
+                lo, hi = offset_bounds(collected)
+                if (hi - lo) / 2 <= self.target_uncertainty:
+                    break
+        except Exception as e:
+            if not collected:
+                return self._store(key, ClockOffset(name=key, measured_at=time.time(), state="failed", error=str(e)))
+            print(f"   ⚠️ Saat ölçümü yarıda kaldı ({key}): {e}")
+
+        last = collected[-1]
+        result = ClockOffset(
+            name=key, offset=(lo + hi) / 2, uncertainty=(hi - lo) / 2,
+            rtt=min(s.rtt for s in collected), samples=len(collected),
+            time_mode=last.time_mode, utc_offset=last.utc_offset, measured_at=last.received,
+        )
+        result.state = "drift" if self._drifted(result) else "ok"
+        return self._store(key, result)
+
+    def _drifted(self, result: ClockOffset) -> bool:
+        return abs(result.offset) > self.max_offset and result.uncertainty < abs(result.offset)
+
+    def _store(self, key: str, result: ClockOffset) -> ClockOffset:
+        with self._lock:
+            self.offsets[key] = result
+            self._by_ip[key.rsplit(":", 1)[0]] = key
+        return result
+
+    def audit(self, client: HikvisionClient) -> ClockOffset:
+        """Ölçer; sapma varsa ve izin verildiyse düzeltip tekrar ölçer."""
+        result = self.measure(client)
+        if result.state != "drift" or not self.correct:
+            return result
+
+        if (result.time_mode or "").lower() != "manual" and not self.force_manual:
+            result.error = f"{result.time_mode} modunda, düzeltilmedi (zaman sunucusu kontrol edilmeli)."
+            return result
+
+        before = result.offset
+        try:
+            if not client.system.sync_clock(one_way_delay=result.rtt / 2):
+                raise RuntimeError("Cihaz saat ayarını reddetti.")
+        except Exception as e:
+            print(f"   ❌ Saat düzeltme hatası ({result.name}): {e}")
+            result.error = str(e)
+            return result
+
+        result = self.measure(client)
+        result.corrected_from = before
+        if result.state == "ok":
+            result.state = "corrected"
+        return result
+
+    def run(self, clients: Iterable[HikvisionClient]) -> List[ClockOffset]:
+        """Tüm cihazları paralel denetler."""
+        clients = list(clients)
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hik-clock") as executor:
+            return list(executor.map(self.audit, clients))
+
+    # --- OFSET TABLOSU ---
+
+    def offset(self, device: Union[HikvisionClient, str]) -> Optional[ClockOffset]:
+        """Cihazın son ölçümü. device: istemci, 'ip:port' veya IP."""
+        key = self._key(device) if isinstance(device, HikvisionClient) else device
+        with self._lock:
+            return self.offsets.get(key) or self.offsets.get(self._by_ip.get(key, ""))
+
+    def normalize(self, device: Union[HikvisionClient, str], moment: datetime) -> datetime:
+        """
+        Cihaz saatine göre verilmiş zamanı gerçek zamana (UTC) çevirir.
+        Saat dilimi olmayan zaman cihazın saat diliminde kabul edilir. Ölçüm yoksa sadece UTC'ye çevrilir.
+        """
+        result = self.offset(device)
+        if result is None or result.state == "failed":
+            result = None
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone(timedelta(seconds=result.utc_offset if result else 0)))
+        if result is not None:
+            moment -= timedelta(seconds=result.offset)
+        return moment.astimezone(timezone.utc)
+
+    def normalize_alert(self, alert: EventAlert) -> EventAlert:
+        """Alarmın date_time değeri düzeltilmiş kopyası (cihaz alarmdaki IP ile bulunur)."""
+        if alert.date_time is None or not alert.ip_address:
+            return alert
+        return alert.model_copy(update={"date_time": self.normalize(alert.ip_address, alert.date_time)})
+
+    def summary(self) -> dict:
+        with self._lock:
+            results = list(self.offsets.values())
+        measured = [r for r in results if r.state != "failed"]
+        offsets = [r.offset for r in measured]
+        return {
+            "devices": len(results),
+            "median_offset": statistics.median(offsets) if offsets else None,
+            "max_abs_offset": max((abs(o) for o in offsets), default=None),
+            "max_uncertainty": max((r.uncertainty for r in measured), default=None),
+            "drift": sorted(r.name for r in results if r.state == "drift"),
+            "corrected": sorted(r.name for r in results if r.state == "corrected"),
+            "failed": sorted(r.name for r in results if r.state == "failed"),
+        }
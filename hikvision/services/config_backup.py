@@ -0,0 +1,329 @@
+import datetime
+import hashlib
+import itertools
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from ..client import HikvisionClient
+from ..models.system import BackupItem, BackupManifest
+from ..scheduler import BULK
+from ..utils import parse_xml, is_success_response
+
+CONFIGURATION_DATA = "/System/configurationData"
+
+# Yedeklenen XML kaynakları. {channel} istemcinin kanalıyla doldurulur,
+# '/*' ile biten endpoint'ler listedeki her ID için ayrı ayrı indirilir.
+DEFAULT_SNAPSHOTS = (
+    "/Streaming/channels",
+    "/Image/channels/*",
+    "{motion}",
+)
+
+
+class BlobStore:
+    """
+    İçerik adresli dosya deposu: her blob SHA-256 hash'i ile saklanır (blobs/ab/abcdef...).
+    Aynı içerik ikinci kez yazılmaz; yeni veri önce geçici dosyaya akıtılır,
+    hash zaten varsa geçici dosya silinir.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.join(root, "blobs")
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def has(self, digest: str) -> bool:
+        return os.path.exists(self.path(digest))
+
+    def write(self, chunks: Iterable[bytes]) -> Tuple[str, int, bool]:
+        """Parçaları hash'leyerek yazar. (hash, boyut, yeni mi) döner."""
+        hasher = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=self.root, prefix=".incoming-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    hasher.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+
+            digest = hasher.hexdigest()
+            if self.has(digest):
+                os.remove(temp_path)
+                return digest, size, False
+
+            os.makedirs(os.path.dirname(self.path(digest)), exist_ok=True)
+            os.replace(temp_path, self.path(digest)) # Atomik: yarım blob asla görünmez
+            return digest, size, True
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def read(self, digest: str) -> bytes:
+        with open(self.path(digest), "rb") as f:
+            return f.read()
+
+    def digests(self) -> Iterator[str]:
+        for prefix in os.listdir(self.root):
+            directory = os.path.join(self.root, prefix)
+            if len(prefix) == 2 and os.path.isdir(directory):
+                yield from os.listdir(directory)
+
+    def remove(self, digest: str):
+        os.remove(self.path(digest))
+
+
+class ConfigBackupStore:
+    """
+    Filo konfigürasyon yedekleri.
+
+    - Her cihaz için /System/configurationData ve önemli XML kaynakları indirilir.
+    - İçerikler BlobStore'da hash ile saklanır; değişmeyen dosyalar tekrar yazılmaz,
+      her gece sadece küçük bir manifest (manifests/<cihaz>/<zaman>.json) eklenir.
+      Değişip değişmediği içerik indirilip hash'lenince anlaşılır: tasarruf depoda olur, indirmede değil
+      (ISAPI güvenilir bir ETag/boyut doğrulayıcısı vermez, aynı boyut aynı içerik demek değildir).
+    - Aynı saniyede alınan yedekler birbirinin üzerine yazmaz (<zaman>-2.json, <zaman>-3.json ...).
+    - Cihazlar paralel yedeklenir; cihaz içinde indirmeler sıralıdır (cihazı yormamak için).
+    - restore() ile yedek cihaza geri yüklenir (büyük dosya diskten akıtılır).
+
+    Kullanım:
+        store = ConfigBackupStore("/backups/hik")
+        manifests = store.backup_fleet({"depo-1": cam1, "depo-2": cam2})
+        store.restore(cam1, store.latest("depo-1"))
+    """
+
+    def __init__(self, root: str, snapshots: Iterable[str] = DEFAULT_SNAPSHOTS, include_configuration: bool = True,
+                 max_workers: int = 8, on_manifest: Callable[[BackupManifest], None] = None):
+        self.root = root
+        self.blobs = BlobStore(root)
+        self.manifest_root = os.path.join(root, "manifests")
+        os.makedirs(self.manifest_root, exist_ok=True)
+
+        self.snapshots = list(snapshots)
+        self.include_configuration = include_configuration
+        self.max_workers = max_workers
+        self.on_manifest = on_manifest
+        self.stats = {"devices": 0, "failed_devices": 0, "bytes_downloaded": 0, "bytes_written": 0,
+                      "blobs_written": 0, "blobs_deduplicated": 0}
+        self._stats_lock = threading.Lock()
+
+    # --- YEDEKLEME ---
+
+    def backup_fleet(self, clients: Dict[str, HikvisionClient]) -> Dict[str, Union[BackupManifest, Exception]]:
+        """Tüm cihazları paralel yedekler. Cihaz adı -> manifest (veya hata) döner."""
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hik-backup") as executor:
+            futures = {name: executor.submit(self.backup_device, client, name) for name, client in clients.items()}
+            results = {}
+            for name, future in futures.items():
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    print(f"   ⚠️ Yedekleme hatası ({name}): {e}")
+                    with self._stats_lock:
+                        self.stats["failed_devices"] += 1
+                    results[name] = e
+            return results
+
+    def backup_device(self, client: HikvisionClient, device: str = None) -> BackupManifest:
+        """Tek cihazı yedekler ve manifest'i kaydeder."""
+        device = device or str(client.session.config.ip)
+        info = client.system.get_device_info()
+        manifest = BackupManifest(
+            device=device,
+            created_at=datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ"),
+            model=info.model,
+            firmware_version=info.firmware_version,
+        )
+
+        if self.include_configuration:
+            try:
+                manifest.items[CONFIGURATION_DATA] = self._store(
+                    CONFIGURATION_DATA, client.system.iter_configuration(), "application/octet-stream")
+            except Exception as e:
+                manifest.errors[CONFIGURATION_DATA] = str(e)
+
+        for endpoint in self._expand_snapshots(client):
+            try:
+                response = client.session.request("GET", endpoint, priority=BULK, flow="backup")
+                content = response.encode() if isinstance(response, str) else response.content
+                manifest.items[endpoint] = self._store(endpoint, [content], "application/xml")
+            except Exception as e:
+                manifest.errors[endpoint] = str(e)
+
+        if not manifest.items:
+            raise RuntimeError(f"Hiçbir kaynak yedeklenemedi: {manifest.errors}")
+
+        self._save_manifest(manifest)
+        with self._stats_lock:
+            self.stats["devices"] += 1
+        if self.on_manifest:
+            self.on_manifest(manifest)
+        return manifest
+
+    # --- MANİFESTLER ---
+
+    def devices(self) -> List[str]:
+        return sorted(os.listdir(self.manifest_root))
+
+    def manifests(self, device: str) -> List[BackupManifest]:
+        """Cihazın yedekleri, eskiden yeniye."""
+        directory = os.path.join(self.manifest_root, _safe_name(device))
+        if not os.path.isdir(directory):
+            return []
+        result = []
+        for name in _manifest_names(directory):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                result.append(BackupManifest.model_validate_json(f.read()))
+        return result
+
+    def latest(self, device: str) -> Optional[BackupManifest]:
+        manifests = self.manifests(device)
+        return manifests[-1] if manifests else None
+
+    def changed_items(self, old: BackupManifest, new: BackupManifest) -> List[str]:
+        """İki yedek arasında içeriği değişen (veya eklenen/silinen) endpoint'ler."""
+        endpoints = set(old.items) | set(new.items)
+        return sorted(e for e in endpoints
+                      if (old.items.get(e) and old.items[e].hash) != (new.items.get(e) and new.items[e].hash))
+
+    def prune(self, device: str, keep: int) -> int:
+        """Cihazın en yeni keep yedeği dışındakileri siler (blob'lar gc() ile temizlenir)."""
+        directory = os.path.join(self.manifest_root, _safe_name(device))
+        names = _manifest_names(directory) if os.path.isdir(directory) else []
+        removed = names[:-keep] if keep > 0 else names
+        for name in removed:
+            os.remove(os.path.join(directory, name))
+        return len(removed)
+
+    def gc(self) -> int:
+        """Hiçbir manifest'in referans vermediği blob'ları siler."""
+        referenced = {item.hash for device in self.devices()
+                      for manifest in self.manifests(device) for item in manifest.items.values()}
+        removed = 0
+        for digest in list(self.blobs.digests()):
+            if digest not in referenced:
+                self.blobs.remove(digest)
+                removed += 1
+        return removed
+
+    # --- GERİ YÜKLEME ---
+
+    def restore(self, client: HikvisionClient, manifest: BackupManifest, items: Iterable[str] = None,
+                force: bool = False, progress: Callable[[int, int], None] = None) -> Dict[str, bool]:
+        """
+        Yedeği cihaza geri yükler. Endpoint -> başarı döner.
+        XML kaynakları önce yüklenir; configurationData cihazı yeniden başlattığı için en sona bırakılır.
+
+        :param items: Sadece bu endpoint'ler (varsayılan: hepsi).
+        :param force: Model farklı olsa bile yükle.
+        """
+        if not force and manifest.model:
+            model = client.system.get_device_info().model
+            if model != manifest.model:
+                raise ValueError(f"Yedek {manifest.model} modeline ait, cihaz {model}. (force=True ile zorlanabilir)")
+
+        selected = list(items) if items is not None else list(manifest.items)
+        selected.sort(key=lambda e: e == CONFIGURATION_DATA)
+
+        results = {}
+        for endpoint in selected:
+            item = manifest.items[endpoint]
+            try:
+                if endpoint == CONFIGURATION_DATA:
+                    results[endpoint] = client.system.restore_configuration(self.blobs.path(item.hash), progress=progress)
+                else:
+                    response = client.session.request("PUT", endpoint, data=self.blobs.read(item.hash))
+                    results[endpoint] = is_success_response(response)
+            except Exception as e:
+                print(f"   ⚠️ Geri yükleme hatası ({endpoint}): {e}")
+                results[endpoint] = False
+        return results
+
+    # --- İÇ METOTLAR ---
+
+    def _store(self, endpoint: str, chunks: Iterable[bytes], content_type: str) -> BackupItem:
+        digest, size, written = self.blobs.write(chunks)
+        with self._stats_lock:
+            self.stats["bytes_downloaded"] += size
+            if written:
+                self.stats["blobs_written"] += 1
+                self.stats["bytes_written"] += size
+            else:
+                self.stats["blobs_deduplicated"] += 1
+        return BackupItem(endpoint=endpoint, hash=digest, size=size, content_type=content_type)
+
+    def _expand_snapshots(self, client: HikvisionClient) -> List[str]:
+        channel = client.session.config.channel
+        endpoints = []
+        for pattern in self.snapshots:
+            if pattern == "{motion}":
+                try:
+                    endpoints.append(client.event._find_working_endpoint(channel))
+                except Exception:
+                    pass # Hareket algılama desteklenmiyor
+                continue
+
+            endpoint = pattern.format(channel=channel)
+            if not endpoint.endswith("/*"):
+                endpoints.append(endpoint)
+                continue
+
+            # Liste kaynağından ID'leri bul: /Image/channels -> /Image/channels/1, /Image/channels/2 ...
+            parent = endpoint[:-2]
+            try:
+                ids = _list_ids(parse_xml(client.session.request("GET", parent, priority=BULK, flow="backup")))
+            except Exception:
+                ids = []
+            endpoints += [f"{parent}/{i}" for i in ids] or [parent]
+        return endpoints
+
+    def _save_manifest(self, manifest: BackupManifest):
+        directory = os.path.join(self.manifest_root, _safe_name(manifest.device))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".incoming-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(manifest.model_dump_json(indent=2))
+            # link var olan dosyanın üzerine yazmaz: aynı saniyedeki yedek sıradaki numarayı alır
+            for sequence in itertools.count(1):
+                name = f"{manifest.created_at}.json" if sequence == 1 else f"{manifest.created_at}-{sequence}.json"
+                try:
+                    os.link(temp_path, os.path.join(directory, name))
+                    return
+                except FileExistsError:
+                    continue
+        finally:
+            os.remove(temp_path)
+
+
+def _safe_name(device: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in device)
+
+
+def _manifest_names(directory: str) -> List[str]:
+    """Manifest dosyaları eskiden yeniye (<zaman>.json, <zaman>-2.json, ...)."""
+    def order(name: str):
+        created_at, _, sequence = name[:-len(".json")].partition("-")
+        return created_at, int(sequence or 1)
+    return sorted((n for n in os.listdir(directory) if n.endswith(".json") and not n.startswith(".")), key=order)
+
+
+def _list_ids(document: dict) -> List[str]:
+    """<XList><X><id>1</id>..</X><X>..</X></XList> yapısındaki ID'ler."""
+    for root in document.values():
+        if not isinstance(root, dict):
+            continue
+        for key, value in root.items():
+            if key.startswith("@"):
+                continue
+            items = value if isinstance(value, list) else [value]
+            ids = [str(item["id"]) for item in items if isinstance(item, dict) and "id" in item]
+            if ids:
+                return ids
+    return []
@@ -0,0 +1,297 @@
+import contextlib
+import datetime
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import requests
+
+from ..api.security import is_lockout_response, lockout_seconds
+from ..client import HikvisionClient
+from ..models.security import CredentialRotationRecord
+
+
+class RotationTarget:
+    """
+    Şifresi değiştirilecek cihaz.
+    current_passwords: Olası mevcut şifreler, en olasıdan başlayarak (eski şifreler bayat olabilir).
+    """
+
+    def __init__(self, ip: str, current_passwords: Sequence[str], username: str = "admin", port: int = 80,
+                 name: str = None, user_id: int = None):
+        self.ip = ip
+        self.port = port
+        self.username = username
+        self.current_passwords = list(current_passwords)
+        self.name = name or ip
+        self.user_id = user_id
+
+
+class CredentialRotator:
+    """
+    Filo genelinde kilitlenmeye dikkat eden şifre değiştirme motoru.
+
+    Hikvision belirli sayıda hatalı girişten sonra istemci IP'sini kilitler. Bu yüzden:
+    - Her cihazda en fazla attempt_budget hatalı giriş yapılır (cihaz eşiğinin altında tutulmalı).
+    - Kilit cevabı (userLocked / unlockTime) alınırsa o cihaz için bekleyip bir kez daha denenir,
+      kilit devam ederse cihaz "locked" olarak bırakılır.
+    - max_lockouts cihazda kilit görülürse yeni cihazlara başlanmaz (bayat şifre listesi belirtisi).
+    - Yeni şifre ucuz bir yetkili GET (/Security/userCheck) ile doğrulanır; ek doğrulama (verify)
+      başarısız olursa eski şifreye geri dönülür.
+    - Her cihaz için audit kaydı (JSON satırı) yazılır; şifreler kayda girmez.
+
+    Kullanım:
+        rotator = CredentialRotator(new_password="Yeni.Sifre.2026", audit_path="rotation.jsonl")
+        for ip in ips:
+            rotator.add(ip, current_passwords=["Eski1", "Eski2"])
+        records = rotator.run()
+    """
+
+    def __init__(self, new_password: Union[str, Callable[[RotationTarget], str]], max_workers: int = 32,
+                 attempt_budget: int = 3, lockout_backoff: float = 60.0, max_lockout_wait: float = 300.0,
+                 max_lockouts: int = 5, check_new_first: bool = False,
+                 verify: Callable[[HikvisionClient], bool] = None, verify_retries: int = 2, verify_delay: float = 1.0,
+                 audit_path: str = None, on_record: Callable[[CredentialRotationRecord], None] = None):
+        """
+        :param new_password: Tüm cihazlar için şifre veya cihaz başına şifre üreten fonksiyon.
+        :param attempt_budget: Cihaz başına izin verilen hatalı giriş sayısı.
+        :param lockout_backoff: Kilit süresi cevapta yoksa beklenecek süre (sn).
+        :param check_new_first: Önce yeni şifre denenir (yarıda kalmış rotasyonu tekrar çalıştırırken).
+            Kapalıyken yeni şifre mevcut şifrelerden sonra denenir: henüz değişmemiş cihazlar kilit
+            sayacına boşa bir hatalı giriş yazmaz, değişmiş cihazlar yine "already_rotated" bulunur.
+        :param verify: Yeni şifreyle oluşturulan istemciyle çağrılan ek kontrol (örn. kayıt cihazı bağlantısı).
+        """
+        self.new_password = new_password
+        self.max_workers = max_workers
+        self.attempt_budget = attempt_budget
+        self.lockout_backoff = lockout_backoff
+        self.max_lockout_wait = max_lockout_wait
+        self.max_lockouts = max_lockouts
+        self.check_new_first = check_new_first
+        self.verify = verify
+        self.verify_retries = verify_retries
+        self.verify_delay = verify_delay
+        self.audit_path = audit_path
+        self.on_record = on_record
+
+        self.targets: List[RotationTarget] = []
+        self.halt_reason: Optional[str] = None
+        self._locked_devices = 0
+        self._lock = threading.Lock()
+
+    # --- GENEL API ---
+
+    def add(self, ip: str, current_passwords: Sequence[str], username: str = "admin", port: int = 80,
+            name: str = None, user_id: int = None) -> RotationTarget:
+        target = RotationTarget(ip, current_passwords, username, port, name, user_id)
+        self.targets.append(target)
+        return target
+
+    def halt(self, reason: str = "Manuel olarak durduruldu."):
+        """Yeni cihazlara başlanmasını durdurur (devam edenler tamamlanır)."""
+        with self._lock:
+            if self.halt_reason is None:
+                self.halt_reason = reason
+
+    def run(self) -> List[CredentialRotationRecord]:
+        """Tüm cihazları paralel işler. Kayıtlar add() sırasıyla döner."""
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hik-rotate") as executor:
+            futures = [executor.submit(self._run_one, target) for target in self.targets]
+            return [f.result() for f in futures]
+
+    # --- CİHAZ BAŞINA AKIŞ ---
+
+    def _run_one(self, target: RotationTarget) -> CredentialRotationRecord:
+        record = CredentialRotationRecord(device=target.name, username=target.username, started_at=_now())
+        try:
+            if self.halt_reason is not None:
+                record.state = "skipped"
+                record.error = self.halt_reason
+            else:
+                self._rotate(target, record)
+        except Exception as e:
+            record.state = "unknown"
+            record.error = str(e)
+
+        record.finished_at = _now()
+        self._audit(record)
+        return record
+
+    def _rotate(self, target: RotationTarget, record: CredentialRotationRecord):
+        new_password = self.new_password(target) if callable(self.new_password) else self.new_password
+
+        # 1. Mevcut şifreyi bul (bütçe dahilinde)
+        current_passwords = [p for p in dict.fromkeys(target.current_passwords) if p != new_password]
+        if self.check_new_first:
+            candidates = [new_password] + current_passwords
+        else:
+            candidates = current_passwords + [new_password]
+        index, outcome = self._login(target, candidates, record)
+        if index is None:
+            record.state = "locked" if outcome == "locked" else "failed"
+            record.error = record.error or ("Cihaz kilitli." if outcome == "locked" else "Geçerli şifre bulunamadı.")
+            return
+
+        current = candidates[index]
+        if current == new_password:
+            record.state = "already_rotated"
+            return
+        record.matched_candidate = current_passwords.index(current)
+
+        # 2. Şifreyi değiştir
+        with self._client(target, current) as client:
+            record.user_id = target.user_id or self._user_id(client, target.username)
+            changed = client.security.change_password(record.user_id, new_password, login_password=current)
+        if not changed:
+            record.state = "failed"
+            record.error = "Cihaz şifre değişikliğini reddetti."
+            return
+
+        # 3. Yeni şifreyi doğrula
+        result = self._verify(target, new_password, record)
+        if result == "ok":
+            record.state = "rotated"
+            return
+
+        if result == "hook_failed":
+            # Yeni şifre geçerli ama ek kontrol başarısız: eski şifreye geri dön
+            with self._client(target, new_password) as rollback:
+                reverted = rollback.security.change_password(record.user_id, current, login_password=new_password)
+            if reverted and self._attempt(target, current, record)[0] == "ok":
+                record.state = "rolled_back"
+            else:
+                record.state = "unknown"
+            record.error = "Ek doğrulama başarısız, eski şifreye dönüldü." if record.state == "rolled_back" \
+                else "Ek doğrulama başarısız, geri alma da başarısız."
+            return
+
+        # Yeni şifre tutmadı: değişiklik uygulanmamış olabilir
+        if self._budget_left(record) and self._attempt(target, current, record)[0] == "ok":
+            record.state = "failed"
+            record.error = "Yeni şifre doğrulanamadı, eski şifre hâlâ geçerli."
+        else:
+            record.state = "unknown"
+            record.error = "Ne yeni ne eski şifre doğrulanabildi."
+
+    def _login(self, target: RotationTarget, candidates: List[str],
+               record: CredentialRotationRecord) -> Tuple[Optional[int], str]:
+        """Adayları sırayla dener. (tutan aday sırası, son sonuç) döner."""
+        outcome = "denied"
+        for index, password in enumerate(candidates):
+            if not self._budget_left(record):
+                record.error = f"Hatalı giriş bütçesi ({self.attempt_budget}) doldu."
+                break
+            outcome = self._attempt_with_backoff(target, password, record)
+            if outcome == "ok":
+                return index, outcome
+            if outcome in ("locked", "error"):
+                break
+        return None, outcome
+
+    def _verify(self, target: RotationTarget, password: str, record: CredentialRotationRecord) -> str:
+        """ok, denied, hook_failed, locked veya error döner."""
+        outcome = "denied"
+        for attempt in range(self.verify_retries):
+            if attempt:
+                # Tekrar denemede eski şifreyi kontrol edebilmek için bir hak saklanır
+                if not self._budget_left(record, reserve=1):
+                    break
+                # Bazı cihazlar yeni şifreyi birkaç saniye içinde uygular
+                time.sleep(self.verify_delay)
+            elif not self._budget_left(record):
+                break
+            outcome = self._attempt_with_backoff(target, password, record)
+            if outcome != "denied":
+                break
+
+        if outcome == "ok" and self.verify is not None:
+            try:
+                with self._client(target, password) as client:
+                    if not self.verify(client):
+                        return "hook_failed"
+            except Exception as e:
+                record.error = str(e)
+                return "hook_failed"
+        return outcome
+
+    # --- GİRİŞ DENEMESİ ---
+
+    def _attempt_with_backoff(self, target: RotationTarget, password: str, record: CredentialRotationRecord) -> str:
+        outcome, unlock_in = self._attempt(target, password, record)
+        if outcome != "locked":
+            return outcome
+
+        self._register_lockout(record)
+        wait = unlock_in if unlock_in is not None else self.lockout_backoff
+        if wait > self.max_lockout_wait:
+            return "locked"
+        time.sleep(wait)
+        outcome, _ = self._attempt(target, password, record)
+        if outcome == "locked":
+            record.lockouts += 1
+        return outcome
+
+    def _attempt(self, target: RotationTarget, password: str, record: CredentialRotationRecord) -> Tuple[str, Optional[int]]:
+        """Tek kimlik doğrulama denemesi: (ok/denied/locked/error, kilit süresi)."""
+        record.attempts += 1
+        try:
+            with self._client(target, password) as client:
+                valid = client.security.check_credentials()
+            if valid:
+                return "ok", None
+            record.failed_logins += 1
+            return "denied", None
+        except requests.HTTPError as e:
+            if is_lockout_response(e.response):
+                return "locked", lockout_seconds(e.response)
+            record.error = str(e)
+            return "error", None
+        except requests.RequestException as e:
+            record.error = str(e)
+            return "error", None
+
+    def _budget_left(self, record: CredentialRotationRecord, reserve: int = 0) -> bool:
+        return record.failed_logins < self.attempt_budget - reserve
+
+    def _register_lockout(self, record: CredentialRotationRecord):
+        record.lockouts += 1
+        with self._lock:
+            if record.lockouts == 1:
+                self._locked_devices += 1
+            if self._locked_devices >= self.max_lockouts and self.halt_reason is None:
+                self.halt_reason = f"{self._locked_devices} cihazda giriş kilidi görüldü, rotasyon durduruldu."
+                print(f"🛑 {self.halt_reason}")
+
+    # --- YARDIMCILAR ---
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _client(target: RotationTarget, password: str) -> Iterator[HikvisionClient]:
+        # Her deneme ayrı oturum: eski Digest durumu yeni şifreyle karışmasın.
+        # Adım bitince kapatılır (binlerce cihazda bağlantı havuzları GC'yi beklemesin)
+        client = HikvisionClient(target.ip, target.username, password, port=target.port)
+        try:
+            yield client
+        finally:
+            client.session.close()
+
+    @staticmethod
+    def _user_id(client: HikvisionClient, username: str) -> int:
+        for user in client.security.get_users():
+            if user.user_name == username:
+                return user.id
+        return 1 # Admin
+
+    def _audit(self, record: CredentialRotationRecord):
+        if self.audit_path:
+            with self._lock:
+                with open(self.audit_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record.model_dump(), ensure_ascii=False) + "\n")
+        if self.on_record:
+            self.on_record(record)
+
+
+def _now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
@@ -0,0 +1,272 @@
+import asyncio
+import ipaddress
+import re
+import socket
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from ..core import SimpleConfig
+from ..models.network import DiscoveredDevice
+from ..utils import parse_xml
+
+# SADP (Search Active Device Protocol): Hikvision cihazları bu gruba gelen Probe'a ProbeMatch ile cevap verir
+SADP_GROUP = "239.255.255.250"
+SADP_PORT = 37020
+
+# Kimlik doğrulamasız deviceInfo isteğine 401 dönen sunucularda aranan Hikvision izleri
+_SERVER_MARKERS = ("webs", "hikvision", "dnvrs")
+_REALM_PATTERN = re.compile(r"^(ip camera|ds-|ids-|hikvision|nvr|dvr|ipc)", re.IGNORECASE)
+
+
+# --- SADP ---
+
+def sadp_discover(timeout: float = 3.0, group: str = SADP_GROUP, port: int = SADP_PORT,
+                  listen_port: int = SADP_PORT, interface: str = "0.0.0.0", retries: int = 2) -> List[DiscoveredDevice]:
+    """
+    SADP multicast sorgusu gönderir ve timeout süresince gelen cevapları toplar.
+    UDP kayıplı olduğu için sorgu retries kez tekrarlanır.
+
+    :param group/port: Sorgunun gönderileceği adres (test için 127.0.0.1 verilebilir).
+    :param listen_port: Cevapların dinlendiği port (cihazlar cevabı da gruba gönderir).
+    """
+    probe_id = str(uuid.uuid4()).upper()
+    probe = (f'<?xml version="1.0" encoding="utf-8"?><Probe><Uuid>{probe_id}</Uuid>'
+             f'<Types>inquiry</Types></Probe>').encode()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            except OSError:
+                pass
+        sock.bind(("", listen_port))
+
+        if ipaddress.ip_address(group).is_multicast:
+            membership = socket.inet_aton(group) + socket.inet_aton(interface)
+            try:
+                sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+                sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(interface))
+                sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
+            except OSError as e:
+                print(f"   ⚠️ SADP multicast grubuna katılınamadı: {e}")
+
+        found: Dict[str, DiscoveredDevice] = {}
+        started = time.monotonic()
+        deadline = started + timeout
+        send_times = [started + timeout * i / (retries + 1) for i in range(retries + 1)]
+
+        while True:
+            now = time.monotonic()
+            while send_times and send_times[0] <= now:
+                send_times.pop(0)
+                sock.sendto(probe, (group, port))
+            if now >= deadline:
+                break
+
+            sock.settimeout(max(0.01, min([deadline] + send_times[:1]) - now))
+            try:
+                data, _ = sock.recvfrom(65535)
+            except socket.timeout:
+                continue
+
+            device = _parse_probe_match(data, probe_id)
+            if device is not None:
+                _merge(found, device)
+        return list(found.values())
+    finally:
+        sock.close()
+
+
+def _parse_probe_match(data: bytes, probe_id: str) -> Optional[DiscoveredDevice]:
+    if b"<ProbeMatch" not in data:
+        return None # Kendi gönderdiğimiz (veya başkasının) Probe paketi
+    match = parse_xml(data).get("ProbeMatch") or {}
+    if match.get("Uuid") and match["Uuid"].upper() != probe_id:
+        return None # Başka bir istemcinin sorgusuna verilen cevap
+    if not match.get("IPv4Address"):
+        return None
+
+    port = str(match.get("HttpPort") or "80")
+    activated = match.get("Activated")
+    return DiscoveredDevice(
+        ip=match["IPv4Address"],
+        http_port=int(port) if port.isdigit() else 80,
+        mac=match.get("MAC"),
+        serial=match.get("DeviceSN"),
+        model=match.get("DeviceDescription") or match.get("DeviceType"),
+        firmware_version=match.get("SoftwareVersion"),
+        activated=None if activated is None else str(activated).lower() == "true",
+        source="sadp",
+    )
+
+
+# --- ISAPI TARAMASI ---
+
+async def probe_hosts(hosts: Iterable[str], ports: Sequence[int] = (80,), concurrency: int = 1024,
+                      timeout: float = 0.5, strict: bool = True) -> List[DiscoveredDevice]:
+    """
+    Adresleri paralel tarar: TCP bağlantısı + kimlik doğrulamasız GET /ISAPI/System/deviceInfo.
+    - 200 ve DeviceInfo dönerse bilgiler doğrudan okunur.
+    - 401 dönerse Server / WWW-Authenticate başlıkları Hikvision parmak izi olarak kullanılır
+      (strict=False ise ISAPI yoluna 401 dönen her sunucu kabul edilir).
+
+    Açık soket sayısı concurrency ile sınırlıdır (işletim sistemi dosya limiti de gözetilir).
+    Tüm adresler için görev oluşturulmaz, sabit sayıda işçi ortak üreteçten adres çeker.
+    """
+    targets = ((host, port) for host in hosts for port in ports)
+    results: List[DiscoveredDevice] = []
+
+    async def worker():
+        for host, port in targets:
+            device = await _probe_one(host, port, timeout, strict)
+            if device is not None:
+                results.append(device)
+
+    await asyncio.gather(*(worker() for _ in range(_socket_budget(concurrency))))
+    return results
+
+
+def _socket_budget(concurrency: int) -> int:
+    try:
+        import resource
+        soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft > 0:
+            concurrency = min(concurrency, max(1, soft - 64)) # Diğer açık dosyalara pay bırak
+    except (ImportError, ValueError, OSError):
+        pass
+    return max(1, concurrency)
+
+
+async def _probe_one(host: str, port: int, timeout: float, strict: bool) -> Optional[DiscoveredDevice]:
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return None
+
+    try:
+        writer.write(f"GET /ISAPI/System/deviceInfo HTTP/1.1\r\nHost: {host}:{port}\r\n"
+                     f"Connection: close\r\n\r\n".encode())
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout * 2)
+
+        lines = head.decode("latin-1").split("\r\n")
+        parts = lines[0].split(" ", 2)
+        status = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0
+        headers = {}
+        for line in lines[1:]:
+            key, sep, value = line.partition(":")
+            if sep:
+                headers[key.strip().lower()] = value.strip()
+
+        server = headers.get("server")
+        if status == 200:
+            length = int(headers.get("content-length", "0") or 0)
+            if not 0 < length <= 64 * 1024:
+                return None
+            body = await asyncio.wait_for(reader.readexactly(length), timeout * 2)
+            info = parse_xml(body).get("DeviceInfo") if b"<DeviceInfo" in body else None
+            if not info:
+                return None
+            return DiscoveredDevice(
+                ip=host, http_port=port, mac=info.get("macAddress"), serial=info.get("serialNumber"),
+                model=info.get("model"), firmware_version=info.get("firmwareVersion"), source="probe", server=server,
+            )
+
+        if status == 401:
+            realm = None
+            match = re.search(r'realm="([^"]*)"', headers.get("www-authenticate", ""))
+            if match:
+                realm = match.group(1)
+            looks_like_hikvision = (
+                any(marker in (server or "").lower() for marker in _SERVER_MARKERS)
+                or (realm is not None and _REALM_PATTERN.match(realm) is not None)
+            )
+            if looks_like_hikvision or not strict:
+                return DiscoveredDevice(ip=host, http_port=port, source="probe", realm=realm, server=server)
+        return None
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+        return None
+    finally:
+        writer.close()
+
+
+# --- BİRLEŞTİRME ---
+
+def _merge(found: Dict[str, DiscoveredDevice], device: DiscoveredDevice):
+    """Aynı cihazı (MAC/seri no) tek kayıtta birleştirir, eksik alanları tamamlar."""
+    existing = found.get(device.key)
+    if existing is None:
+        found[device.key] = device
+        return
+    for field, value in device.model_dump().items():
+        if getattr(existing, field) is None and value is not None:
+            setattr(existing, field, value)
+    if device.source not in existing.source.split("+"):
+        existing.source = f"{existing.source}+{device.source}"
+
+
+class DeviceDiscovery:
+    """
+    Yerel ağdaki Hikvision cihazlarını bulur.
+    Önce SADP multicast sorgusu yapılır; verilen ağlarda SADP ile bulunamayan adresler
+    ISAPI taraması ile denenir (SADP'nin geçmediği router/VLAN arkası için).
+    Sonuçlar MAC/seri no ile tekilleştirilir.
+
+    Kullanım:
+        discovery = DeviceDiscovery()
+        devices = discovery.discover(["192.168.0.0/16"])
+        clients = [HikvisionClient(c.ip, c.username, c.password, c.port)
+                   for c in discovery.configs(devices, "admin", "pass")]
+    """
+
+    def __init__(self, sadp: bool = True, sadp_timeout: float = 3.0, ports: Sequence[int] = (80,),
+                 concurrency: int = 1024, timeout: float = 0.5, strict: bool = True, **sadp_options):
+        """
+        :param timeout: Tarama için bağlantı zaman aşımı (sn). /16 için 1024 işçi ile ~30 sn sürer.
+        :param sadp_options: sadp_discover'a geçilen ek parametreler (group, port, listen_port ...).
+        """
+        self.sadp = sadp
+        self.sadp_timeout = sadp_timeout
+        self.ports = tuple(ports)
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.strict = strict
+        self.sadp_options = sadp_options
+
+    def discover(self, networks: Iterable[str] = ()) -> List[DiscoveredDevice]:
+        """Senkron kullanım (içeride kendi event loop'unu çalıştırır)."""
+        return asyncio.run(self.discover_async(networks))
+
+    async def discover_async(self, networks: Iterable[str] = ()) -> List[DiscoveredDevice]:
+        found: Dict[str, DiscoveredDevice] = {}
+
+        if self.sadp:
+            loop = asyncio.get_running_loop()
+            try:
+                devices = await loop.run_in_executor(
+                    None, lambda: sadp_discover(timeout=self.sadp_timeout, **self.sadp_options))
+            except OSError as e:
+                print(f"   ⚠️ SADP sorgusu başarısız: {e}")
+                devices = []
+            for device in devices:
+                _merge(found, device)
+
+        known = {device.ip for device in found.values()}
+        hosts = (str(ip) for network in networks
+                 for ip in _hosts(network) if str(ip) not in known)
+        for device in await probe_hosts(hosts, self.ports, self.concurrency, self.timeout, self.strict):
+            _merge(found, device)
+
+        return sorted(found.values(), key=lambda d: (ipaddress.ip_address(d.ip), d.http_port))
+
+    @staticmethod
+    def configs(devices: Iterable[DiscoveredDevice], username: str, password: str, channel: int = 1) -> List[SimpleConfig]:
+        """Bulunan cihazlar için HikvisionClient'a verilebilecek yapılandırmalar."""
+        return [SimpleConfig(d.ip, username, password, port=d.http_port, channel=channel) for d in devices]
+
+
+def _hosts(network: str):
+    net = ipaddress.ip_network(network, strict=False)
+    return net.hosts() if net.num_addresses > 1 else [net.network_address]
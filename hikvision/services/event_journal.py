@@ -0,0 +1,384 @@
+import hashlib
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from typing import Callable, Generator, Iterable, List, Optional, Tuple
+
+from ..models.event import EventAlert
+
+# --- DOSYA FORMATI ---
+# journal-00000001.log : Sabit boyutlu slotlardan oluşan append-only kayıt dosyası.
+#                        Bir kayıt 1 veya daha fazla ardışık slot kaplar (uzun açıklamalar için).
+#                        [magic(2) | slot sayısı(2) | payload uzunluğu(4) | ts(8) | cihaz hash(8)] + JSON
+# journal-00000001.idx : Kayıt başına sabit 20 byte'lık indeks (ts, cihaz hash, slot no).
+#                        Okurken mmap ile açılır, zaman aralığı ikili arama ile bulunur.
+
+SLOT_SIZE = 512
+RECORD_MAGIC = b"HJ"
+RECORD_HEADER = struct.Struct("<2sHIdQ")
+INDEX_ENTRY = struct.Struct("<dQI")
+
+SEGMENT_PATTERN = re.compile(r"^journal-(\d{8})\.log$")
+
+
+def device_hash(device: Optional[str]) -> int:
+    """Cihaz adını (MAC/IP) sabit 64-bit anahtara çevirir. 0 = cihaz belirtilmemiş."""
+    if not device:
+        return 0
+    return int.from_bytes(hashlib.blake2b(device.encode(), digest_size=8).digest(), "little") or 1
+
+
+class _Segment:
+    """Tek bir log + indeks dosya çifti."""
+
+    def __init__(self, directory: str, number: int):
+        self.number = number
+        self.log_path = os.path.join(directory, f"journal-{number:08d}.log")
+        self.idx_path = os.path.join(directory, f"journal-{number:08d}.idx")
+
+    def slot_count(self) -> int:
+        return os.path.getsize(self.log_path) // SLOT_SIZE if os.path.exists(self.log_path) else 0
+
+    def entry_count(self) -> int:
+        return os.path.getsize(self.idx_path) // INDEX_ENTRY.size if os.path.exists(self.idx_path) else 0
+
+    def recover(self):
+        """Yarım yazılmış son kaydı (çökme sonrası) temizler."""
+        slots = self.slot_count()
+        with open(self.log_path, "r+b") as f:
+            f.truncate(slots * SLOT_SIZE)
+
+        entries = self.entry_count()
+        with open(self.idx_path, "r+b") as f:
+            f.truncate(entries * INDEX_ENTRY.size)
+            # Log dosyasında karşılığı olmayan indeks kayıtlarını at
+            while entries:
+                f.seek((entries - 1) * INDEX_ENTRY.size)
+                _, _, slot = INDEX_ENTRY.unpack(f.read(INDEX_ENTRY.size))
+                if slot < slots:
+                    break
+                entries -= 1
+            f.truncate(entries * INDEX_ENTRY.size)
+
+
+class _IndexView:
+    """Indeks dosyasının mmap görünümü (salt okunur)."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self.count = size // INDEX_ENTRY.size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def entry(self, i: int) -> Tuple[float, int, int]:
+        return INDEX_ENTRY.unpack_from(self._map, i * INDEX_ENTRY.size)
+
+    def timestamp(self, i: int) -> float:
+        return struct.unpack_from("<d", self._map, i * INDEX_ENTRY.size)[0]
+
+    def lower_bound(self, ts: float) -> int:
+        """ts'ye eşit veya büyük ilk kaydın sırası (ikili arama)."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.timestamp(mid) < ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+class EventJournal:
+    """
+    listen_alert_stream çıktısı için append-only ikili olay günlüğü.
+
+    - Kayıtlar sabit boyutlu slotlara yazılır, indeks (zaman, cihaz) mmap ile okunur.
+    - Segment dolunca (segment_slots) yeni segmente geçilir.
+    - scan() ile zaman/cihaz aralığı hızlıca taranır, replay() ile kayıtlar canlı akışla
+      aynı tipte (EventAlert) geri oynatılır.
+    - Zaman anahtarı kaydın alındığı andır (journal saati); cihaz saati payload'da korunur.
+
+    Kullanım:
+        journal = EventJournal("/var/lib/hikvision/journal")
+        for alert in journal.tee(cam.event.listen_alert_stream(), device=cam.session.config.ip):
+            handle(alert)
+
+        for alert in journal.replay(start_ts, end_ts, device="192.168.1.64"):
+            handle(alert)
+    """
+
+    def __init__(self, directory: str, segment_slots: int = 262144, flush_every: int = 256,
+                 fsync: bool = False, clock: Callable[[], float] = time.time):
+        """
+        :param segment_slots: Segment başına slot sayısı (varsayılan 262144 x 512 B = 128 MB).
+        :param flush_every: Bu kadar kayıtta bir işletim sistemine flush edilir.
+        :param fsync: True ise her flush'ta diske senkronlanır (yavaş ama güvenli).
+        """
+        self.directory = directory
+        self.segment_slots = segment_slots
+        self.flush_every = flush_every
+        self.fsync = fsync
+        self.clock = clock
+
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self._pending = 0
+        self._log_file = None
+        self._idx_file = None
+
+        numbers = self._segment_numbers()
+        self._segment = _Segment(directory, numbers[-1] if numbers else 1)
+        self._open_segment(recover=bool(numbers))
+
+    # --- YAZMA ---
+
+    def append(self, alert: EventAlert, device: str = None, ts: float = None) -> int:
+        """
+        Bildirimi günlüğe ekler. Kaydın segment içindeki slot numarasını döner.
+        :param device: Verilmezse bildirimdeki MAC, o da yoksa IP kullanılır.
+        :param ts: Verilmezse journal saati. Verilirse artan sırada olmalıdır (indeks zamana göre sıralıdır).
+        """
+        ts = self.clock() if ts is None else ts
+        device = device or alert.mac_address or alert.ip_address
+        dev_hash = device_hash(device)
+        payload = alert.model_dump_json().encode()
+
+        slots = (RECORD_HEADER.size + len(payload) + SLOT_SIZE - 1) // SLOT_SIZE
+        record = RECORD_HEADER.pack(RECORD_MAGIC, slots, len(payload), ts, dev_hash) + payload
+
+        with self._lock:
+            # Segmentten büyük kayıt boş segmente tek başına yazılır (boş segment döndürülmez)
+            if self._slot and self._slot + slots > self.segment_slots:
+                self.rotate()
+
+            slot = self._slot
+            self._log_file.write(record.ljust(slots * SLOT_SIZE, b"\0"))
+            self._idx_file.write(INDEX_ENTRY.pack(ts, dev_hash, slot))
+            self._slot += slots
+
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                self.flush()
+            return slot
+
+    def tee(self, alerts: Iterable[EventAlert], device: str = None) -> Generator[EventAlert, None, None]:
+        """Akışı değiştirmeden geçirir, her bildirimi günlüğe de yazar."""
+        for alert in alerts:
+            self.append(alert, device=device)
+            yield alert
+
+    def flush(self):
+        with self._lock:
+            if self._log_file is None:
+                return
+            self._log_file.flush()
+            self._idx_file.flush()
+            if self.fsync:
+                os.fsync(self._log_file.fileno())
+                os.fsync(self._idx_file.fileno())
+            self._pending = 0
+
+    def rotate(self):
+        """Aktif segmenti kapatıp yenisine geçer."""
+        with self._lock:
+            self._close_files()
+            self._segment = _Segment(self.directory, self._segment.number + 1)
+            self._open_segment(recover=False)
+
+    def close(self):
+        with self._lock:
+            self._close_files()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- OKUMA ---
+
+    def scan(self, start: float = None, end: float = None,
+             device: str = None) -> Generator[Tuple[float, EventAlert], None, None]:
+        """
+        [start, end) aralığındaki kayıtları (ts, EventAlert) olarak zaman sırasıyla döner.
+        Sadece indeks taranır; payload yalnızca eşleşen kayıtlar için okunur.
+        """
+        self.flush()
+        wanted = device_hash(device) if device else None
+
+        for segment in self._segments():
+            if not os.path.exists(segment.idx_path) or segment.entry_count() == 0:
+                continue
+
+            index = _IndexView(segment.idx_path)
+            try:
+                if start is not None and index.timestamp(index.count - 1) < start:
+                    continue
+                if end is not None and index.timestamp(0) >= end:
+                    break
+
+                first = index.lower_bound(start) if start is not None else 0
+                with open(segment.log_path, "rb") as log:
+                    log_map = mmap.mmap(log.fileno(), 0, access=mmap.ACCESS_READ)
+                    try:
+                        for i in range(first, index.count):
+                            ts, dev, slot = index.entry(i)
+                            if end is not None and ts >= end:
+                                return
+                            if wanted is not None and dev != wanted:
+                                continue
+                            yield ts, self._read_record(log_map, slot)
+                    finally:
+                        log_map.close()
+            finally:
+                index.close()
+
+    def replay(self, start: float = None, end: float = None, device: str = None,
+               speed: float = None) -> Generator[EventAlert, None, None]:
+        """
+        Kayıtları listen_alert_stream ile aynı tipte (EventAlert) geri oynatır.
+        :param speed: None ise beklemeden, 1.0 gerçek zamanlı, 10.0 on kat hızlı.
+        """
+        first_ts = None
+        started = time.monotonic()
+        for ts, alert in self.scan(start, end, device):
+            if speed:
+                if first_ts is None:
+                    first_ts = ts
+                delay = (ts - first_ts) / speed - (time.monotonic() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            yield alert
+
+    # --- BAKIM ---
+
+    def compact(self, before: float = None, keep: Callable[[float, EventAlert], bool] = None) -> int:
+        """
+        Kapalı segmentleri sıkıştırır. Aktif segmente dokunulmaz.
+        :param before: Bu zamandan eski kayıtlar silinir (saklama süresi).
+        :param keep: (ts, alert) -> bool. False dönen kayıtlar silinir
+                     (örn. tekrarlanan active bildirimleri: lambda ts, a: a.active_post_count <= 1).
+        :return: Silinen kayıt sayısı.
+        """
+        removed = 0
+        for segment in self._segments():
+            if segment.number == self._segment.number:
+                continue
+
+            index = _IndexView(segment.idx_path)
+            count = index.count
+            newest = index.timestamp(count - 1) if count else None
+            index.close()
+
+            # Kayıt sığmadan döndürülmüş (boş) segment: tutacak bir şey yok
+            if count == 0:
+                os.remove(segment.log_path)
+                os.remove(segment.idx_path)
+                continue
+
+            # Segmentin tamamı eskiyse direkt sil
+            if before is not None and newest < before:
+                removed += count
+                os.remove(segment.log_path)
+                os.remove(segment.idx_path)
+                continue
+
+            if before is None and keep is None:
+                continue
+            removed += self._rewrite_segment(segment, before, keep)
+        return removed
+
+    def segment_count(self) -> int:
+        return len(self._segment_numbers())
+
+    # --- İÇ METOTLAR ---
+
+    def _rewrite_segment(self, segment: _Segment, before: Optional[float], keep) -> int:
+        tmp_log = segment.log_path + ".tmp"
+        tmp_idx = segment.idx_path + ".tmp"
+        removed = 0
+        slot = 0
+        if os.path.getsize(segment.log_path) == 0:
+            return 0 # mmap boş dosyayı eşleyemez; silinecek kayıt da yok
+
+        with open(tmp_log, "wb") as out_log, open(tmp_idx, "wb") as out_idx:
+            index = _IndexView(segment.idx_path)
+            try:
+                with open(segment.log_path, "rb") as log:
+                    log_map = mmap.mmap(log.fileno(), 0, access=mmap.ACCESS_READ)
+                    try:
+                        for i in range(index.count):
+                            ts, dev, old_slot = index.entry(i)
+                            _, slots, _, _, _ = RECORD_HEADER.unpack_from(log_map, old_slot * SLOT_SIZE)
+                            if before is not None and ts < before:
+                                removed += 1
+                                continue
+                            if keep is not None and not keep(ts, self._read_record(log_map, old_slot)):
+                                removed += 1
+                                continue
+                            start = old_slot * SLOT_SIZE
+                            out_log.write(log_map[start:start + slots * SLOT_SIZE])
+                            out_idx.write(INDEX_ENTRY.pack(ts, dev, slot))
+                            slot += slots
+                    finally:
+                        log_map.close()
+            finally:
+                index.close()
+
+        if removed == 0:
+            os.remove(tmp_log)
+            os.remove(tmp_idx)
+            return 0
+
+        # Önce log sonra indeks: arada çökme olursa recover() tutarsız indeksleri atar
+        os.replace(tmp_log, segment.log_path)
+        os.replace(tmp_idx, segment.idx_path)
+        return removed
+
+    @staticmethod
+    def _read_record(log_map, slot: int) -> EventAlert:
+        offset = slot * SLOT_SIZE
+        magic, _, length, _, _ = RECORD_HEADER.unpack_from(log_map, offset)
+        if magic != RECORD_MAGIC:
+            raise ValueError(f"Bozuk journal kaydı (slot {slot})")
+        start = offset + RECORD_HEADER.size
+        return EventAlert.model_validate_json(log_map[start:start + length])
+
+    def _segment_numbers(self) -> List[int]:
+        numbers = []
+        for name in os.listdir(self.directory):
+            match = SEGMENT_PATTERN.match(name)
+            if match:
+                numbers.append(int(match.group(1)))
+        return sorted(numbers)
+
+    def _segments(self) -> List[_Segment]:
+        return [_Segment(self.directory, n) for n in self._segment_numbers()]
+
+    def _open_segment(self, recover: bool):
+        segment = self._segment
+        for path in (segment.log_path, segment.idx_path):
+            if not os.path.exists(path):
+                open(path, "wb").close()
+        if recover:
+            segment.recover()
+        self._log_file = open(segment.log_path, "ab")
+        self._idx_file = open(segment.idx_path, "ab")
+        self._slot = segment.slot_count()
+
+    def _close_files(self):
+        if self._log_file is None:
+            return
+        self.flush()
+        self._log_file.close()
+        self._idx_file.close()
+        self._log_file = None
+        self._idx_file = None
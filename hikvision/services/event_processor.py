@@ -0,0 +1,235 @@
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, Generator, Iterable, List, Optional, Tuple
+
+from ..models.event import EventAlert, EventTransition
+
+EventKey = Tuple[Optional[str], Optional[str], str, Optional[str]]
+
+# Durum makinesi fazları
+PENDING = "pending"   # İlk 'active' geldi, debounce süresi bekleniyor
+ACTIVE = "active"     # Olay başladı (start üretildi)
+HOLDING = "holding"   # 'inactive' geldi, hold-off süresince yeniden başlarsa aynı olay sayılır
+
+
+class _EventState:
+    __slots__ = ("key", "phase", "first_seen", "last_seen", "ended_at", "count",
+                 "deadline", "armed", "removed", "alert")
+
+    def __init__(self, key: EventKey, now: float, alert: EventAlert):
+        self.key = key
+        self.phase = PENDING
+        self.first_seen = now
+        self.last_seen = now
+        self.ended_at = None
+        self.count = 1
+        self.deadline = now
+        self.armed = None     # Heap'teki geçerli kaydın zamanı
+        self.removed = False
+        self.alert = alert
+
+
+def _to_datetime(ts: float) -> datetime:
+    return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+
+class EventStateProcessor:
+    """
+    listen_alert_stream çıktısını durum geçişlerine (start/end) indirger.
+    Anahtar: (cihaz, kanal, eventType, bölge)
+
+    - Her saniye tekrarlanan 'active' bildirimleri tek olayda birleştirilir (repeat_count).
+    - debounce: Bu süreden kısa active->inactive çiftleri hiç raporlanmaz.
+    - hold_off: 'inactive' sonrası bu süre içinde tekrar 'active' gelirse olay devam eder,
+      end ancak süre dolunca üretilir.
+    - stale_timeout: 'inactive' hiç gelmezse, son bildirimden bu kadar sonra olay
+      'timeout' sebebiyle kapatılır.
+    - max_keys: Bellek sınırı. Aşılırsa en uzun süredir güncellenmeyen anahtar atılır.
+
+    Süre aşımları her process() çağrısında kontrol edilir (kameralar ~10 sn'de bir
+    videoloss heartbeat gönderir). Akış tamamen susabilecekse expire() periyodik çağrılmalı.
+
+    Kullanım:
+        processor = EventStateProcessor(debounce=1.0, hold_off=3.0)
+        for transition in processor.run(cam.event.listen_alert_stream()):
+            publish(transition)
+    """
+
+    def __init__(self, debounce: float = 0.0, hold_off: float = 0.0, stale_timeout: float = 5.0,
+                 max_keys: int = 50000, device: str = None, clock: Callable[[], float] = time.time):
+        """
+        :param device: Bildirimde MAC/IP yoksa kullanılacak cihaz adı.
+        :param clock: Saniye cinsinden zaman kaynağı (test/replay için değiştirilebilir).
+        """
+        self.debounce = debounce
+        self.hold_off = hold_off
+        self.stale_timeout = stale_timeout
+        self.max_keys = max_keys
+        self.device = device
+        self.clock = clock
+
+        self._states: "OrderedDict[EventKey, _EventState]" = OrderedDict()
+        self._heap = []
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    # --- GENEL API ---
+
+    def key_for(self, alert: EventAlert) -> EventKey:
+        device = alert.mac_address or alert.ip_address or self.device
+        return (device, alert.channel_id, alert.event_type, alert.region_id)
+
+    def process(self, alert: EventAlert, now: float = None) -> List[EventTransition]:
+        """Tek bir bildirimi işler, oluşan geçişleri (0, 1 veya daha fazla) döner."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            transitions = self._expire(now)
+            self._apply(alert, now, transitions)
+            return transitions
+
+    def expire(self, now: float = None) -> List[EventTransition]:
+        """Süresi dolan durumları (debounce, hold-off, timeout) işler."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            return self._expire(now)
+
+    def run(self, alerts: Iterable[EventAlert]) -> Generator[EventTransition, None, None]:
+        """Bildirim akışını geçiş akışına çevirir."""
+        for alert in alerts:
+            yield from self.process(alert)
+        # Akış bittiyse açık kalan olaylar timeout ile kapanabilsin
+        yield from self.expire()
+
+    def active_keys(self) -> List[EventKey]:
+        with self._lock:
+            return [k for k, s in self._states.items() if s.phase != PENDING]
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    # --- DURUM MAKİNESİ ---
+
+    def _apply(self, alert: EventAlert, now: float, out: List[EventTransition]):
+        key = self.key_for(alert)
+        state = self._states.get(key)
+        is_active = str(alert.event_state).lower() == "active"
+
+        if state is None:
+            if not is_active:
+                return # Bilinmeyen olayın bitişi (veya heartbeat), yok say
+            state = _EventState(key, now, alert)
+            self._states[key] = state
+            if self.debounce <= 0:
+                self._start(state, now, out)
+            else:
+                self._set_deadline(state, now + self.debounce)
+            self._enforce_limit(out)
+            return
+
+        self._states.move_to_end(key)
+        state.alert = alert
+
+        if is_active:
+            state.last_seen = now
+            state.count += 1
+            if state.phase == PENDING:
+                if now - state.first_seen >= self.debounce:
+                    self._start(state, now, out)
+            else:
+                # ACTIVE veya HOLDING -> olay devam ediyor
+                state.phase = ACTIVE
+                state.ended_at = None
+                self._set_deadline(state, now + self.stale_timeout)
+            return
+
+        # inactive
+        if state.phase == PENDING:
+            self._remove(state) # debounce süresinden kısa, raporlanmaz
+        elif state.phase == ACTIVE:
+            state.ended_at = now
+            if self.hold_off <= 0:
+                self._end(state, now, "inactive", out)
+            else:
+                state.phase = HOLDING
+                self._set_deadline(state, now + self.hold_off)
+
+    def _fire(self, state: _EventState, now: float, out: List[EventTransition]):
+        """Heap'ten çıkan ve zamanı gelen durumun aksiyonu."""
+        if state.phase == PENDING:
+            if now - state.last_seen <= self.stale_timeout:
+                self._start(state, now, out)
+            else:
+                self._remove(state)
+        elif state.phase == ACTIVE:
+            state.ended_at = state.last_seen
+            self._end(state, now, "timeout", out)
+        elif state.phase == HOLDING:
+            self._end(state, now, "inactive", out)
+
+    def _start(self, state: _EventState, now: float, out: List[EventTransition]):
+        state.phase = ACTIVE
+        self._set_deadline(state, state.last_seen + self.stale_timeout)
+        out.append(self._transition(state, "start"))
+
+    def _end(self, state: _EventState, now: float, reason: str, out: List[EventTransition]):
+        ended_at = state.ended_at if state.ended_at is not None else now
+        out.append(self._transition(
+            state, "end",
+            ended_at=_to_datetime(ended_at),
+            duration=round(ended_at - state.first_seen, 3),
+            reason=reason,
+        ))
+        self._remove(state)
+
+    def _transition(self, state: _EventState, kind: str, **extra) -> EventTransition:
+        device, channel, event_type, region = state.key
+        return EventTransition(
+            kind=kind,
+            device=device,
+            channel_id=channel,
+            event_type=event_type,
+            region_id=region,
+            started_at=_to_datetime(state.first_seen),
+            repeat_count=state.count,
+            alert=state.alert,
+            **extra,
+        )
+
+    def _remove(self, state: _EventState):
+        state.removed = True
+        self._states.pop(state.key, None)
+
+    def _enforce_limit(self, out: List[EventTransition]):
+        while len(self._states) > self.max_keys:
+            _, oldest = next(iter(self._states.items()))
+            if oldest.phase == PENDING:
+                self._remove(oldest)
+            else:
+                self._end(oldest, oldest.last_seen, "evicted", out)
+
+    # --- ZAMANLAYICI (Lazy heap: anahtar başına en fazla ~2 kayıt) ---
+
+    def _set_deadline(self, state: _EventState, deadline: float):
+        state.deadline = deadline
+        # Heap'teki kayıt daha geç ise yenisini ekle; daha erken ise pop anında yeniden kurulur
+        if state.armed is None or deadline < state.armed:
+            self._seq += 1
+            heapq.heappush(self._heap, (deadline, self._seq, state))
+            state.armed = deadline
+
+    def _expire(self, now: float) -> List[EventTransition]:
+        out: List[EventTransition] = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            armed, _, state = heapq.heappop(heap)
+            if state.removed or armed != state.armed:
+                continue # Eski/iptal edilmiş kayıt
+            state.armed = None
+            if state.deadline <= now:
+                self._fire(state, now, out)
+            else:
+                self._set_deadline(state, state.deadline)
+        return out
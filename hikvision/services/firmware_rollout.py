@@ -0,0 +1,238 @@
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+from ..client import HikvisionClient
+from ..models.system import FirmwareUpgradeResult
+
+
+class TokenBucket:
+    """
+    Thread-safe bant genişliği sınırlayıcı (byte/sn).
+    Aynı sahadaki tüm yüklemeler tek bucket'ı paylaşır, toplam hız rate'i geçmez.
+    """
+
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, amount: int):
+        """amount byte'lık kotayı ayırır, gerekiyorsa kota dolana kadar bloklar."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Borçlanmaya izin veriyoruz: sıradaki çağıran borç kapanana kadar bekler
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+class RolloutTarget:
+    """Rollout'taki tek cihaz. site: bant genişliği ve eşzamanlılık sınırlarının uygulandığı grup."""
+
+    def __init__(self, client: HikvisionClient, site: str = "default", name: str = None):
+        self.client = client
+        self.site = site
+        self.name = name or str(client.session.config.ip)
+
+
+class FirmwareRollout:
+    """
+    Firmware'i filoya dalgalar (wave) halinde yayar.
+
+    - waves: Her dalganın bitişi; int = cihaz sayısı, float = toplamın kümülatif oranı.
+      Örn: (5, 0.1, 1.0) -> önce 5 cihaz (canary), sonra %10'a kadar, sonra hepsi.
+      Cihazlar sahalar arasında sırayla dağıtılır, canary tek sahada toplanmaz.
+    - max_concurrency / per_site_concurrency: Aynı anda yüklenen cihaz sınırları.
+    - site_bandwidth: Saha -> byte/sn. O sahadaki tüm yüklemeler toplamda bu hızı geçmez.
+    - max_failure_rate: Tamamlanan cihazlarda hata oranı bu değeri aşarsa (en az min_samples
+      sonuçtan sonra) yeni yükleme başlatılmaz, kalanlar "skipped" olur. Havadakiler tamamlanır.
+
+    Kullanım:
+        rollout = FirmwareRollout("IPC_V5.7.3.dav", expected_version="V5.7.3",
+                                  site_bandwidth={"depo": 2_000_000}, max_failure_rate=0.05)
+        for cam, site in cameras:
+            rollout.add(cam, site=site)
+        results = rollout.run()
+        print(rollout.summary())
+    """
+
+    def __init__(self, firmware_path: str, expected_version: str = None,
+                 waves: Sequence[Union[int, float]] = (0.01, 0.1, 1.0),
+                 max_concurrency: int = 20, per_site_concurrency: int = 4,
+                 site_bandwidth: Dict[str, float] = None, default_site_bandwidth: float = None,
+                 max_failure_rate: float = 0.1, min_samples: int = 5, wave_pause: float = 0.0,
+                 on_result: Callable[[FirmwareUpgradeResult], None] = None, **upgrade_options):
+        """
+        :param wave_pause: Dalgalar arası bekleme (sn); bu sürede halt() ile durdurulabilir.
+        :param upgrade_options: SystemAPI.upgrade_firmware'e geçilen ek parametreler (boot_timeout vb.).
+        """
+        self.firmware_path = firmware_path
+        self.expected_version = expected_version
+        self.waves = list(waves)
+        self.max_concurrency = max_concurrency
+        self.per_site_concurrency = per_site_concurrency
+        self.site_bandwidth = dict(site_bandwidth or {})
+        self.default_site_bandwidth = default_site_bandwidth
+        self.max_failure_rate = max_failure_rate
+        self.min_samples = min_samples
+        self.wave_pause = wave_pause
+        self.on_result = on_result
+        self.upgrade_options = upgrade_options
+
+        self.targets: List[RolloutTarget] = []
+        self.results: Dict[int, FirmwareUpgradeResult] = {}
+        self.halt_reason: Optional[str] = None
+
+        self._cond = threading.Condition()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._stop = threading.Event()
+
+    # --- GENEL API ---
+
+    def add(self, client: HikvisionClient, site: str = "default", name: str = None) -> RolloutTarget:
+        target = RolloutTarget(client, site, name)
+        self.targets.append(target)
+        return target
+
+    def halt(self, reason: str = "Manuel olarak durduruldu."):
+        """Yeni yükleme başlatılmasını durdurur (havadakiler tamamlanır)."""
+        with self._cond:
+            if self.halt_reason is None:
+                self.halt_reason = reason
+            self._stop.set()
+            self._cond.notify_all()
+
+    @property
+    def halted(self) -> bool:
+        return self.halt_reason is not None
+
+    def plan(self) -> List[List[RolloutTarget]]:
+        """Cihazların dalgalara dağılımı."""
+        ordered = self._interleave_sites(self.targets)
+        total = len(ordered)
+        waves, start = [], 0
+        for boundary in self.waves + [total]:
+            end = boundary if isinstance(boundary, int) else int(round(boundary * total))
+            end = max(start, min(total, end))
+            if end > start:
+                waves.append(ordered[start:end])
+                start = end
+        return waves
+
+    def run(self) -> List[FirmwareUpgradeResult]:
+        """Rollout'u çalıştırır. Sonuçlar add() sırasıyla döner."""
+        index = {id(t): i for i, t in enumerate(self.targets)}
+        for wave_number, wave in enumerate(self.plan()):
+            if self.halted:
+                self._skip(wave, index)
+                continue
+            print(f"🚀 Dalga {wave_number + 1}: {len(wave)} cihaz")
+            self._run_wave(wave, index)
+            if not self.halted and self.wave_pause:
+                self._stop.wait(self.wave_pause)
+        return [self.results[i] for i in range(len(self.targets))]
+
+    def summary(self) -> dict:
+        states = Counter(r.state for r in self.results.values())
+        return {
+            "total": len(self.targets),
+            **{state: states.get(state, 0) for state in ("upgraded", "current", "failed", "skipped")},
+            "failure_rate": round(self._failure_rate()[0], 3),
+            "bytes_sent": sum(r.bytes_sent for r in self.results.values()),
+            "halted": self.halt_reason,
+        }
+
+    # --- İÇ METOTLAR ---
+
+    @staticmethod
+    def _interleave_sites(targets: List[RolloutTarget]) -> List[RolloutTarget]:
+        by_site: "OrderedDict[str, deque]" = OrderedDict()
+        for target in targets:
+            by_site.setdefault(target.site, deque()).append(target)
+        ordered = []
+        while by_site:
+            for site in list(by_site):
+                ordered.append(by_site[site].popleft())
+                if not by_site[site]:
+                    del by_site[site]
+        return ordered
+
+    def _bucket(self, site: str) -> Optional[TokenBucket]:
+        rate = self.site_bandwidth.get(site, self.default_site_bandwidth)
+        if not rate:
+            return None
+        with self._cond:
+            if site not in self._buckets:
+                # Burst: ~1 sn'lik veri, 8 KB'lık okumalar kısa aralıklarla akar
+                self._buckets[site] = TokenBucket(rate)
+            return self._buckets[site]
+
+    def _failure_rate(self):
+        finished = [r for r in self.results.values() if r.state in ("upgraded", "failed")]
+        failed = sum(1 for r in finished if r.state == "failed")
+        return (failed / len(finished) if finished else 0.0), len(finished)
+
+    def _skip(self, targets: List[RolloutTarget], index: Dict[int, int]):
+        for target in targets:
+            self.results[index[id(target)]] = FirmwareUpgradeResult(
+                name=target.name, site=target.site, state="skipped", error=self.halt_reason)
+
+    def _run_wave(self, wave: List[RolloutTarget], index: Dict[int, int]):
+        pending = deque(wave)
+        active_sites = Counter()
+        in_flight = 0
+
+        def done(target: RolloutTarget, result: FirmwareUpgradeResult):
+            nonlocal in_flight
+            with self._cond:
+                in_flight -= 1
+                active_sites[target.site] -= 1
+                self.results[index[id(target)]] = result
+
+                rate, samples = self._failure_rate()
+                if samples >= self.min_samples and rate > self.max_failure_rate and self.halt_reason is None:
+                    self.halt_reason = f"Hata oranı %{rate * 100:.1f} ({samples} cihaz) eşiği aştı."
+                    print(f"🛑 Rollout durduruldu: {self.halt_reason}")
+                self._cond.notify_all()
+            if self.on_result:
+                self.on_result(result)
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="hik-fw") as executor:
+            with self._cond:
+                while pending or in_flight:
+                    if self.halted and pending:
+                        self._skip(pending, index)
+                        pending.clear()
+                        continue
+
+                    if in_flight < self.max_concurrency:
+                        # Sahası dolu olmayan ilk cihaz
+                        target = next((t for t in pending if active_sites[t.site] < self.per_site_concurrency), None)
+                        if target is not None:
+                            pending.remove(target)
+                            in_flight += 1
+                            active_sites[target.site] += 1
+                            executor.submit(self._upgrade_one, target, done)
+                            continue
+
+                    self._cond.wait()
+
+    def _upgrade_one(self, target: RolloutTarget, done: Callable):
+        bucket = self._bucket(target.site)
+        try:
+            result = target.client.system.upgrade_firmware(
+                self.firmware_path, expected_version=self.expected_version,
+                throttle=bucket.consume if bucket else None, **self.upgrade_options)
+        except Exception as e:
+            result = FirmwareUpgradeResult(name=target.name, state="failed", error=str(e))
+        result.name = target.name
+        result.site = target.site
+        done(target, result)
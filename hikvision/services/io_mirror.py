@@ -0,0 +1,203 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..client import HikvisionClient
+from ..models.event import EventAlert
+from ..models.io import IOPortChange, IOPortStatus
+
+PortKey = Tuple[str, int] # (ioPortType, ioPortID)
+
+
+class IOStateMirror:
+    """
+    Cihazın IO port durumlarının bellekteki kopyası.
+
+    - bootstrap(): Tek bir get_port_status çağrısı ile tablo doldurulur.
+    - Alarm akışındaki IO olayları (eventType=IO, inputIOPortID) tabloyu günceller;
+      polling gerekmez, okumalar yerelden (mikrosaniye) yapılır.
+    - set_output() ile tetiklenen çıkışlar cevap gelince tabloya yazılır.
+    - reconcile(): Kaçırılan olaylara karşı tablo cihazla periyodik karşılaştırılır,
+      farklar düzeltilir (stats["drift_corrections"]).
+    - Her değişiklik abonelere IOPortChange olarak bildirilir.
+
+    Kullanım:
+        mirror = IOStateMirror(cam, reconcile_interval=60)
+        mirror.subscribe(lambda change: print(change))
+        mirror.start()
+        if mirror.is_active(1): ...
+    """
+
+    def __init__(self, client: HikvisionClient, reconcile_interval: float = 60.0, reconnect_delay: float = 5.0,
+                 clock: Callable[[], float] = time.time):
+        """
+        :param reconcile_interval: Cihazla karşılaştırma aralığı (sn). 0 ise periyodik düzeltme yapılmaz.
+        :param reconnect_delay: Alarm akışı koparsa yeniden bağlanmadan önce beklenecek süre (sn).
+        """
+        self.client = client
+        self.reconcile_interval = reconcile_interval
+        self.reconnect_delay = reconnect_delay
+        self.clock = clock
+
+        self._states: Dict[PortKey, str] = {}
+        self._updated: Dict[PortKey, float] = {}
+        self._subscribers: List[Callable[[IOPortChange], None]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+        self.ready = False
+        self.last_reconcile: Optional[float] = None
+        self.stats = {"events": 0, "changes": 0, "reconciles": 0, "drift_corrections": 0, "reconnects": 0}
+
+    # --- OKUMA (yerel) ---
+
+    def state(self, port_id: int, port_type: str = "input") -> Optional[str]:
+        """Portun bilinen durumu (active/inactive) veya port bilinmiyorsa None."""
+        return self._states.get((port_type, int(port_id)))
+
+    def is_active(self, port_id: int, port_type: str = "input") -> bool:
+        return self.state(port_id, port_type) == "active"
+
+    def ports(self) -> List[IOPortStatus]:
+        """Tüm portların anlık kopyası (get_port_status ile aynı biçimde)."""
+        with self._lock:
+            items = sorted(self._states.items())
+        return [IOPortStatus(ioPortID=port_id, ioPortType=port_type, ioState=state)
+                for (port_type, port_id), state in items]
+
+    # --- ABONELİK ---
+
+    def subscribe(self, callback: Callable[[IOPortChange], None]) -> Callable[[], None]:
+        """Değişiklik bildirimlerine abone olur. Aboneliği iptal eden fonksiyon döner."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    # --- GÜNCELLEME ---
+
+    def bootstrap(self) -> List[IOPortChange]:
+        """Tabloyu cihazdan tek seferde doldurur."""
+        changes = self._load(self.client.io.get_port_status(), "bootstrap", since=None)
+        self.ready = True
+        return changes
+
+    def apply(self, alert: EventAlert) -> Optional[IOPortChange]:
+        """Alarm akışından gelen bildirimi uygular. IO olayı değilse veya durum değişmediyse None."""
+        if str(alert.event_type).lower() != "io" or alert.io_port_id is None:
+            return None
+        try:
+            port_id = int(alert.io_port_id)
+        except ValueError:
+            return None
+
+        self.stats["events"] += 1
+        state = "active" if str(alert.event_state).lower() == "active" else "inactive"
+        return self._set(("input", port_id), state, "event")
+
+    def set_output(self, port_id: int, state: str = "high") -> bool:
+        """trigger_output ile çıkışı değiştirir, cihaz onaylarsa tabloyu günceller."""
+        ok = self.client.io.trigger_output(port_id, state)
+        if ok:
+            self._set(("output", int(port_id)), "active" if state == "high" else "inactive", "command")
+        return ok
+
+    def reconcile(self) -> List[IOPortChange]:
+        """
+        Tabloyu cihazın gerçek durumu ile karşılaştırıp farkları düzeltir.
+        İstek sürerken olay ile güncellenen portlara dokunulmaz (olay daha yenidir).
+        """
+        started = self.clock()
+        changes = self._load(self.client.io.get_port_status(), "reconcile", since=started)
+        self.stats["reconciles"] += 1
+        self.stats["drift_corrections"] += len(changes)
+        self.last_reconcile = self.clock()
+        return changes
+
+    # --- ARKA PLAN ---
+
+    def start(self) -> "IOStateMirror":
+        """bootstrap yapar; alarm akışı dinleyicisini ve periyodik düzeltmeyi arka planda başlatır."""
+        if not self.ready:
+            self.bootstrap()
+        self._stop.clear()
+        device = self.client.session.config.ip
+        self._threads = [threading.Thread(target=self._listen, name=f"hik-io-{device}", daemon=True)]
+        if self.reconcile_interval > 0:
+            self._threads.append(threading.Thread(target=self._reconcile_loop, name=f"hik-io-sync-{device}", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        """Arka plan işlerini durdurur (akış thread'i bir sonraki bildirimde çıkar)."""
+        self._stop.set()
+
+    def _listen(self):
+        while not self._stop.is_set():
+            for alert in self.client.event.listen_alert_stream():
+                if self._stop.is_set():
+                    return
+                self.apply(alert)
+
+            # Akış koptu: aradaki olaylar kaçmış olabilir
+            if self._stop.wait(self.reconnect_delay):
+                return
+            self.stats["reconnects"] += 1
+            try:
+                self.reconcile()
+            except Exception as e:
+                print(f"   ⚠️ IO durum düzeltme hatası: {e}")
+
+    def _reconcile_loop(self):
+        while not self._stop.wait(self.reconcile_interval):
+            try:
+                self.reconcile()
+            except Exception as e:
+                print(f"   ⚠️ IO durum düzeltme hatası: {e}")
+
+    # --- İÇ METOTLAR ---
+
+    def _load(self, ports: List[IOPortStatus], source: str, since: Optional[float]) -> List[IOPortChange]:
+        changes = []
+        for port in ports:
+            key = (port.port_type, port.port_id)
+            if since is not None and self._updated.get(key, 0.0) > since:
+                continue
+            change = self._set(key, port.state, source, notify=False)
+            if change is not None:
+                changes.append(change)
+        self._notify(changes)
+        return changes
+
+    def _set(self, key: PortKey, state: str, source: str, notify: bool = True) -> Optional[IOPortChange]:
+        now = self.clock()
+        with self._lock:
+            old = self._states.get(key)
+            self._updated[key] = now
+            if old == state:
+                return None
+            self._states[key] = state
+            self.stats["changes"] += 1
+
+        change = IOPortChange(port_id=key[1], port_type=key[0], old_state=old, new_state=state, source=source, at=now)
+        if notify:
+            self._notify([change])
+        return change
+
+    def _notify(self, changes: List[IOPortChange]):
+        if not changes:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for change in changes:
+            for callback in subscribers:
+                try:
+                    callback(change)
+                except Exception as e:
+                    print(f"   ⚠️ IO abone hatası: {e}")
@@ -0,0 +1,397 @@
+import atexit
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..client import HikvisionClient
+
+PortKey = Tuple[str, int] # ("ip:port", çıkış portu)
+
+
+class Timer:
+    __slots__ = ("tick", "deadline", "callback", "cancelled")
+
+    def __init__(self, tick: int, deadline: float, callback: Callable[[], None]):
+        self.tick = tick
+        self.deadline = deadline
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerWheel:
+    """
+    Hash'li zamanlayıcı çarkı: binlerce zamanlayıcı tek thread'de O(1) eklenir.
+    Zaman tick'lere bölünür; her zamanlayıcı (tick % slots) yuvasına düşer.
+    advance(now) ile o ana kadar zamanı gelen zamanlayıcılar toplanır.
+    Thread-safe değildir, kilit çağıran taraftadır.
+    """
+
+    def __init__(self, tick: float = 0.005, slots: int = 1024, now: float = 0.0):
+        self.tick = tick
+        self._slots: List[List[Timer]] = [[] for _ in range(slots)]
+        self._cursor = int(now / tick)
+        self._count = 0
+
+    def schedule(self, deadline: float, callback: Callable[[], None]) -> Timer:
+        # Deadline'dan önce ateşlenmesin diye yukarı yuvarlanır
+        tick = max(math.ceil(deadline / self.tick), self._cursor + 1)
+        timer = Timer(tick, deadline, callback)
+        self._slots[tick % len(self._slots)].append(timer)
+        self._count += 1
+        return timer
+
+    def advance(self, now: float) -> List[Timer]:
+        """now'a kadar zamanı gelen (iptal edilmemiş) zamanlayıcıları deadline sırasıyla döner."""
+        target = int(now / self.tick)
+        due = []
+        steps = min(target - self._cursor, len(self._slots))
+        for k in range(self._cursor + 1, self._cursor + 1 + max(0, steps)):
+            slot = self._slots[k % len(self._slots)]
+            if not slot:
+                continue
+            keep = []
+            for timer in slot:
+                if timer.tick <= target:
+                    self._count -= 1
+                    if not timer.cancelled:
+                        due.append(timer)
+                else:
+                    keep.append(timer) # Sonraki turlara ait
+            slot[:] = keep
+        self._cursor = max(self._cursor, target)
+        due.sort(key=lambda t: t.deadline)
+        return due
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class OutputStep:
+    """Sıralı çıkış adımı: sıra başlangıcından at_ms sonra port state'e (high/low) çekilir."""
+
+    def __init__(self, client: HikvisionClient, port_id: int, state: str, at_ms: float = 0):
+        if state not in ("high", "low"):
+            raise ValueError(f"Geçersiz çıkış durumu: {state} (high veya low olmalı)")
+        self.client = client
+        self.port_id = port_id
+        self.state = state
+        self.at_ms = at_ms
+
+
+class OutputSequence:
+    """pulse() / sequence() tarafından dönen takip nesnesi."""
+
+    def __init__(self, scheduler: "OutputScheduler", total: int):
+        self._scheduler = scheduler
+        self._timers: List[Timer] = []
+        self._remaining = total
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self.touched: Dict[PortKey, HikvisionClient] = {} # high'a çekilen portlar (iptalde low yapılır)
+        self.results: List[dict] = []
+        self.cancelled = False
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def ok(self) -> bool:
+        return self.done and not self.cancelled and all(r["ok"] for r in self.results)
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._done.wait(timeout)
+
+    def cancel(self):
+        """Bekleyen adımları iptal eder; bu sıranın high yaptığı portlar low'a çekilir."""
+        with self._lock:
+            if self.done:
+                return
+            self.cancelled = True
+            for timer in self._timers:
+                timer.cancel()
+            touched = dict(self.touched)
+        for (_, port_id), client in touched.items():
+            self._scheduler.set(client, port_id, "low")
+        self._done.set()
+
+    def _record(self, result: dict):
+        with self._lock:
+            self.results.append(result)
+            self._remaining -= 1
+            if self._remaining <= 0:
+                self._done.set()
+
+
+class _Command:
+    __slots__ = ("key", "client", "port_id", "state", "deadline", "attempt", "sequence")
+
+    def __init__(self, key, client, port_id, state, deadline, attempt=0, sequence=None):
+        self.key = key
+        self.client = client
+        self.port_id = port_id
+        self.state = state
+        self.deadline = deadline
+        self.attempt = attempt
+        self.sequence = sequence
+
+
+class OutputScheduler:
+    """
+    Zaman hassasiyetli IO çıkış zamanlayıcısı (kapı, siren, bariyer röleleri).
+
+    - Tek zamanlayıcı thread'i TimerWheel üzerinde binlerce bekleyen komutu tutar,
+      zamanı gelen PUT'lar iş havuzuna (HTTP bloklayıcı) verilir.
+    - Aynı port için komutlar sırayla gönderilir: kısa bir pulse'ın low'u high'ı geçemez.
+    - low komutu garanti altındadır: başarısız olursa üstel beklemeyle low_retries kez tekrar denenir.
+      high'a çekilen her port close() ve normal süreç çıkışında (atexit) low'a çekilir.
+      (SIGKILL / elektrik kesintisine karşı cihaz tarafında çıkış pulse süresi de tanımlanmalıdır.)
+    - Her komut için planlanan zaman ile gönderimin başladığı an arasındaki sapma ölçülür (timing()).
+
+    Kullanım:
+        scheduler = OutputScheduler()
+        scheduler.pulse(cam, port_id=1, duration_ms=500)
+        scheduler.sequence([OutputStep(cam1, 1, "high", 0), OutputStep(cam2, 1, "high", 200),
+                            OutputStep(cam1, 1, "low", 1000), OutputStep(cam2, 1, "low", 1200)])
+    """
+
+    def __init__(self, tick: float = 0.005, slots: int = 1024, max_workers: int = 32, low_retries: int = 5,
+                 retry_delay: float = 0.2, release_on_exit: bool = True, samples: int = 10000,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        :param tick: Çark çözünürlüğü (sn). Zamanlama sapması yaklaşık bu kadar + ağ gecikmesidir.
+        :param max_workers: Aynı anda gönderilebilecek PUT sayısı (farklı portlar paralel).
+        :param retry_delay: Başarısız low için ilk bekleme (her denemede iki katına çıkar).
+        """
+        self.low_retries = low_retries
+        self.retry_delay = retry_delay
+        self.clock = clock
+
+        self._wheel = TimerWheel(tick, slots, clock())
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hik-io-out")
+        self._queues: Dict[PortKey, Deque[_Command]] = {}
+        self._busy: Set[PortKey] = set()
+        self._high: Dict[PortKey, HikvisionClient] = {}
+        self._errors: Deque[float] = deque(maxlen=samples)
+        self._closed = False
+
+        self.stats = {"sent": 0, "failed": 0, "retries": 0, "low_failures": 0}
+        self._thread = threading.Thread(target=self._run, name="hik-io-timer", daemon=True)
+        self._thread.start()
+        if release_on_exit:
+            atexit.register(self.close)
+
+    # --- GENEL API ---
+
+    def set(self, client: HikvisionClient, port_id: int, state: str, delay_ms: float = 0) -> OutputSequence:
+        """Tek komut (delay_ms sonra)."""
+        return self.sequence([OutputStep(client, port_id, state, 0)], delay_ms)
+
+    def pulse(self, client: HikvisionClient, port_id: int, duration_ms: float, delay_ms: float = 0) -> OutputSequence:
+        """Portu duration_ms boyunca high tutar, sonra low yapar."""
+        return self.sequence([OutputStep(client, port_id, "high", 0),
+                              OutputStep(client, port_id, "low", duration_ms)], delay_ms)
+
+    def sequence(self, steps: Iterable[OutputStep], delay_ms: float = 0) -> OutputSequence:
+        """Adımları sıra başlangıcına göre (at_ms) zamanlar. Tüm zamanlar tek referans noktasından hesaplanır."""
+        steps = list(steps)
+        handle = OutputSequence(self, len(steps))
+        start = self.clock() + delay_ms / 1000.0
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("OutputScheduler kapatıldı.")
+            for step in steps:
+                command = _Command(_port_key(step.client, step.port_id), step.client, step.port_id,
+                                   step.state, start + step.at_ms / 1000.0, sequence=handle)
+                handle._timers.append(self._wheel.schedule(command.deadline, lambda c=command: self._enqueue(c)))
+            self._cond.notify()
+        if not steps:
+            handle._done.set()
+        return handle
+
+    def release_all(self, timeout: float = 10.0) -> int:
+        """high durumdaki tüm portları hemen low'a çeker, gönderimlerin bitmesini bekler."""
+        with self._cond:
+            ports = list(self._high.items())
+        handles = [self.set(client, port_id, "low") for (_, port_id), client in ports]
+        deadline = time.monotonic() + timeout
+        for handle in handles:
+            handle.wait(max(0.0, deadline - time.monotonic()))
+        return len(handles)
+
+    def close(self, release: bool = True):
+        """
+        Zamanlayıcıyı durdurur. release=True ise high kalan portlar low'a çekilir.
+        low'lar bu thread'de doğrudan gönderilir: atexit sırasında iş havuzu Python tarafından
+        çoktan kapatılmıştır, çark/havuz üzerinden gönderim mümkün değildir.
+        """
+        if self._closed:
+            return
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=1.0)
+        self._executor.shutdown(wait=True) # Uçuştaki gönderimler bitsin: low onlardan sonra gitmeli
+
+        with self._cond:
+            ports = list(self._high.items()) if release else []
+            leftovers = [command for queue in self._queues.values() for command in queue]
+            self._queues.clear()
+            self._busy.clear()
+        for key, client in ports:
+            if self._release_now(client, key[1]):
+                with self._cond:
+                    self._high.pop(key, None)
+        for command in leftovers:
+            if command.sequence is not None:
+                command.sequence._record({"device": command.key[0], "port_id": command.port_id,
+                                          "state": command.state, "ok": False, "attempts": command.attempt,
+                                          "error": "Zamanlayıcı kapatıldı.", "latency": 0.0})
+        atexit.unregister(self.close)
+
+    def _release_now(self, client: HikvisionClient, port_id: int) -> bool:
+        """Çıkışı çağıran thread'de low'a çeker (aynı üstel bekleme ile low_retries kez tekrar)."""
+        error = None
+        for attempt in range(self.low_retries + 1):
+            if attempt:
+                time.sleep(self.retry_delay * 2 ** (attempt - 1))
+            try:
+                if client.io.trigger_output(port_id, "low"):
+                    self.stats["sent"] += 1
+                    return True
+                error = "Cihaz komutu reddetti."
+            except Exception as e:
+                error = str(e)
+            self.stats["failed"] += 1
+        self.stats["low_failures"] += 1
+        print(f"   ❌ Çıkış low'a çekilemedi ({_port_key(client, port_id)[0]} port {port_id}): {error}")
+        return False
+
+    @property
+    def high_ports(self) -> List[PortKey]:
+        with self._cond:
+            return list(self._high)
+
+    @property
+    def pending(self) -> int:
+        return len(self._wheel)
+
+    def timing(self) -> dict:
+        """Planlanan zamana göre gönderim sapması (ms): ortalama, p50, p99, en büyük."""
+        errors = sorted(self._errors)
+        if not errors:
+            return {"count": 0}
+        pick = lambda q: errors[min(len(errors) - 1, int(q * len(errors)))] * 1000
+        return {
+            "count": len(errors),
+            "mean_ms": round(sum(errors) / len(errors) * 1000, 3),
+            "p50_ms": round(pick(0.5), 3),
+            "p99_ms": round(pick(0.99), 3),
+            "max_ms": round(errors[-1] * 1000, 3),
+        }
+
+    # --- ZAMANLAYICI THREAD'İ ---
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+                if len(self._wheel):
+                    now = self.clock()
+                    next_tick = (int(now / self._wheel.tick) + 1) * self._wheel.tick
+                    self._cond.wait(max(0.0, next_tick - now))
+                else:
+                    self._cond.wait() # Boşta: yeni zamanlayıcı gelene kadar uyu
+                due = self._wheel.advance(self.clock())
+            for timer in due:
+                try:
+                    timer.callback()
+                except Exception as e: # Tek zamanlayıcı hatası thread'i öldürmemeli
+                    print(f"   ⚠️ Zamanlanmış çıkış komutu çalıştırılamadı: {e}")
+
+    # --- GÖNDERİM ---
+
+    def _enqueue(self, command: _Command):
+        """Komutu portun sırasına ekler; port boştaysa gönderim işini başlatır."""
+        with self._cond:
+            if command.state == "high":
+                self._high[command.key] = command.client # Göndermeden önce: çıkışta mutlaka low yapılsın
+                if command.sequence is not None:
+                    command.sequence.touched[command.key] = command.client
+            self._queues.setdefault(command.key, deque()).append(command)
+            if command.key in self._busy:
+                return
+            self._busy.add(command.key)
+        self._start_drain(command.key)
+
+    def _start_drain(self, key: PortKey):
+        try:
+            self._executor.submit(self._drain, key)
+        except RuntimeError: # Havuz kapatıldı: port meşgul işaretli kalmasın
+            with self._cond:
+                self._busy.discard(key)
+            raise
+
+    def _drain(self, key: PortKey):
+        while True:
+            with self._cond:
+                queue = self._queues.get(key)
+                if not queue:
+                    self._busy.discard(key)
+                    self._queues.pop(key, None)
+                    return
+                command = queue.popleft()
+            if not self._execute(command):
+                return # Tekrar bekleniyor: port meşgul kalır, sıra _start_drain ile devam eder
+
+    def _execute(self, command: _Command) -> bool:
+        """Komutu gönderir. Tekrar denemek üzere sıraya geri kondu ise False."""
+        started = self.clock()
+        if command.attempt == 0:
+            self._errors.append(max(0.0, started - command.deadline))
+        try:
+            ok = command.client.io.trigger_output(command.port_id, command.state)
+            error = None if ok else "Cihaz komutu reddetti."
+        except Exception as e:
+            ok, error = False, str(e)
+
+        with self._cond:
+            self.stats["sent" if ok else "failed"] += 1
+            if ok and command.state == "low":
+                self._high.pop(command.key, None)
+
+        if not ok and command.state == "low" and command.attempt < self.low_retries:
+            # low garanti: üstel beklemeyle tekrar dene (sıra sonucu son denemeye bırakır).
+            # Komut portun sırasının başına döner ve port meşgul kalır: bu arada gelen
+            # komutlar (örn. yeni pulse'ın high'ı) eski low'un önüne geçip onu kısaltamaz.
+            command.attempt += 1
+            command.deadline = self.clock() + self.retry_delay * 2 ** (command.attempt - 1)
+            with self._cond:
+                self.stats["retries"] += 1
+                if not self._closed:
+                    self._queues.setdefault(command.key, deque()).appendleft(command)
+                    self._wheel.schedule(command.deadline, lambda: self._start_drain(command.key))
+                    self._cond.notify()
+                    return False
+        if not ok and command.state == "low":
+            self.stats["low_failures"] += 1
+            print(f"   ❌ Çıkış low'a çekilemedi ({command.key[0]} port {command.port_id}): {error}")
+
+        if command.sequence is not None:
+            command.sequence._record({"device": command.key[0], "port_id": command.port_id, "state": command.state,
+                                      "ok": ok, "attempts": command.attempt + 1, "error": error,
+                                      "latency": self.clock() - started})
+        return True
+
+
+def _port_key(client: HikvisionClient, port_id: int) -> PortKey:
+    config = client.session.config
+    return (f"{config.ip}:{config.port}", int(port_id))
@@ -0,0 +1,217 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from ..client import HikvisionClient
+
+FeedKey = Tuple[str, int] # ("ip:port", kanal)
+_UNKNOWN = object()
+
+
+class _Feed:
+    __slots__ = ("client", "channel", "pending", "sending", "sent", "next_allowed", "token", "in_flight",
+                 "failures", "invalid")
+
+    def __init__(self, client: HikvisionClient, channel: int):
+        self.client = client
+        self.channel = channel
+        self.pending: Dict[int, Optional[str]] = {} # Gönderilmeyi bekleyen son değerler
+        self.sending: Dict[int, Optional[str]] = {} # Şu an gönderilen değerler
+        self.sent: Dict[int, Optional[str]] = {}    # Cihazda olduğu bilinen değerler
+        self.next_allowed = 0.0
+        self.token = None # Heap'teki geçerli kaydın işareti (None: sırada değil)
+        self.in_flight = False
+        self.failures = 0 # Art arda başarısız gönderim (bekleme süresi buna göre katlanır)
+        self.invalid: Set[int] = set() # Cihazda olmayan satırlar: güncellemeleri yok sayılır
+
+    def expected(self, line_id: int):
+        """Bekleyen değişiklik olmasa satırın cihazda görüneceği değer."""
+        if line_id in self.sending:
+            return self.sending[line_id]
+        return self.sent.get(line_id, _UNKNOWN)
+
+
+class OverlayFeeder:
+    """
+    Canlı verileri (sıcaklık, sayaç, saat ...) OSD satırlarına besler.
+
+    - Kamera/kanal başına en fazla max_rate güncelleme/sn gönderilir; arada gelen değerler
+      birleştirilir (sadece son değer gider).
+    - Cihazda zaten görünen metin tekrar gönderilmez.
+    - Aynı anda değişen satırlar tek PUT ile gönderilir (ImageAPI.set_text_overlays, önbellekli doküman).
+    - Gönderim başarısız olursa değerler tekrar denenir; kamera başına bekleme her hatada
+      ikiye katlanır (en fazla max_backoff). Cihazda olmayan satır ID'leri atılır, tekrar denenmez.
+
+    Kullanım:
+        feeder = OverlayFeeder(max_rate=1.0)
+        feeder.update(cam, 1, f"Sıcaklık: {temp:.1f} C")
+        feeder.update_many(cam, {2: f"Giriş: {count}", 3: now})
+    """
+
+    def __init__(self, max_rate: float = 1.0, max_workers: int = 16, channel: int = 1,
+                 on_error: Callable[[HikvisionClient, int, Exception], None] = None,
+                 max_backoff: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        """
+        :param max_rate: Kamera/kanal başına saniyedeki en fazla güncelleme.
+        :param channel: update çağrılarında kanal verilmezse kullanılacak video kanalı.
+        :param max_backoff: Başarısız gönderimden sonra tekrar denemeye kadar en uzun bekleme (sn).
+        """
+        self.interval = 1.0 / max_rate
+        self.max_backoff = max_backoff
+        self.channel = channel
+        self.on_error = on_error
+        self.clock = clock
+
+        self._feeds: Dict[FeedKey, _Feed] = {}
+        self._heap = []
+        self._tokens = itertools.count()
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hik-osd")
+        self._closed = False
+        self.stats = {"updates": 0, "coalesced": 0, "unchanged": 0, "puts": 0, "skipped": 0, "failed": 0,
+                      "dropped": 0}
+
+        self._thread = threading.Thread(target=self._run, name="hik-osd-timer", daemon=True)
+        self._thread.start()
+
+    # --- GENEL API ---
+
+    def update(self, client: HikvisionClient, line_id: int, text: Optional[str], channel: int = None):
+        """Tek satırın yeni değeri (None: satırı kapat)."""
+        self.update_many(client, {line_id: text}, channel)
+
+    def update_many(self, client: HikvisionClient, lines: Dict[int, Optional[str]], channel: int = None):
+        channel = channel if channel is not None else self.channel
+        config = client.session.config
+        key = (f"{config.ip}:{config.port}", channel)
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("OverlayFeeder kapatıldı.")
+            feed = self._feeds.get(key)
+            if feed is None:
+                feed = self._feeds[key] = _Feed(client, channel)
+
+            for line_id, text in lines.items():
+                self.stats["updates"] += 1
+                if line_id in feed.invalid:
+                    self.stats["dropped"] += 1
+                    continue
+                if line_id in feed.pending:
+                    self.stats["coalesced"] += 1
+                if feed.expected(line_id) == text:
+                    # Cihazdaki (veya gönderilmekte olan) metinle aynı: bekleyen ara değer de iptal
+                    feed.pending.pop(line_id, None)
+                    self.stats["unchanged"] += 1
+                    continue
+                feed.pending[line_id] = text
+
+            self._schedule(key, feed)
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Bekleyen tüm değerleri hız sınırını beklemeden gönderir ve bitmesini bekler."""
+        deadline = self.clock() + timeout
+        with self._cond:
+            for key, feed in self._feeds.items():
+                feed.next_allowed = 0.0
+                if feed.pending and not feed.in_flight:
+                    feed.token = None
+                    self._schedule(key, feed)
+            while any(f.pending or f.in_flight for f in self._feeds.values()):
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(min(remaining, 0.05))
+        return True
+
+    def close(self, flush: bool = True):
+        if flush:
+            self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout=1.0)
+        self._executor.shutdown(wait=True)
+
+    # --- ZAMANLAMA ---
+
+    def _schedule(self, key: FeedKey, feed: _Feed):
+        """Kilit altında çağrılır. Gönderim penceresi gelince feed'i sıraya alır."""
+        if not feed.pending or feed.token is not None or feed.in_flight:
+            return # Gönderim sürüyorsa bitince tekrar zamanlanır
+        feed.token = next(self._tokens)
+        heapq.heappush(self._heap, (max(self.clock(), feed.next_allowed), feed.token, key))
+        self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and (not self._heap or self._heap[0][0] > self.clock()):
+                    self._cond.wait(self._heap[0][0] - self.clock() if self._heap else None)
+                if self._closed:
+                    return
+                _, token, key = heapq.heappop(self._heap)
+                feed = self._feeds[key]
+                if feed.token != token:
+                    continue # flush() tarafından tekrar zamanlandı, eski kayıt
+                feed.token = None
+                lines, feed.pending = feed.pending, {}
+                feed.sending = lines
+                feed.in_flight = True
+                feed.next_allowed = self.clock() + self.interval
+            self._executor.submit(self._send, key, feed, lines)
+
+    def _send(self, key: FeedKey, feed: _Feed, lines: Dict[int, Optional[str]]):
+        error = None
+        invalid: Set[int] = set()
+        try:
+            result = feed.client.image.write_text_overlays(lines, feed.channel)
+            ok = result is not False
+        except ValueError as e: # Satır yok veya doküman okunamadı
+            result, ok, error = False, False, e
+            invalid = self._invalid_lines(feed, lines)
+        except Exception as e:
+            result, ok, error = False, False, e
+
+        with self._cond:
+            feed.in_flight = False
+            feed.sending = {}
+            if ok:
+                self.stats["puts" if result else "skipped"] += 1
+                feed.sent.update(lines)
+                feed.failures = 0
+            elif invalid:
+                # Geçersiz satırlar atılır, diğerleri denenmedi: bekleme cezası olmadan tekrar sıraya
+                self.stats["dropped"] += len(invalid)
+                feed.invalid |= invalid
+                for line_id, text in lines.items():
+                    if line_id not in invalid:
+                        feed.pending.setdefault(line_id, text)
+                    else:
+                        feed.pending.pop(line_id, None)
+            else:
+                self.stats["failed"] += 1
+                feed.failures += 1
+                feed.next_allowed = self.clock() + min(self.max_backoff, self.interval * 2 ** feed.failures)
+                # Bu arada gelen yeni değerler daha günceldir, üzerine yazılmaz
+                for line_id, text in lines.items():
+                    feed.pending.setdefault(line_id, text)
+            self._schedule(key, feed)
+            self._cond.notify_all()
+
+        if invalid:
+            print(f"   ⚠️ OSD satırları {sorted(invalid)} {key[0]} kanal {feed.channel} cihazında yok, güncellemeleri atılacak.")
+        if not ok and self.on_error:
+            self.on_error(feed.client, feed.channel, error or RuntimeError("OSD güncellemesi başarısız."))
+
+    @staticmethod
+    def _invalid_lines(feed: _Feed, lines: Dict[int, Optional[str]]) -> Set[int]:
+        """Cihazda olmayan satırlar. Doküman okunamıyorsa (geçici hata) boş küme."""
+        try:
+            available = feed.client.image.get_text_overlays(feed.channel)
+        except Exception:
+            return set()
+        return {line_id for line_id in lines if int(line_id) not in available}
@@ -0,0 +1,158 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, Optional
+
+from ..api.ptz import PTZAPI
+from ..models.ptz import PTZArrival, PTZPosition, PTZRegion
+
+
+class PTZTarget:
+    """
+    Grup hareketindeki tek bir kamera/kanal hedefi.
+    preset_id, region (position3D, 0-255) veya position (mutlak) verilerek tanımlanır.
+    expected: Hedefin bilinen konumu (örn. PresetCatalog'dan). Verilirse varış tolerans ile
+              kontrol edilir, verilmezse kamera durunca varmış sayılır.
+    """
+
+    def __init__(self, ptz: PTZAPI, channel: int = None, preset_id: int = None, region: PTZRegion = None,
+                 position: PTZPosition = None, expected: PTZPosition = None, name: str = None):
+        if sum(x is not None for x in (preset_id, region, position)) != 1:
+            raise ValueError("preset_id, region veya position'dan tam olarak biri verilmeli.")
+        self.ptz = ptz
+        self.channel = ptz._channel(channel)
+        self.preset_id = preset_id
+        self.region = region
+        self.position = position
+        self.expected = expected if expected is not None else position
+        self.name = name or f"{ptz._session.config.ip}/{self.channel}"
+
+    def dispatch(self) -> bool:
+        if self.preset_id is not None:
+            return self.ptz.goto_preset(self.preset_id, channel=self.channel)
+        if self.region is not None:
+            return self.ptz.zoom_to_region(self.region, channel=self.channel)
+        return self.ptz.set_absolute_position(self.position, channel=self.channel)
+
+
+class PTZGroupMover:
+    """
+    Alarm anında bir grup PTZ kamerayı paralel olarak hedeflerine gönderir ve
+    her birinin varışını status okuyarak takip eder.
+
+    Poll aralığı kamera başına uyarlanır:
+    - Hedef konum ve hız biliniyorsa tahmini varış süresinin yarısı kadar beklenir.
+    - Kamera durmuş görünüyorsa teyit için en kısa aralıkla tekrar okunur.
+    - Hareket yoksa ve hedef bilinmiyorsa aralık yavaşça büyür (cihazı boğmamak için).
+
+    Kullanım:
+        mover = PTZGroupMover()
+        results = mover.move([
+            PTZTarget(cam1.ptz, preset_id=3, expected=catalog1.positions[3]),
+            PTZTarget(cam2.ptz, channel=2, preset_id=7),
+        ], deadline=10)
+        all(r.settled for r in results)
+    """
+
+    def __init__(self, max_workers: int = 32, min_interval: float = 0.1, max_interval: float = 1.0,
+                 tolerance: float = 1.0, stable_reads: int = 2, start_grace: float = 0.5):
+        """
+        :param tolerance: Hedefe varış toleransı (derece).
+        :param stable_reads: Hedef bilinmiyorsa durmuş sayılmak için art arda aynı okuma sayısı.
+        :param start_grace: Komuttan sonra kamera henüz hareket etmemişse bu süre dolmadan "durdu" denmez.
+        """
+        self.max_workers = max_workers
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.tolerance = tolerance
+        self.stable_reads = stable_reads
+        self.start_grace = start_grace
+
+    def move(self, targets: List[PTZTarget], deadline: float = 15.0) -> List[PTZArrival]:
+        """
+        Tüm hedefleri paralel gönderir. Hepsi durunca veya deadline (sn) dolunca döner.
+        Sonuçlar targets ile aynı sıradadır.
+        """
+        started = time.monotonic()
+        end = started + deadline
+        cancel = threading.Event()
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, max(1, len(targets))),
+                                thread_name_prefix="hik-ptz-group") as executor:
+            futures = [executor.submit(self._track, t, started, end, cancel) for t in targets]
+            wait(futures, timeout=max(0.0, end - time.monotonic()) + self.max_interval)
+            cancel.set()
+
+        return [f.result() for f in futures]
+
+    def _track(self, target: PTZTarget, started: float, end: float, cancel: threading.Event) -> PTZArrival:
+        result = PTZArrival(name=target.name, channel=target.channel, state="timeout")
+
+        try:
+            if not target.dispatch():
+                result.state = "failed"
+                result.error = "Komut reddedildi"
+                return result
+        except Exception as e:
+            result.state = "failed"
+            result.error = str(e)
+            return result
+        dispatched = time.monotonic()
+        result.dispatched_at = dispatched - started
+
+        interval = self.min_interval
+        previous: Optional[PTZPosition] = None
+        previous_at = dispatched
+        stable = 0
+        moved = False
+
+        while not cancel.is_set() and time.monotonic() < end:
+            try:
+                position = target.ptz.get_status(target.channel).position
+            except Exception as e:
+                result.error = str(e)
+                position = None
+            now = time.monotonic()
+            result.polls += 1
+
+            if position is not None:
+                result.position = position
+
+                # 1. Hedef biliniyor ve tolerans içindeyse vardı
+                remaining = position.distance_to(target.expected) if target.expected is not None else None
+                if remaining is not None and remaining <= self.tolerance:
+                    result.state = "arrived"
+                    result.settled_at = now - started
+                    return result
+
+                # 2. Hareket takibi
+                step = None
+                if previous is not None:
+                    step = max(position.distance_to(previous), abs(position.zoom - previous.zoom))
+                    if step <= 0.05:
+                        stable += 1
+                    else:
+                        stable = 0
+                        moved = True
+
+                if stable >= max(1, self.stable_reads - 1):
+                    if moved or now - dispatched >= self.start_grace:
+                        result.state = "settled" if target.expected is not None else "arrived"
+                        result.settled_at = now - started
+                        return result
+
+                # 3. Bir sonraki okuma zamanı
+                if stable:
+                    interval = self.min_interval
+                elif step and remaining is not None:
+                    speed = step / max(now - previous_at, 1e-3)
+                    interval = (remaining / speed) / 2 if speed > 0 else interval
+                else:
+                    interval = interval * 1.5
+                interval = min(self.max_interval, max(self.min_interval, interval))
+
+                previous, previous_at = position, now
+
+            cancel.wait(min(interval, max(0.0, end - time.monotonic())))
+
+        return result
@@ -0,0 +1,188 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from ..api.ptz import PTZAPI
+from ..models.ptz import PTZCommandMetric, PTZMoveCommand
+
+
+class _Command:
+    __slots__ = ("kind", "vector", "duration_ms", "enqueued_at")
+
+    def __init__(self, kind: str, vector: PTZMoveCommand, duration_ms: int = None):
+        self.kind = kind
+        self.vector = vector
+        self.duration_ms = duration_ms
+        self.enqueued_at = time.monotonic()
+
+
+class PTZCommandPipeline:
+    """
+    Tek kamera (kanal) için "son komut kazanır" PTZ pipeline'ı.
+
+    Joystick saniyede 30-60 güncelleme gönderir; her biri için bloklayan PUT atmak
+    komutların birikmesine ve kameranın hedefi saniyelerce aşmasına neden olur.
+    Bu sınıf:
+    - Aynı anda en fazla bir isteği havada tutar.
+    - Beklerken gelen yeni komut, bekleyenin yerini alır (eskisi hiç gönderilmez).
+    - Son gönderilenle aynı sürekli hareket komutunu tekrar göndermez (kamera zaten hareket ediyor).
+    - Stop komutunu başarılı olana kadar (stop_retries) tekrar dener; araya yeni hareket
+      girerse o komut stop'un yerini alır.
+    - Her gönderilen komut için gecikme ölçümü (PTZCommandMetric) tutar.
+
+    Kullanım:
+        pipeline = PTZCommandPipeline(cam.ptz, channel=1)
+        pipeline.move(pan=40, tilt=-10)   # Bloklamaz
+        pipeline.stop()
+        pipeline.close()                  # Stop'u garanti eder, thread'i kapatır
+    """
+
+    def __init__(self, ptz: PTZAPI, channel: int = None, request_timeout: float = 1.0,
+                 stop_retries: int = 5, retry_delay: float = 0.1, history: int = 1000,
+                 on_metric: Callable[[PTZCommandMetric], None] = None):
+        """
+        :param request_timeout: Tek PUT için zaman aşımı (joystick için kısa tutulmalı).
+        :param history: Saklanacak son ölçüm sayısı.
+        """
+        self.ptz = ptz
+        self.channel = channel
+        self.request_timeout = request_timeout
+        self.stop_retries = stop_retries
+        self.retry_delay = retry_delay
+        self.on_metric = on_metric
+
+        self.metrics: deque = deque(maxlen=history)
+        self.stats = {"submitted": 0, "sent": 0, "superseded": 0, "skipped_duplicate": 0,
+                      "failed": 0, "retries": 0}
+
+        self._cond = threading.Condition()
+        self._pending: Optional[_Command] = None
+        self._in_flight = False
+        self._last_sent: Optional[PTZMoveCommand] = None # Kamerada şu an geçerli olan sürekli hareket
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name=f"hik-ptz-{channel}", daemon=True)
+        self._thread.start()
+
+    # --- GENEL API ---
+
+    def move(self, pan: int = 0, tilt: int = 0, zoom: int = 0):
+        """Sürekli hareket komutu (bloklamaz). Hepsi 0 ise stop ile aynıdır."""
+        vector = PTZMoveCommand(pan=pan, tilt=tilt, zoom=zoom)
+        self._submit(_Command("stop" if vector.is_stop else "continuous", vector))
+
+    def momentary(self, pan: int = 0, tilt: int = 0, zoom: int = 0, duration_ms: int = 200):
+        """Süreli hareket komutu (bloklamaz)."""
+        self._submit(_Command("momentary", PTZMoveCommand(pan=pan, tilt=tilt, zoom=zoom), duration_ms))
+
+    def stop(self):
+        """Hareketi durdurur. Teslim edilene kadar tekrar denenir."""
+        self._submit(_Command("stop", PTZMoveCommand()))
+
+    def flush(self, timeout: float = None) -> bool:
+        """Bekleyen ve havadaki komut bitene kadar bekler."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending is None and not self._in_flight, timeout)
+
+    def close(self, timeout: float = 5.0):
+        """Stop gönderir, teslim edilmesini bekler ve thread'i kapatır."""
+        self.stop()
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def latency_summary(self) -> Dict[str, float]:
+        """Son ölçümlerden p50/p95/max toplam gecikme (ms)."""
+        totals: List[float] = sorted(m.total for m in list(self.metrics) if m.ok)
+        if not totals:
+            return {"count": 0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        pick = lambda q: totals[min(len(totals) - 1, int(q * len(totals)))] * 1000
+        return {"count": len(totals), "p50_ms": round(pick(0.50), 1),
+                "p95_ms": round(pick(0.95), 1), "max_ms": round(totals[-1] * 1000, 1)}
+
+    # --- İÇ METOTLAR ---
+
+    def _submit(self, command: _Command):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("PTZ pipeline kapatıldı.")
+            self.stats["submitted"] += 1
+            if self._pending is not None:
+                self.stats["superseded"] += 1
+            self._pending = command
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or self._closed)
+                if self._pending is None:
+                    return # Kapatıldı ve iş kalmadı
+                command = self._pending
+                self._pending = None
+                self._in_flight = True
+
+            try:
+                self._deliver(command)
+            finally:
+                with self._cond:
+                    self._in_flight = False
+                    self._cond.notify_all()
+
+    def _deliver(self, command: _Command):
+        if command.kind != "momentary" and command.vector == self._last_sent:
+            self.stats["skipped_duplicate"] += 1
+            return
+
+        attempts = 1 + (self.stop_retries if command.kind == "stop" else 0)
+        error = None
+        for attempt in range(attempts):
+            if attempt:
+                with self._cond:
+                    if self._pending is not None:
+                        return # Yeni komut geldi, stop'un yerini o alır
+                self.stats["retries"] += 1
+                time.sleep(self.retry_delay * attempt)
+
+            sent_at = time.monotonic()
+            try:
+                ok = self._send(command)
+            except Exception as e:
+                ok, error = False, str(e)
+            acked_at = time.monotonic()
+
+            if ok:
+                self.stats["sent"] += 1
+                self._last_sent = None if command.kind == "momentary" else command.vector
+                self._record(command, sent_at, acked_at, attempt + 1, True, None)
+                return
+
+        # Kameradaki durum artık bilinmiyor, sonraki komut tekrarlansa bile gönderilsin
+        self._last_sent = None
+        self.stats["failed"] += 1
+        self._record(command, sent_at, acked_at, attempts, False, error)
+
+    def _send(self, command: _Command) -> bool:
+        v = command.vector
+        if command.kind == "momentary":
+            return self.ptz.momentary_move(v.pan, v.tilt, v.zoom, duration_ms=command.duration_ms,
+                                           channel=self.channel, timeout=self.request_timeout)
+        return self.ptz.continuous_move(v.pan, v.tilt, v.zoom, channel=self.channel, timeout=self.request_timeout)
+
+    def _record(self, command: _Command, sent_at: float, acked_at: float, attempts: int, ok: bool, error: Optional[str]):
+        metric = PTZCommandMetric(
+            kind=command.kind,
+            command=command.vector,
+            queue_wait=sent_at - command.enqueued_at,
+            rtt=acked_at - sent_at,
+            total=acked_at - command.enqueued_at,
+            attempts=attempts,
+            ok=ok,
+            error=error,
+        )
+        self.metrics.append(metric)
+        if self.on_metric:
+            self.on_metric(metric)
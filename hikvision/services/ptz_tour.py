@@ -0,0 +1,248 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+from ..api.ptz import PTZAPI
+from ..models.ptz import PTZPosition
+
+
+class PTZSpeedProfile:
+    """
+    Kameranın hareket hızları. Pan ve tilt motorları aynı anda çalıştığı için
+    seyahat süresi en yavaş eksene göre belirlenir.
+    """
+
+    def __init__(self, pan_speed: float = 100.0, tilt_speed: float = 60.0, zoom_speed: float = 10.0,
+                 settle_time: float = 0.3):
+        """
+        :param pan_speed: derece/sn
+        :param tilt_speed: derece/sn
+        :param zoom_speed: zoom çarpanı/sn
+        :param settle_time: Her harekette sabit ek süre (hızlanma/yavaşlama, odak)
+        """
+        self.pan_speed = pan_speed
+        self.tilt_speed = tilt_speed
+        self.zoom_speed = zoom_speed
+        self.settle_time = settle_time
+
+    def travel_time(self, a: PTZPosition, b: PTZPosition) -> float:
+        pan = abs(a.azimuth - b.azimuth) % 360
+        pan = min(pan, 360 - pan)
+        tilt = abs(a.elevation - b.elevation)
+        zoom = abs(a.zoom - b.zoom)
+        return max(pan / self.pan_speed, tilt / self.tilt_speed, zoom / self.zoom_speed) + self.settle_time
+
+
+class PresetCatalog:
+    """
+    Bir kanalın preset ID -> konum tablosu.
+    Konumlar cihazdan (get_presets), ziyaret ederek (learn) veya dosyadan (load) gelir.
+    """
+
+    def __init__(self, positions: Dict[int, PTZPosition] = None, names: Dict[int, str] = None):
+        self.positions: Dict[int, PTZPosition] = dict(positions or {})
+        self.names: Dict[int, str] = dict(names or {})
+
+    @classmethod
+    def from_device(cls, ptz: PTZAPI, channel: int = None) -> "PresetCatalog":
+        catalog = cls()
+        for preset in ptz.get_presets(channel):
+            if preset.name:
+                catalog.names[preset.id] = preset.name
+            if preset.position is not None:
+                catalog.positions[preset.id] = preset.position
+        return catalog
+
+    def missing(self) -> List[int]:
+        """Adı bilinen ama konumu bilinmeyen presetler."""
+        return sorted(pid for pid in self.names if pid not in self.positions)
+
+    def learn(self, ptz: PTZAPI, preset_ids: Iterable[int] = None, channel: int = None, timeout: float = 20) -> List[int]:
+        """
+        Konumu bilinmeyen presetlere sırayla gidip varış konumunu kaydeder.
+        Öğrenilemeyen ID'leri döner.
+        """
+        failed = []
+        for preset_id in (preset_ids if preset_ids is not None else self.missing()):
+            # Hareketten önceki konum: motor kalkmadan okunan iki aynı değer varış sayılmasın
+            before = ptz.get_status(channel).position
+            if not ptz.goto_preset(preset_id, channel=channel):
+                failed.append(preset_id)
+                continue
+            status = ptz.wait_until_settled(timeout=timeout, channel=channel, start=before)
+            if status is None:
+                failed.append(preset_id)
+            else:
+                self.positions[preset_id] = status.position
+        return failed
+
+    def save(self, path: str):
+        data = {
+            str(pid): {"name": self.names.get(pid), **pos.model_dump()}
+            for pid, pos in self.positions.items()
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> "PresetCatalog":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        catalog = cls()
+        for pid, item in data.items():
+            name = item.pop("name", None)
+            if name:
+                catalog.names[int(pid)] = name
+            catalog.positions[int(pid)] = PTZPosition(**item)
+        return catalog
+
+
+class TourPlan:
+    """Sıralanmış preset listesi ve tahmini tur süresi (dwell hariç)."""
+
+    def __init__(self, order: List[int], travel_time: float, closed: bool):
+        self.order = order
+        self.travel_time = travel_time
+        self.closed = closed
+
+    def __repr__(self):
+        return f"TourPlan(order={self.order}, travel_time={self.travel_time:.1f}s, closed={self.closed})"
+
+
+def plan_tour(catalog: PresetCatalog, preset_ids: Iterable[int] = None, start: PTZPosition = None,
+              profile: PTZSpeedProfile = None, closed: bool = True, max_passes: int = 50) -> TourPlan:
+    """
+    Presetleri toplam seyahat süresini en aza indirecek şekilde sıralar.
+    En yakın komşu ile başlangıç turu kurulur, 2-opt ile kesişen kenarlar düzeltilir.
+
+    :param start: Kameranın şu anki konumu (verilirse tur en yakın presetten başlar).
+    :param closed: True ise devriye döngüsüdür (son presetten ilke dönüş de hesaba katılır).
+    """
+    profile = profile or PTZSpeedProfile()
+    ids = [pid for pid in (preset_ids if preset_ids is not None else catalog.positions) if pid in catalog.positions]
+    n = len(ids)
+    if n == 0:
+        return TourPlan([], 0.0, closed)
+
+    points = [catalog.positions[pid] for pid in ids]
+    cost = [[profile.travel_time(a, b) for b in points] for a in points]
+
+    # 1. En yakın komşu (başlangıç: mevcut konuma en yakın preset)
+    if start is not None:
+        first = min(range(n), key=lambda i: profile.travel_time(start, points[i]))
+    else:
+        first = 0
+    route = [first]
+    remaining = set(range(n)) - {first}
+    while remaining:
+        last = route[-1]
+        nearest = min(remaining, key=lambda j: cost[last][j])
+        route.append(nearest)
+        remaining.remove(nearest)
+
+    # 2. 2-opt: (a,b) ve (c,d) kenarlarını (a,c) ve (b,d) ile değiştirmek kazandırıyorsa segmenti ters çevir
+    #    Açık turda son kenar yoktur (d = None), route[0] sabit kalır.
+    for _ in range(max_passes):
+        improved = False
+        for i in range(0, n - 1):
+            for k in range(i + 1, n):
+                if i == 0 and k == n - 1 and closed:
+                    continue # Tüm turu ters çevirmek bir şey değiştirmez
+                a, b = route[i], route[i + 1]
+                c = route[k]
+                d = route[(k + 1) % n] if (closed or k + 1 < n) else None
+                before = cost[a][b] + (cost[c][d] if d is not None else 0.0)
+                after = cost[a][c] + (cost[b][d] if d is not None else 0.0)
+                if after + 1e-9 < before:
+                    route[i + 1:k + 1] = reversed(route[i + 1:k + 1])
+                    improved = True
+        if not improved:
+            break
+
+    # Açık turda başlangıç noktası (route[0]) korunur; kapalı turda başlangıç presetine döndür
+    if closed and first in route:
+        pivot = route.index(first)
+        route = route[pivot:] + route[:pivot]
+
+    total = sum(cost[route[i]][route[i + 1]] for i in range(n - 1))
+    if closed and n > 1:
+        total += cost[route[-1]][route[0]]
+    return TourPlan([ids[i] for i in route], total, closed)
+
+
+class TourRunner:
+    """
+    Birden çok kamerada devriye turlarını eşzamanlı çalıştırır.
+    Her presette kameranın varışı status okunarak beklenir, sonra dwell süresi kadar durulur.
+
+    Kullanım:
+        catalog = PresetCatalog.from_device(cam.ptz)
+        plan = plan_tour(catalog, start=cam.ptz.get_status().position)
+        runner = TourRunner()
+        runner.add(cam.ptz, plan, catalog)
+        runner.run(loops=3)
+    """
+
+    def __init__(self, dwell: float = 5.0, arrival_timeout: float = 20.0, tolerance: float = 1.0,
+                 poll_interval: float = 0.25, on_arrival: Callable[[PTZAPI, int, Optional[float]], None] = None):
+        """
+        :param on_arrival: (ptz, preset_id, varış süresi veya None) ile çağrılır.
+        """
+        self.dwell = dwell
+        self.arrival_timeout = arrival_timeout
+        self.tolerance = tolerance
+        self.poll_interval = poll_interval
+        self.on_arrival = on_arrival
+        self._jobs = []
+        self._stop = threading.Event()
+
+    def add(self, ptz: PTZAPI, plan: TourPlan, catalog: PresetCatalog = None, channel: int = None):
+        self._jobs.append((ptz, plan, catalog, channel))
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self, loops: int = 1, max_workers: int = None) -> Dict[int, dict]:
+        """Tüm turları çalıştırır. İş sırasına göre kamera başına istatistik döner."""
+        self._stop.clear()
+        workers = max_workers or max(1, len(self._jobs))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hik-tour") as executor:
+            futures = [executor.submit(self._run_one, job, loops) for job in self._jobs]
+            return {i: f.result() for i, f in enumerate(futures)}
+
+    def _run_one(self, job, loops: int) -> dict:
+        ptz, plan, catalog, channel = job
+        stats = {"visits": 0, "timeouts": 0, "errors": 0, "travel_time": 0.0}
+        for _ in range(loops):
+            for preset_id in plan.order:
+                if self._stop.is_set():
+                    return stats
+                target = catalog.positions.get(preset_id) if catalog else None
+                try:
+                    # Hedef bilinmiyorsa varış "iki aynı okuma" ile anlaşılır: hareketten önceki
+                    # konum verilmezse motor kalkmadan okunan eski konum varış sayılır
+                    start = ptz.get_status(channel).position if target is None else None
+                    started = time.monotonic()
+                    ptz.goto_preset(preset_id, channel=channel)
+                    status = ptz.wait_until_settled(target=target, tolerance=self.tolerance,
+                                                    timeout=self.arrival_timeout,
+                                                    poll_interval=self.poll_interval, channel=channel,
+                                                    start=start)
+                except Exception as e:
+                    print(f"   ⚠️ Tur hatası (preset {preset_id}): {e}")
+                    stats["errors"] += 1
+                    continue
+
+                elapsed = time.monotonic() - started if status is not None else None
+                if elapsed is None:
+                    stats["timeouts"] += 1
+                else:
+                    stats["visits"] += 1
+                    stats["travel_time"] += elapsed
+                if self.on_arrival:
+                    self.on_arrival(ptz, preset_id, elapsed)
+
+                self._stop.wait(self.dwell)
+        return stats
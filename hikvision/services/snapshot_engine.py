@@ -0,0 +1,250 @@
+import datetime
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional
+
+from ..client import HikvisionClient
+from ..models.content import SearchMatchItem
+from ..models.event import EventAlert
+
+# Snapshot alınacak varsayılan olay tipleri
+DEFAULT_EVENT_TYPES = {"VMD", "linedetection", "fielddetection", "regionEntrance", "regionExiting", "IO"}
+
+# Bu olaylarda kamera resmi genelde multipart akışın içinde gönderir, önce onu bekleriz
+PICTURE_EVENT_TYPES = {"linedetection", "fielddetection", "regionEntrance", "regionExiting", "faceSnap", "ANPR"}
+
+_UNRESOLVED = object()
+
+
+class EventCapture:
+    """
+    Bir olay için toplanan görüntü ve (istenirse) kayıt segmenti.
+    Kayıt segmenti kamera tarafında olay bittikten sonra kapandığı için
+    recording() ilk çağrıldığında aranır ve sonuç saklanır.
+    """
+
+    def __init__(self, alert: EventAlert, device: str, client: HikvisionClient, channel: int, received_at: float):
+        self.alert = alert
+        self.device = device
+        self.channel = channel # Streaming kanal ID'si (101, 201 ...)
+        self.received_at = received_at
+
+        self.image: Optional[bytes] = None
+        self.image_source: Optional[str] = None # alert (multipart), snapshot
+        self.latency: Optional[float] = None    # Olay alımından resim elde edilene kadar geçen süre (sn)
+        self.error: Optional[str] = None
+
+        self._client = client
+        self._recording = _UNRESOLVED
+        self._lock = threading.Lock()
+
+    @property
+    def event_time(self) -> datetime.datetime:
+        if self.alert.date_time:
+            return self.alert.date_time
+        return datetime.datetime.fromtimestamp(self.received_at, tz=datetime.timezone.utc)
+
+    def recording(self, pre_seconds: int = 10, post_seconds: int = 30) -> Optional[SearchMatchItem]:
+        """Olay anını kapsayan kayıt segmentini bulur (ilk çağrıda arar, sonra önbellekten döner)."""
+        with self._lock:
+            if self._recording is _UNRESOLVED:
+                start = self.event_time - datetime.timedelta(seconds=pre_seconds)
+                end = self.event_time + datetime.timedelta(seconds=post_seconds)
+                try:
+                    result = self._client.content.search_recordings(start, end, track_id=self.channel, max_results=5)
+                    self._recording = result.match_list[0] if result.match_list else None
+                except Exception as e:
+                    self.error = f"Kayıt araması başarısız: {e}"
+                    return None # Sonra tekrar denenebilsin
+            return self._recording
+
+    def playback_url(self) -> Optional[str]:
+        """Bulunan segment için RTSP playback linki."""
+        segment = self.recording()
+        if segment is None:
+            return None
+        fmt = lambda t: t.replace("-", "").replace(":", "")
+        return self._client.content.get_playback_rtsp_url(
+            self.channel, fmt(segment.time_span.start_time), fmt(segment.time_span.end_time)
+        )
+
+
+class SnapshotCorrelator:
+    """
+    Alarm akışını dinler, her olay için ilgili kanaldan görüntü toplar.
+
+    - Görüntü, olay alındıktan sonra latency_budget saniye içinde elde edilemeyecekse alınmaz.
+    - Cihaz başına en fazla per_device_concurrency eşzamanlı snapshot isteği atılır,
+      kuyruk (max_queue_per_device) doluysa yeni olay düşürülür (aşırı yük koruması).
+    - Multipart bildirimle resim gelmişse ayrıca snapshot isteği atılmaz.
+
+    Kullanım:
+        correlator = SnapshotCorrelator({cam.session.config.ip: cam}, on_capture=save)
+        correlator.follow(cam)            # Arka planda alarm akışını dinler
+        ...
+        capture.recording()               # Kayıt segmentine ihtiyaç olduğunda
+    """
+
+    def __init__(self, clients: Dict[str, HikvisionClient], on_capture: Callable[[EventCapture], None] = None,
+                 event_types: Iterable[str] = DEFAULT_EVENT_TYPES, latency_budget: float = 1.5,
+                 per_device_concurrency: int = 2, max_queue_per_device: int = 4,
+                 image_grace: float = 0.3, stream: int = 1, io_channels: Dict[str, int] = None,
+                 max_workers: int = None):
+        """
+        :param clients: Cihaz anahtarı (IP) -> HikvisionClient
+        :param image_grace: Resimli olaylarda multipart resmi bekleme süresi (sn).
+        :param stream: 1 = ana akış (101), 2 = alt akış (102).
+        :param io_channels: IO olayları için port -> video kanalı eşlemesi (varsayılan kanal 1).
+        :param max_workers: Toplam snapshot thread sayısı (varsayılan: cihaz sayısı x eşzamanlılık).
+        """
+        self.clients = clients
+        self.on_capture = on_capture
+        self.event_types = set(event_types)
+        self.latency_budget = latency_budget
+        self.per_device_concurrency = per_device_concurrency
+        self.max_queue_per_device = max_queue_per_device
+        self.image_grace = image_grace
+        self.stream = stream
+        self.io_channels = io_channels or {}
+
+        self.stats = {"submitted": 0, "captured": 0, "from_alert": 0,
+                      "dropped_overload": 0, "dropped_late": 0, "failed": 0, "callback_errors": 0}
+        self._latency_total = 0.0
+
+        self._lock = threading.Lock()
+        self._running: Dict[str, int] = {}
+        self._queues: Dict[str, deque] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or max(4, per_device_concurrency * len(clients)),
+            thread_name_prefix="hik-snapshot",
+        )
+
+    # --- GENEL API ---
+
+    def submit(self, alert: EventAlert, device: str) -> Optional[EventCapture]:
+        """
+        Olayı işleme alır. Olay tipi ilgisizse veya aşırı yük nedeniyle düşürüldüyse None döner.
+        Tekrarlanan 'active' bildirimleri (activePostCount > 1) yok sayılır.
+        """
+        if alert.event_type not in self.event_types or alert.event_state != "active":
+            return None
+        if alert.active_post_count > 1:
+            return None
+
+        client = self.clients.get(device)
+        if client is None:
+            return None
+
+        capture = EventCapture(alert, device, client, self._stream_channel(alert), time.monotonic())
+
+        with self._lock:
+            self.stats["submitted"] += 1
+            queue = self._queues.setdefault(device, deque())
+            if self._running.get(device, 0) < self.per_device_concurrency:
+                self._running[device] = self._running.get(device, 0) + 1
+            elif len(queue) < self.max_queue_per_device:
+                queue.append(capture)
+                return capture
+            else:
+                self.stats["dropped_overload"] += 1
+                return None
+
+        self._executor.submit(self._worker, capture)
+        return capture
+
+    def follow(self, client: HikvisionClient, device: str = None) -> threading.Thread:
+        """Cihazın alarm akışını arka planda dinleyip submit eder."""
+        device = device or client.session.config.ip
+        self.clients.setdefault(device, client)
+
+        def loop():
+            for alert in client.event.listen_alert_stream():
+                self.submit(alert, device)
+
+        thread = threading.Thread(target=loop, name=f"hik-alerts-{device}", daemon=True)
+        thread.start()
+        return thread
+
+    @property
+    def average_latency(self) -> float:
+        captured = self.stats["captured"]
+        return self._latency_total / captured if captured else 0.0
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    # --- İÇ METOTLAR ---
+
+    def _stream_channel(self, alert: EventAlert) -> int:
+        """Olay kanal ID'sini streaming kanal ID'sine çevirir (1 -> 101)."""
+        if alert.event_type == "IO":
+            video_channel = self.io_channels.get(str(alert.channel_id), 1)
+        else:
+            try:
+                video_channel = int(alert.channel_id or 1)
+            except ValueError:
+                video_channel = 1
+        return video_channel * 100 + self.stream
+
+    def _worker(self, capture: EventCapture):
+        while capture is not None:
+            try:
+                self._capture(capture)
+            except Exception as e:
+                capture.error = str(e)
+                with self._lock:
+                    self.stats["failed"] += 1
+
+            # Aynı cihazın kuyrukta bekleyen işi varsa bu thread devam eder
+            with self._lock:
+                queue = self._queues.get(capture.device)
+                if queue:
+                    capture = queue.popleft()
+                else:
+                    self._running[capture.device] -= 1
+                    capture = None
+
+    def _capture(self, capture: EventCapture):
+        deadline = capture.received_at + self.latency_budget
+
+        # 1. Resim multipart bildirimle geldiyse onu kullan
+        if capture.alert.event_type in PICTURE_EVENT_TYPES:
+            grace_end = min(deadline, capture.received_at + self.image_grace)
+            while capture.alert.image is None and time.monotonic() < grace_end:
+                time.sleep(0.01)
+
+        if capture.alert.image is not None:
+            self._finish(capture, capture.alert.image, "alert")
+            return
+
+        # 2. Bütçe dolduysa boşuna istek atma
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            with self._lock:
+                self.stats["dropped_late"] += 1
+            return
+
+        client = self.clients[capture.device]
+        image = client.streaming.get_snapshot(capture.channel, timeout=remaining)
+        self._finish(capture, image, "snapshot")
+
+    def _finish(self, capture: EventCapture, image: bytes, source: str):
+        capture.image = image
+        capture.image_source = source
+        capture.latency = time.monotonic() - capture.received_at
+        with self._lock:
+            self.stats["captured"] += 1
+            if source == "alert":
+                self.stats["from_alert"] += 1
+            self._latency_total += capture.latency
+
+        if self.on_capture:
+            # Kullanıcı callback'inin hatası yakalamayı başarısız saymaz (captured zaten sayıldı)
+            try:
+                self.on_capture(capture)
+            except Exception as e:
+                print(f"   ⚠️ on_capture hatası ({capture.device}): {e}")
+                with self._lock:
+                    self.stats["callback_errors"] += 1
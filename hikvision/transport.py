@@ -0,0 +1,516 @@
+"""
+HTTP taşıma katmanı (backend) soyutlaması.
+
+HikvisionSession istekleri Transport.send üzerinden gönderir; alt API'ler taşıma katmanına
+doğrudan erişmez. Tüm backend'ler aynı sözleşmeye uyar:
+    - Dönüş: requests.Response (text, content, headers, raise_for_status, iter_content, raw).
+    - Hata: requests istisnaları (ConnectionError, Timeout, ...). Devre kesici ve çağıranlar
+      backend'den bağımsız çalışır.
+    - timeout: sn veya (bağlantı, okuma) çifti.
+
+Backend'ler:
+    requests : requests.Session (varsayılan, en uyumlu).
+    urllib3  : Doğrudan urllib3 bağlantı havuzu. Session'ın istek başına başlık birleştirme,
+               hook, cookie ve ortam ayarı maliyeti yok; Digest başlığı önceden hesaplanır.
+    async    : asyncio üzerinde harici bağımlılığı olmayan HTTP/1.1 istemcisi. Tüm cihazların
+               bağlantıları tek arka plan event loop'unda yönetilir; asyncio kodundan
+               doğrudan await transport.fetch(...) ile de kullanılabilir.
+
+Maliyet karşılaştırması: python -m benchmarks.bench_transport
+"""
+import asyncio
+import threading
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.auth import HTTPDigestAuth
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from .auth import DigestAuth
+
+Timeout = Union[float, Tuple[float, float], None]
+
+
+class Transport:
+    """Taşıma katmanı arayüzü."""
+
+    name = "base"
+
+    def send(self, method: str, url: str, data=None, headers: Dict[str, str] = None,
+             timeout: Timeout = None, stream: bool = False) -> requests.Response:
+        """
+        :param data: str, bytes veya dosya benzeri (read + __len__, örn. FileStreamBody) gövde.
+        :param headers: Gönderilecek başlıklar. Backend bu sözlüğü değiştirmez.
+        :param stream: True ise gövde okunmadan döner (iter_content / raw ile okunur, close ile bırakılır).
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+def create_transport(transport: Union[str, Transport, None], username: str, password: str,
+                     pool_maxsize: int = 4) -> Transport:
+    """İsimden ('requests', 'urllib3', 'async') veya hazır nesneden Transport döner."""
+    if isinstance(transport, Transport):
+        return transport
+    backends = {"requests": RequestsTransport, "urllib3": Urllib3Transport, "async": AsyncTransport}
+    backend = backends.get((transport or "requests").lower())
+    if backend is None:
+        raise ValueError(f"Bilinmeyen transport: {transport} (desteklenenler: {', '.join(backends)})")
+    return backend(username, password, pool_maxsize=pool_maxsize)
+
+
+def _split_timeout(timeout: Timeout) -> Tuple[Optional[float], Optional[float]]:
+    if isinstance(timeout, tuple):
+        return timeout
+    return timeout, timeout
+
+
+def _body_length(data) -> Optional[int]:
+    try:
+        return len(data)
+    except TypeError:
+        return None
+
+
+def _build_response(status: int, reason: str, headers, url: str, raw=None, content: bytes = None) -> requests.Response:
+    """requests.adapters.HTTPAdapter.build_response eşdeğeri (cookie ve yönlendirme işlemesi olmadan)."""
+    response = requests.Response()
+    response.status_code = status
+    response.reason = reason
+    response.headers = CaseInsensitiveDict(headers)
+    response.url = url
+    # ISAPI XML cevaplarında charset yoktur; karakter seti tahmini (chardet) her .text'te çalışmasın
+    response.encoding = get_encoding_from_headers(response.headers) or "utf-8"
+    response.raw = raw
+    if content is not None:
+        response._content = content
+    return response
+
+
+# --- REQUESTS ---
+
+class RequestsTransport(Transport):
+    """requests.Session tabanlı backend (Digest auth, keep-alive, havuz boyutu ayarlı)."""
+
+    name = "requests"
+
+    def __init__(self, username: str, password: str, pool_maxsize: int = 4):
+        self.session = requests.Session()
+        self.session.auth = HTTPDigestAuth(username, password)
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def send(self, method: str, url: str, data=None, headers: Dict[str, str] = None,
+             timeout: Timeout = None, stream: bool = False) -> requests.Response:
+        return self.session.request(method, url, data=data, headers=headers, timeout=timeout, stream=stream)
+
+    def close(self):
+        self.session.close()
+
+
+# --- URLLIB3 ---
+
+class Urllib3Transport(Transport):
+    """
+    Doğrudan urllib3 havuzu üzerinde backend.
+    Digest başlığı ilk 401'den sonra her isteğe önceden eklenir; nonce eskirse (401) bir kez
+    yeni challenge ile tekrar denenir.
+    """
+
+    name = "urllib3"
+
+    def __init__(self, username: str, password: str, pool_maxsize: int = 4):
+        import urllib3
+
+        self._urllib3 = urllib3
+        self._auth = DigestAuth(username, password)
+        # block=False: uzun akışlar (alarm, önizleme) havuzu doldurursa ek bağlantı açılır
+        self._pool = urllib3.PoolManager(maxsize=pool_maxsize, block=False, retries=False)
+
+    def send(self, method: str, url: str, data=None, headers: Dict[str, str] = None,
+             timeout: Timeout = None, stream: bool = False) -> requests.Response:
+        errors = self._urllib3.exceptions
+        headers = dict(headers) if headers else {}
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        elif data is not None and not isinstance(data, bytes):
+            length = _body_length(data)
+            if length is not None:
+                headers["Content-Length"] = str(length)
+
+        split = urlsplit(url)
+        uri = f"{split.path}?{split.query}" if split.query else split.path
+        connect, read = _split_timeout(timeout)
+
+        for attempt in range(2):
+            authorization = self._auth.header(method, uri)
+            if authorization:
+                headers["Authorization"] = authorization
+            try:
+                raw = self._pool.urlopen(
+                    method, url, body=data, headers=headers, redirect=False, retries=False,
+                    timeout=self._urllib3.Timeout(connect=connect, read=read),
+                    preload_content=False, decode_content=True,
+                )
+            except errors.NewConnectionError as e:
+                raise requests.ConnectionError(e) from e
+            except errors.ConnectTimeoutError as e:
+                raise requests.ConnectTimeout(e) from e
+            except errors.ReadTimeoutError as e:
+                raise requests.ReadTimeout(e) from e
+            except errors.HTTPError as e:
+                raise requests.ConnectionError(e) from e
+
+            if raw.status == 401 and attempt == 0 and self._auth.challenge(raw.headers.getlist("WWW-Authenticate")):
+                raw.drain_conn()
+                raw.release_conn()
+                if hasattr(data, "seek"):
+                    data.seek(0)
+                continue
+            break
+
+        if stream:
+            return _build_response(raw.status, raw.reason, raw.headers, url, raw=raw)
+        try:
+            content = raw.read()
+        except errors.ReadTimeoutError as e:
+            raise requests.ReadTimeout(e) from e
+        except errors.HTTPError as e:
+            raise requests.ConnectionError(e) from e
+        finally:
+            raw.release_conn()
+        return _build_response(raw.status, raw.reason, raw.headers, url, raw=raw, content=content)
+
+    def close(self):
+        self._pool.clear()
+
+
+# --- ASYNC ---
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """Tüm AsyncTransport'ların paylaştığı arka plan event loop'u (ilk kullanımda başlar)."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="hik-transport", daemon=True).start()
+        return _loop
+
+
+class _Connection:
+    __slots__ = ("reader", "writer", "reused")
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+
+    def close(self):
+        self.writer.close()
+
+
+class _Body:
+    """Cevap gövdesini Content-Length, chunked veya bağlantı kapanana kadar okur."""
+
+    def __init__(self, transport: "AsyncTransport", key: Tuple[str, int], connection: _Connection,
+                 headers: CaseInsensitiveDict, read_timeout: Optional[float], keep_alive: bool):
+        self._transport = transport
+        self._key = key
+        self._connection = connection
+        self._timeout = read_timeout
+        self._keep_alive = keep_alive
+        self._chunked = "chunked" in headers.get("Transfer-Encoding", "").lower()
+        length = headers.get("Content-Length")
+        self._remaining = int(length) if length is not None and not self._chunked else None
+        self._chunk_left = 0
+        self._done = self._remaining == 0
+
+    async def read(self, size: int = 65536) -> bytes:
+        if self._done:
+            return b""
+        reader = self._connection.reader
+        try:
+            if self._chunked:
+                if self._chunk_left == 0:
+                    line = await asyncio.wait_for(reader.readline(), self._timeout)
+                    self._chunk_left = int(line.split(b";")[0].strip() or b"0", 16)
+                    if self._chunk_left == 0:
+                        while (await asyncio.wait_for(reader.readline(), self._timeout)).strip():
+                            pass # Trailer başlıkları
+                        return self._finish(True)
+                data = await asyncio.wait_for(reader.read(min(size, self._chunk_left)), self._timeout)
+                if not data:
+                    raise asyncio.IncompleteReadError(b"", self._chunk_left)
+                self._chunk_left -= len(data)
+                if self._chunk_left == 0:
+                    await asyncio.wait_for(reader.readexactly(2), self._timeout)
+                return data
+
+            limit = size if self._remaining is None else min(size, self._remaining)
+            data = await asyncio.wait_for(reader.read(limit), self._timeout)
+            if self._remaining is None:
+                return data or self._finish(False)
+            if not data:
+                raise asyncio.IncompleteReadError(b"", self._remaining)
+            self._remaining -= len(data)
+            if self._remaining == 0:
+                self._finish(True)
+            return data
+        except asyncio.TimeoutError as e:
+            self.close()
+            raise requests.ReadTimeout(f"Gövde okuma zaman aşımı ({self._key[0]}:{self._key[1]})") from e
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            self.close()
+            raise requests.ConnectionError(f"Gövde okunamadı ({self._key[0]}:{self._key[1]}): {e}") from e
+
+    async def read_all(self) -> bytes:
+        parts = []
+        while True:
+            data = await self.read()
+            if not data:
+                return b"".join(parts)
+            parts.append(data)
+
+    def _finish(self, reusable: bool) -> bytes:
+        self._done = True
+        if reusable and self._keep_alive:
+            self._transport._release(self._key, self._connection)
+        else:
+            self._connection.close()
+        return b""
+
+    def close(self):
+        if not self._done:
+            self._done = True
+            self._connection.close()
+
+
+class _SyncBody:
+    """_Body'yi senkron okuyucu olarak sunar (requests iter_content ve MJPEG okuyucu için)."""
+
+    def __init__(self, body: _Body, loop: asyncio.AbstractEventLoop):
+        self._body = body
+        self._loop = loop
+
+    def read(self, size: int = -1) -> bytes:
+        coroutine = self._body.read_all() if size is None or size < 0 else self._body.read(size)
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._body.close)
+
+
+class AsyncTransport(Transport):
+    """
+    asyncio tabanlı HTTP/1.1 backend (keep-alive havuzu, Digest auth).
+
+    Senkron send() çağrıları paylaşılan arka plan loop'unda çalışır; binlerce cihazın
+    bağlantıları tek thread'de yönetilir. asyncio kodundan: await transport.fetch(...)
+    (fetch sadece tam gövdeli istekler içindir, akış için send(stream=True) kullanılır).
+    """
+
+    name = "async"
+
+    def __init__(self, username: str, password: str, pool_maxsize: int = 4,
+                 loop: asyncio.AbstractEventLoop = None):
+        self._auth = DigestAuth(username, password)
+        self._pool_maxsize = pool_maxsize
+        self._idle: Dict[Tuple[str, int], List[_Connection]] = {}
+        self._loop = loop
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            self._loop = _background_loop()
+        return self._loop
+
+    def send(self, method: str, url: str, data=None, headers: Dict[str, str] = None,
+             timeout: Timeout = None, stream: bool = False) -> requests.Response:
+        loop = self.loop
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            raise RuntimeError("AsyncTransport.send kendi event loop'u içinden çağrılamaz, fetch kullanın.")
+        future = asyncio.run_coroutine_threadsafe(self._request(method, url, data, headers, timeout), loop)
+        response, body = future.result()
+        if stream:
+            response.raw = _SyncBody(body, loop)
+            return response
+        response._content = asyncio.run_coroutine_threadsafe(body.read_all(), loop).result()
+        return response
+
+    async def fetch(self, method: str, url: str, data=None, headers: Dict[str, str] = None,
+                    timeout: Timeout = None) -> requests.Response:
+        """asyncio kodundan istek (gövde tamamen okunmuş döner)."""
+        response, body = await self._request(method, url, data, headers, timeout)
+        response._content = await body.read_all()
+        return response
+
+    def close(self):
+        def close_all():
+            for connections in self._idle.values():
+                for connection in connections:
+                    connection.close()
+            self._idle.clear()
+
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(close_all)
+
+    # --- BAĞLANTI HAVUZU (sadece loop thread'inde kullanılır) ---
+
+    async def _acquire(self, key: Tuple[str, int], connect_timeout: Optional[float]) -> _Connection:
+        idle = self._idle.get(key)
+        while idle:
+            connection = idle.pop()
+            # Karşı taraf kapattıysa (keep-alive süresi doldu) at
+            if connection.writer.is_closing() or connection.reader.at_eof():
+                connection.close()
+                continue
+            connection.reused = True
+            return connection
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(*key), connect_timeout)
+        except asyncio.TimeoutError as e:
+            raise requests.ConnectTimeout(f"Bağlantı zaman aşımı ({key[0]}:{key[1]})") from e
+        except OSError as e:
+            raise requests.ConnectionError(f"Bağlantı kurulamadı ({key[0]}:{key[1]}): {e}") from e
+        return _Connection(reader, writer)
+
+    def _release(self, key: Tuple[str, int], connection: _Connection):
+        idle = self._idle.setdefault(key, [])
+        if len(idle) < self._pool_maxsize and not connection.writer.is_closing():
+            idle.append(connection)
+        else:
+            connection.close()
+
+    # --- İSTEK ---
+
+    async def _request(self, method: str, url: str, data, headers: Optional[Dict[str, str]],
+                       timeout: Timeout) -> Tuple[requests.Response, _Body]:
+        split = urlsplit(url)
+        key = (split.hostname, split.port or 80)
+        uri = f"{split.path}?{split.query}" if split.query else split.path
+        connect, read = _split_timeout(timeout)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        challenged = False
+        while True:
+            connection = await self._acquire(key, connect)
+            try:
+                status, reason, response_headers = await self._exchange(connection, method, uri, key, data, headers, read)
+            except (requests.ConnectionError, asyncio.IncompleteReadError, ConnectionError) as e:
+                connection.close()
+                if connection.reused:
+                    # Havuzdaki bağlantı bu arada kapanmış: yeni bağlantıyla bir kez daha
+                    if hasattr(data, "seek"):
+                        data.seek(0)
+                    continue
+                if isinstance(e, requests.ConnectionError):
+                    raise
+                raise requests.ConnectionError(f"Cevap alınamadı ({key[0]}:{key[1]}): {e}") from e
+            except asyncio.TimeoutError as e:
+                connection.close()
+                raise requests.ReadTimeout(f"Cevap zaman aşımı ({key[0]}:{key[1]})") from e
+
+            keep_alive = response_headers.get("Connection", "").lower() != "close"
+            body = _Body(self, key, connection, response_headers, read, keep_alive)
+            if method.upper() == "HEAD" or status in (204, 304):
+                body._remaining, body._chunked = 0, False
+                body._finish(True)
+
+            if status == 401 and not challenged and self._auth.challenge(_header_values(response_headers, "www-authenticate")):
+                challenged = True
+                await body.read_all()
+                if hasattr(data, "seek"):
+                    data.seek(0)
+                continue
+
+            response = _build_response(status, reason, response_headers, url)
+            return response, body
+
+    async def _exchange(self, connection: _Connection, method: str, uri: str, key: Tuple[str, int],
+                        data, headers: Optional[Dict[str, str]], read_timeout: Optional[float]):
+        lines = [f"{method} {uri} HTTP/1.1", f"Host: {key[0]}:{key[1]}", "Accept-Encoding: identity"]
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        authorization = self._auth.header(method, uri)
+        if authorization:
+            lines.append(f"Authorization: {authorization}")
+        length = _body_length(data) if data is not None else 0
+        if length is not None and (data is not None or method.upper() in ("POST", "PUT")):
+            lines.append(f"Content-Length: {length}")
+        elif length is None:
+            lines.append("Transfer-Encoding: chunked")
+
+        writer = connection.writer
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            writer.write(data)
+        elif data is not None:
+            await self._write_stream(writer, data, chunked=length is None)
+        await writer.drain()
+
+        head = await asyncio.wait_for(connection.reader.readuntil(b"\r\n\r\n"), read_timeout)
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        parts = status_line.split(" ", 2)
+        if len(parts) < 2 or not parts[1].isdigit():
+            raise requests.ConnectionError(f"Geçersiz HTTP cevabı: {status_line!r}")
+
+        response_headers = CaseInsensitiveDict()
+        for line in header_lines:
+            name, sep, value = line.partition(":")
+            if not sep:
+                continue
+            name, value = name.strip(), value.strip()
+            # Tekrar eden başlıklar requests gibi virgülle birleştirilir
+            response_headers[name] = f"{response_headers[name]}, {value}" if name in response_headers else value
+        return int(parts[1]), parts[2] if len(parts) > 2 else "", response_headers
+
+    @staticmethod
+    async def _write_stream(writer: asyncio.StreamWriter, data, chunked: bool):
+        """Dosya benzeri gövdeyi yazar. read() bloklayabilir (bant sınırı), loop'u tutmaması için executor'da okunur."""
+        loop = asyncio.get_running_loop()
+        iterator = iter(data) if not hasattr(data, "read") else None
+        while True:
+            if iterator is not None:
+                chunk = next(iterator, b"")
+            else:
+                chunk = await loop.run_in_executor(None, data.read, 64 * 1024)
+            if not chunk:
+                break
+            writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk) if chunked else chunk)
+            await writer.drain()
+        if chunked:
+            writer.write(b"0\r\n\r\n")
+
+
+def _header_values(headers: CaseInsensitiveDict, name: str) -> List[str]:
+    """Birleştirilmiş WWW-Authenticate değerini şemalara böler (Digest ..., Basic ...)."""
+    value = headers.get(name, "")
+    parts, current = [], []
+    for piece in value.split(", "):
+        scheme = piece.split(" ", 1)[0].lower()
+        if scheme in ("digest", "basic", "bearer", "negotiate", "ntlm") and current:
+            parts.append(", ".join(current))
+            current = []
+        current.append(piece)
+    if current:
+        parts.append(", ".join(current))
+    return parts
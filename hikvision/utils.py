@@ -1,5 +1,7 @@
 import xmltodict
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, Union, List, Callable
+import json
+import os
 import logging
 import requests
 from .models.common import ResponseStatus
@@ -38,6 +40,75 @@ def parse_xml(content: Union[str, bytes, requests.Response]) -> Dict[str, Any]:
         logger.error(f"XML Parse Hatası: {e}")
         return {}
 
+def parse_json(content: Union[str, bytes, requests.Response]) -> Dict[str, Any]:
+    """
+    ?format=json ile dönen cevabı Python Dictionary'e çevirir.
+    Çıktı parse_xml ile aynı şekildedir: {'DeviceInfo': {...}}
+    JSON değilse (örn. cihaz XML döndüyse) boş dict döner.
+    """
+    try:
+        if isinstance(content, requests.Response):
+            json_string = content.text
+        elif isinstance(content, bytes):
+            json_string = content.decode('utf-8', errors='ignore')
+        else:
+            json_string = str(content)
+
+        json_string = json_string.strip()
+        if not json_string or json_string[0] != "{":
+            return {}
+
+        return json.loads(json_string)
+    except Exception as e:
+        logger.error(f"JSON Parse Hatası: {e}")
+        return {}
+
+def unwrap_list(node: Any, item_key: str) -> List[Dict[str, Any]]:
+    """
+    XML (xmltodict) ve JSON liste gösterimlerini tek tipe (list of dict) indirger.
+    XML:  {'IOPortStatus': [{...}, {...}]} veya tek elemanda {'IOPortStatus': {...}}
+    JSON: [{'IOPortStatus': {...}}, ...] veya doğrudan [{...}, ...]
+    """
+    if not node:
+        return []
+
+    if isinstance(node, dict):
+        node = node.get(item_key)
+        if not node:
+            return []
+
+    if isinstance(node, dict):
+        return [node]
+
+    items = []
+    for item in node:
+        if isinstance(item, dict) and item_key in item and isinstance(item[item_key], dict):
+            items.append(item[item_key])
+        elif isinstance(item, dict):
+            items.append(item)
+    return items
+
+def get_multipart_boundary(content_type: str) -> Optional[bytes]:
+    """'multipart/mixed; boundary=boundary' -> b'boundary' (multipart değilse None)"""
+    if "multipart" not in content_type.lower():
+        return None
+    for param in content_type.split(";")[1:]:
+        key, _, value = param.strip().partition("=")
+        if key.lower() == "boundary" and value:
+            return value.strip('"').encode()
+    return None
+
+def strip_xml_attributes(node: Any) -> Any:
+    """
+    xmltodict'e özgü '@version', '@xmlns' gibi attribute anahtarlarını temizler.
+    Aynı dokümanı JSON olarak göndermek için kullanılır.
+    """
+    if isinstance(node, dict):
+        return {k: strip_xml_attributes(v) for k, v in node.items() if not k.startswith("@")}
+    if isinstance(node, list):
+        return [strip_xml_attributes(v) for v in node]
+    return node
+
 def parse_response_status(xml_input: Union[str, requests.Response]) -> Optional[ResponseStatus]:
     """
     ISAPI ResponseStatus XML'ini Pydantic modele çevirir.
@@ -75,4 +146,44 @@ def is_success_response(xml_input: Union[str, requests.Response]) -> bool:
     if status.status_code == 7:
         logger.info("İşlem Başarılı (Cihazın yeniden başlatılması gerekiyor).")
 
-    return True
\ No newline at end of file
+    return True
+
+
+class FileStreamBody:
+    """
+    Dosyayı diskten parça parça okuyan, requests'e verilebilen dosya benzeri gövde
+    (firmware, konfigürasyon yedeği gibi büyük yüklemeler için).
+    __len__ sayesinde requests Content-Length gönderir, dosya belleğe alınmaz.
+    tell/seek, Digest auth'un 401 sonrası gövdeyi başa sarabilmesi için gereklidir.
+    """
+
+    def __init__(self, path: str, throttle: Callable[[int], None] = None, progress: Callable[[int, int], None] = None):
+        self._file = open(path, "rb")
+        self._size = os.path.getsize(path)
+        self._throttle = throttle
+        self._progress = progress
+        self.sent = 0
+
+    def __len__(self):
+        return self._size
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._file.read(size)
+        if data:
+            if self._throttle:
+                self._throttle(len(data)) # Bant genişliği sınırı (bloklayabilir)
+            self.sent += len(data)
+            if self._progress:
+                self._progress(self.sent, self._size)
+        return data
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        position = self._file.seek(offset, whence)
+        self.sent = position
+        return position
+
+    def close(self):
+        self._file.close()
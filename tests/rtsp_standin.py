@@ -0,0 +1,159 @@
+# rtsp_standin.py
+#
+# RTSPClient testleri için kamera yerine geçen minimal asyncio RTSP sunucusu.
+# OPTIONS / DESCRIBE / SETUP / PLAY / GET_PARAMETER / TEARDOWN cevaplar, Digest ister ve PLAY'den sonra
+# interleaved (RTP-over-TCP) H.264 gönderir: STAP-A (SPS+PPS), FU-A parçalı IDR, tekli P kareleri.
+# İlk RTCP ve RTP çerçeveleri PLAY cevabından önce gönderilir (kameralardaki yarış durumu).
+
+import asyncio
+import base64
+import struct
+
+SPS = bytes([0x67, 0x42, 0xC0, 0x1E, 0xD9, 0x00, 0xA0, 0x47, 0xFE, 0xC8])
+PPS = bytes([0x68, 0xCE, 0x3C, 0x80])
+IDR = bytes([0x65]) + bytes(range(256)) * 12 # FU-A ile bölünecek kadar büyük
+P_FRAME = bytes([0x41, 0x9A, 0x02, 0x04, 0x08])
+
+FRAME_TICKS = 3600 # 90 kHz'de 25 fps
+MAX_PAYLOAD = 1200
+
+SDP = (
+    "v=0\r\n"
+    "o=- 0 0 IN IP4 127.0.0.1\r\n"
+    "s=Stand-in\r\n"
+    "t=0 0\r\n"
+    "m=video 0 RTP/AVP 96\r\n"
+    "a=rtpmap:96 H264/90000\r\n"
+    f"a=fmtp:96 packetization-mode=1;sprop-parameter-sets={base64.b64encode(SPS).decode()},"
+    f"{base64.b64encode(PPS).decode()}\r\n"
+    "a=control:trackID=1\r\n"
+)
+
+
+def rtp(sequence: int, timestamp: int, payload: bytes, marker: bool = False) -> bytes:
+    return struct.pack("!BBHII", 0x80, (0x80 if marker else 0) | 96, sequence & 0xFFFF, timestamp, 0x1234) + payload
+
+
+def interleaved(channel: int, data: bytes) -> bytes:
+    return b"$" + bytes([channel]) + struct.pack("!H", len(data)) + data
+
+
+def stap_a(*nals: bytes) -> bytes:
+    return bytes([0x18]) + b"".join(struct.pack("!H", len(nal)) + nal for nal in nals)
+
+
+def fu_a(nal: bytes):
+    """NAL'ı FU-A parçalarına böler."""
+    indicator = (nal[0] & 0xE0) | 28
+    data = nal[1:]
+    chunks = [data[i:i + MAX_PAYLOAD] for i in range(0, len(data), MAX_PAYLOAD)]
+    for i, chunk in enumerate(chunks):
+        header = (0x80 if i == 0 else 0) | (0x40 if i == len(chunks) - 1 else 0) | (nal[0] & 0x1F)
+        yield bytes([indicator, header]) + chunk
+
+
+class RTSPStandIn:
+    """
+    Kullanım:
+        async with RTSPStandIn() as server:
+            async with RTSPClient(server.url, "admin", "pass") as stream: ...
+
+    frames: Gönderilecek kare sayısı (ilki IDR, diğerleri P). None ise bağlantı kapanana kadar.
+    interval: Kareler arası süre (sn).
+    """
+
+    def __init__(self, frames: int = None, interval: float = 0.04, realm: str = "standin"):
+        self.frames = frames
+        self.interval = interval
+        self.realm = realm
+        self.requests = []     # Gelen (method, url) çiftleri
+        self.sent_frames = 0
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        port = self._server.sockets[0].getsockname()[1]
+        return f"rtsp://127.0.0.1:{port}/Streaming/Channels/101"
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        streaming = None
+        try:
+            while True:
+                first = await reader.readexactly(1)
+                if first == b"$": # İstemciden RTCP vb.
+                    header = await reader.readexactly(3)
+                    await reader.readexactly(struct.unpack("!H", header[1:])[0])
+                    continue
+                head = (first + await reader.readuntil(b"\r\n\r\n")).decode()
+                lines = head.split("\r\n")
+                method, url = lines[0].split(" ")[:2]
+                headers = {k.strip().lower(): v.strip() for k, _, v in (line.partition(":") for line in lines[1:]) if k}
+                self.requests.append((method, url))
+                cseq = headers.get("cseq", "0")
+
+                if not headers.get("authorization", "").startswith("Digest "):
+                    writer.write(self._reply(cseq, "401 Unauthorized",
+                                             {"WWW-Authenticate": f'Digest realm="{self.realm}", nonce="abc123"'}))
+                elif method == "OPTIONS":
+                    writer.write(self._reply(cseq, extra={"Public": "OPTIONS, DESCRIBE, SETUP, PLAY, TEARDOWN"}))
+                elif method == "DESCRIBE":
+                    writer.write(self._reply(cseq, extra={"Content-Type": "application/sdp"}, body=SDP.encode()))
+                elif method == "SETUP":
+                    writer.write(self._reply(cseq, extra={"Session": "42;timeout=60",
+                                                          "Transport": "RTP/AVP/TCP;unicast;interleaved=0-1"}))
+                elif method == "PLAY":
+                    # RTCP SR ve ilk RTP cevaptan önce: istemci bunları erken paket olarak saklamalı
+                    writer.write(interleaved(1, bytes([0x80, 200, 0, 6]) + bytes(24)))
+                    packets = self._frame_packets(0)
+                    writer.write(interleaved(0, packets[0]))
+                    writer.write(self._reply(cseq, extra={"Session": "42"}))
+                    streaming = asyncio.ensure_future(self._stream(writer, packets[1:]))
+                elif method == "TEARDOWN":
+                    writer.write(self._reply(cseq))
+                    break
+                else: # GET_PARAMETER (keepalive)
+                    writer.write(self._reply(cseq, extra={"Session": "42"}))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if streaming is not None:
+                streaming.cancel()
+            writer.close()
+
+    async def _stream(self, writer: asyncio.StreamWriter, first_frame_rest):
+        try:
+            for packet in first_frame_rest:
+                writer.write(interleaved(0, packet))
+            self.sent_frames = 1
+            while self.frames is None or self.sent_frames < self.frames:
+                await asyncio.sleep(self.interval)
+                for packet in self._frame_packets(self.sent_frames):
+                    writer.write(interleaved(0, packet))
+                self.sent_frames += 1
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+    def _frame_packets(self, index: int):
+        """Karenin RTP paketleri. Sıra numaraları kareler arasında süreklidir."""
+        timestamp = index * FRAME_TICKS
+        payloads = [stap_a(SPS, PPS), *fu_a(IDR)] if index == 0 else [P_FRAME]
+        first_sequence = 0 if index == 0 else len(list(fu_a(IDR))) + index
+        return [rtp(first_sequence + i, timestamp, payload, marker=i == len(payloads) - 1)
+                for i, payload in enumerate(payloads)]
+
+    @staticmethod
+    def _reply(cseq: str, status: str = "200 OK", extra: dict = None, body: bytes = b"") -> bytes:
+        lines = [f"RTSP/1.0 {status}", f"CSeq: {cseq}"]
+        lines += [f"{k}: {v}" for k, v in (extra or {}).items()]
+        lines.append(f"Content-Length: {len(body)}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode() + body
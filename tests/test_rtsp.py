@@ -0,0 +1,71 @@
+import asyncio
+
+from hikvision.media.rtsp import RTSPClient
+
+from rtsp_standin import IDR, P_FRAME, PPS, SPS, RTSPStandIn
+
+
+def run(coroutine):
+    return asyncio.run(asyncio.wait_for(coroutine, 20))
+
+
+def test_session_and_depacketization():
+    async def scenario():
+        async with RTSPStandIn(frames=3) as server:
+            async with RTSPClient(server.url, "admin", "pass", timeout=5) as stream:
+                units = []
+                async for unit in stream.access_units():
+                    units.append(unit)
+                    if len(units) == 3:
+                        break
+                methods = [method for method, _ in server.requests]
+                return units, methods, stream
+
+    units, methods, stream = run(scenario())
+
+    # Digest: sadece ilk istek 401 alır, sonrakilere başlık önceden eklenir
+    assert methods[:5] == ["OPTIONS", "OPTIONS", "DESCRIBE", "SETUP", "PLAY"]
+
+    keyframe = units[0]
+    assert keyframe.keyframe and keyframe.pts == 0
+    assert [bytes(nal.data) for nal in keyframe.nal_units] == [SPS, PPS, IDR] # STAP-A + FU-A birleştirildi
+    assert [bytes(unit.nal_units[0].data) for unit in units[1:]] == [P_FRAME, P_FRAME]
+    assert abs(units[1].pts - 0.04) < 1e-9
+    assert stream.stats["lost"] == 0 # Erken gelen RTCP video sayılmadı, ilk RTP paketi kaybolmadı
+
+
+def test_setup_url_keeps_playback_query():
+    async def scenario():
+        async with RTSPStandIn(frames=1) as server:
+            async with RTSPClient(server.url, "admin", "pass", start="20260101T000000Z", end="20260101T010000Z"):
+                pass
+            return dict((method, url) for method, url in server.requests)
+
+    requests = run(scenario())
+    assert requests["SETUP"].endswith("/Streaming/Channels/101/trackID=1?starttime=20260101T000000Z&endtime=20260101T010000Z")
+
+
+def test_slow_consumer_is_not_timed_out():
+    async def scenario():
+        async with RTSPStandIn(interval=0.05) as server:
+            async with RTSPClient(server.url, "admin", "pass", timeout=1) as stream:
+                await asyncio.sleep(2.5) # Watchdog süresinin iki katından fazla okumadan bekle
+                assert not stream._writer.is_closing()
+                count = 0
+                async for _ in stream.access_units():
+                    count += 1
+                    if count == 5:
+                        break
+                return count
+
+    assert run(scenario()) == 5
+
+
+def test_silent_server_is_timed_out():
+    async def scenario():
+        async with RTSPStandIn(frames=1) as server:
+            async with RTSPClient(server.url, "admin", "pass", timeout=1) as stream:
+                return [unit async for unit in stream.access_units()]
+
+    # Tek kareden sonra veri kesilir: watchdog bağlantıyı kapatır, okuma döngüsü sonlanır
+    assert len(run(scenario())) == 1